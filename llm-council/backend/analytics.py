@@ -0,0 +1,180 @@
+"""Ranking-quality and latency analytics over the stored conversation history.
+
+Streams over the conversation files one at a time and computes, per model:
+how often it was ranked best by the council (win rate), its average
+aggregate rank (normalized to 0 = best, 1 = worst, so rounds with different
+council sizes compare), its latency percentiles per stage, and how often its
+Stage 2 rankings did not follow the required format. Per-file results are
+cached by modification time, so repeated calls only re-read conversations
+that changed.
+
+Usage:
+    python -m backend.analytics
+"""
+
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from . import storage
+from .council import (
+    LABEL_PATTERN,
+    SYNTHESIS_FAILED_RESPONSE,
+    calculate_aggregate_rankings,
+    response_label,
+)
+from .latency import percentile
+
+# path -> (mtime_ns, per-conversation partial results)
+_cache: Dict[str, tuple] = {}
+
+
+def _new_model_stats() -> Dict[str, Any]:
+    return {
+        "rounds": 0,
+        "wins": 0,
+        "rank_sum": 0.0,
+        "reviews": 0,
+        "parse_failures": 0,
+        "durations": defaultdict(list),
+    }
+
+
+def _follows_ranking_format(ranking_text: str, shown: List[str]) -> bool:
+    """
+    Whether a Stage 2 ranking has a FINAL RANKING: section whose numbered
+    list covers every label the reviewer was shown.
+
+    Stricter than parse_ranking_from_text, which falls back to any
+    "Response X" mention and would hide format failures.
+    """
+    if "FINAL RANKING:" not in ranking_text:
+        return False
+    section = ranking_text.split("FINAL RANKING:")[1]
+    numbered = {
+        re.search(LABEL_PATTERN, match).group()
+        for match in re.findall(r'\d+\.\s*' + LABEL_PATTERN, section)
+    }
+    return set(shown) <= numbered
+
+
+def _analyze_conversation(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """Partial results (counts and duration samples) for one conversation."""
+    models: Dict[str, Dict[str, Any]] = defaultdict(_new_model_stats)
+    rounds = 0
+
+    for message in conversation.get("messages", []):
+        if message.get("role") != "assistant":
+            continue
+        stage1 = message.get("stage1") or []
+        stage2 = message.get("stage2") or []
+        stage3 = message.get("stage3") or {}
+        if not stage1:
+            continue
+        rounds += 1
+        metadata = message.get("metadata") or {}
+
+        # Labels follow Stage 1 order; older messages did not store the mapping
+        label_to_model = metadata.get("label_to_model") or {
+            f"Response {response_label(i)}": result["model"] for i, result in enumerate(stage1)
+        }
+
+        for result in stage1:
+            models[result["model"]]["durations"]["stage1"].append(result.get("duration_seconds", 0))
+
+        for result in stage2:
+            reviewer = models[result["model"]]
+            reviewer["durations"]["stage2"].append(result.get("duration_seconds", 0))
+            reviewer["reviews"] += 1
+            shown = result.get("reviewed_labels") or list(label_to_model)
+            if not _follows_ranking_format(result.get("ranking", ""), shown):
+                reviewer["parse_failures"] += 1
+
+        # The failed-synthesis fallback has no real duration
+        if stage3.get("model") not in (None, "error") and stage3.get("response") != SYNTHESIS_FAILED_RESPONSE:
+            models[stage3["model"]]["durations"]["stage3"].append(stage3.get("duration_seconds", 0))
+
+        aggregate = metadata.get("aggregate_rankings")
+        if aggregate is None:
+            aggregate = calculate_aggregate_rankings(stage2, label_to_model, weights={})
+        # Ranks are on a 1..N scale for N responses; normalize so rounds of
+        # different sizes (sub-councils, registry changes) can be averaged
+        response_count = len(label_to_model)
+        for position, entry in enumerate(aggregate):
+            stats = models[entry["model"]]
+            stats["rounds"] += 1
+            if response_count > 1:
+                stats["rank_sum"] += (entry["average_rank"] - 1) / (response_count - 1)
+            if position == 0:
+                stats["wins"] += 1
+
+    return {"rounds": rounds, "models": models}
+
+
+def _summarize_durations(durations: List[float]) -> Dict[str, Any]:
+    return {
+        "samples": len(durations),
+        "mean_seconds": round(sum(durations) / len(durations), 2),
+        "p50_seconds": round(percentile(durations, 50), 2),
+        "p95_seconds": round(percentile(durations, 95), 2),
+    }
+
+
+def compute() -> Dict[str, Any]:
+    """
+    Compute analytics over all stored conversations.
+
+    Only conversation files that changed since the last call are re-read.
+
+    Returns:
+        Dict with 'conversations', 'rounds', 'recomputed' (files re-read on
+        this call) and 'models', mapping model name to rounds, wins,
+        win_rate, average_rank (0 = always best, 1 = always worst), reviews,
+        parse_failures, parse_failure_rate and per-stage latency percentiles
+    """
+    partials, recomputed = storage.map_conversations_cached(_cache, _analyze_conversation)
+
+    # Merge the per-conversation partials
+    rounds = 0
+    totals: Dict[str, Dict[str, Any]] = defaultdict(_new_model_stats)
+    for partial in partials:
+        rounds += partial["rounds"]
+        for model, stats in partial["models"].items():
+            total = totals[model]
+            for key in ("rounds", "wins", "rank_sum", "reviews", "parse_failures"):
+                total[key] += stats[key]
+            for stage, durations in stats["durations"].items():
+                total["durations"][stage].extend(durations)
+
+    models = {}
+    for model, total in sorted(totals.items()):
+        models[model] = {
+            "rounds": total["rounds"],
+            "wins": total["wins"],
+            "win_rate": round(total["wins"] / total["rounds"], 3) if total["rounds"] else None,
+            "average_rank": round(total["rank_sum"] / total["rounds"], 3) if total["rounds"] else None,
+            "reviews": total["reviews"],
+            "parse_failures": total["parse_failures"],
+            "parse_failure_rate": round(total["parse_failures"] / total["reviews"], 3) if total["reviews"] else None,
+            "latency": {
+                stage: _summarize_durations(durations)
+                for stage, durations in sorted(total["durations"].items())
+                if durations
+            },
+        }
+
+    return {
+        "conversations": len(partials),
+        "rounds": rounds,
+        "recomputed": recomputed,
+        "models": models,
+    }
+
+
+def main():
+    print(json.dumps(compute(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Council members - list of OpenRouter model identifiers
+# Council members - default council, used when there is no COUNCIL_FILE
 COUNCIL_MODELS = [
     {
         "model_name": "llama3.2:1b",
@@ -21,11 +21,105 @@ COUNCIL_MODELS = [
     }
 ]
 
-# Chairman model - synthesizes final response
+# Chairman model - synthesizes final response (default, see COUNCIL_FILE)
 CHAIRMAN_MODEL = {
     "model_name": "deepseek-r1:7b",
-    "flask_url": os.getenv("DEEPSEEK_URL")
+    "flask_url": os.getenv("DEEPSEEK_URL"),
+    "reasoning": True,
+    # Room for the Stage 3 prompt (question, responses, rankings) plus thinking
+    "num_ctx": 16384
 }
 
+# Runtime council registry (see backend/registry.py); re-read when the file changes
+COUNCIL_FILE = os.getenv("COUNCIL_FILE", "data/council.json")
+COUNCIL_ROUND_SIZE = int(os.getenv("COUNCIL_ROUND_SIZE", "0"))  # members per round (0 = all)
+STAGE2_REVIEW_SIZE = int(os.getenv("STAGE2_REVIEW_SIZE", "0"))  # responses per Stage 2 reviewer (0 = all)
+COUNCIL_CHECK_SECONDS = 2.0       # how often the file's modification time is checked
+
+# Bearer token for the admin API (GET/PUT /api/council); unset disables it
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Conversation titles: "heuristic" (instant keyword title) or "llm" (heuristic
+# first, then replaced by a title from the fastest healthy council member)
+TITLE_GENERATOR = os.getenv("TITLE_GENERATOR", "heuristic").lower()
+
+# Speculative chairman: draft Stage 3 from Stage 1 answers while Stage 2 runs,
+# then keep or revise the draft once the peer rankings are in
+SPECULATIVE_CHAIRMAN = os.getenv("SPECULATIVE_CHAIRMAN", "false").lower() == "true"
+
+# Reasoning models (config entries with "reasoning": True) emit <think> traces.
+# Ollama counts thinking against num_predict, so reasoning models get this many
+# extra tokens on top of the stage's num_predict (0 = don't cap them at all)
+REASONING_MAX_TOKENS = int(os.getenv("REASONING_MAX_TOKENS", "4096")) or None
+
+# Context window (num_ctx) used for every call to a model, in every stage and
+# the warm-up; a model config can override it with "num_ctx". Ollama reloads a
+# model whenever num_ctx changes, so each model keeps one size. Set the Flask
+# wrapper's NUM_CTX to the same value so its preloaded model is the one used.
+NUM_CTX = int(os.getenv("NUM_CTX", "8192"))
+
+# Ollama generation options per stage, passed through the Flask wrapper.
+# Per-call options override these. Output is bounded by num_predict and stop,
+# never by num_ctx (see NUM_CTX).
+GENERATION_PROFILES = {
+    "stage1": {"num_predict": 1024, "temperature": 0.7},
+    # Rankings end with an "END OF RANKING" line, so generation stops right after the list
+    "stage2": {"num_predict": 1024, "temperature": 0.2, "stop": ["END OF RANKING"]},
+    "stage3": {"num_predict": 1536, "temperature": 0.5},
+    "stage3_draft": {"num_predict": 1536, "temperature": 0.5},
+    "stage3_revision": {"num_predict": 1024, "temperature": 0.3},
+    "title": {"num_predict": 16, "temperature": 0.2, "stop": ["\n"]},
+}
+
+# Concurrent requests allowed per Flask endpoint (a model config can override
+# with "max_concurrency"); further calls queue by priority, fairly per conversation
+ENDPOINT_CONCURRENCY = int(os.getenv("ENDPOINT_CONCURRENCY", "2"))
+
+# Adaptive request deadlines, derived from recent latency per model and stage
+LATENCY_WINDOW = 50               # observations kept per (model, stage)
+LATENCY_MIN_SAMPLES = 5           # below this, DEFAULT_TIMEOUT_SECONDS is used
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("DEFAULT_TIMEOUT_SECONDS", "300"))
+MIN_TIMEOUT_SECONDS = float(os.getenv("MIN_TIMEOUT_SECONDS", "15"))
+MAX_TIMEOUT_SECONDS = float(os.getenv("MAX_TIMEOUT_SECONDS", "460"))
+TIMEOUT_SAFETY_FACTOR = float(os.getenv("TIMEOUT_SAFETY_FACTOR", "3"))
+
 # Data directory for conversation storage
-DATA_DIR = "data/conversations"
\ No newline at end of file
+DATA_DIR = "data/conversations"
+
+# Full-text search index over conversation history
+SEARCH_DB = "data/search.db"
+
+# Event logs of streamed rounds, for resuming with Last-Event-ID
+ROUNDS_DIR = "data/rounds"
+ROUND_EVENT_BUFFER = 100          # events kept in memory per round
+ROUND_RETENTION_SECONDS = 600     # finished rounds stay in memory this long
+ROUND_LOG_TTL_SECONDS = 86400     # on-disk event logs are deleted after this long
+ROUND_CLEANUP_SECONDS = 3600      # how often expired event logs are looked for
+
+# Durable queue for background council jobs
+JOBS_DB = "data/jobs.db"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS = 60            # a job is resumed elsewhere if its lease is not renewed
+JOB_POLL_INTERVAL = 1.0           # seconds between queue polls when idle
+
+# Number of uvicorn worker processes (state shared through data/ files and SQLite)
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Key-value store shared by all worker processes
+SHARED_DB = "data/shared.db"
+HEALTH_CACHE_SECONDS = 10         # endpoint health results are reused this long
+ROUND_STALE_SECONDS = 600         # a round log with no new events for this long is considered dead
+
+# Data directory for compressed reasoning traces (loaded on demand)
+REASONING_DIR = "data/reasoning"
+
+# A call whose model load took at least this long counts as a cold load in usage reports
+COLD_LOAD_SECONDS = 1.0
+
+# Startup: probe (and optionally warm) all endpoints before reporting ready.
+# Ready needs a healthy chairman and at least MIN_READY_MEMBERS council members.
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "true").lower() == "true"
+MIN_READY_MEMBERS = int(os.getenv("MIN_READY_MEMBERS", "1"))
+STARTUP_RETRY_SECONDS = 15        # endpoints are re-probed this often until ready
+READY_CHECK_SECONDS = 30          # and this often once ready, to drop readiness when they fail
+
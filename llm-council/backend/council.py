@@ -1,24 +1,70 @@
 """3-stage LLM Council orchestration."""
 
-from typing import List, Dict, Any, Tuple
+import asyncio
+import math
+import random
+import re
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple, Optional, AsyncIterator
 from .flask import query_models_parallel, query_model
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
+from .config import SPECULATIVE_CHAIRMAN, STAGE2_REVIEW_SIZE
+from .singleflight import SingleFlight
+from . import registry, usage
 
+# Identical questions asked concurrently share one council round
+_inflight_rounds = SingleFlight()
 
-async def stage1_collect_responses(user_query: str) -> List[Dict[str, Any]]:
+# Matches an anonymized response label ("Response A", ..., "Response AB")
+LABEL_PATTERN = r'Response [A-Z]+\b'
+
+# Sharded Stage 2: minimum number of reviewers that rank each response
+MIN_REVIEWS_PER_RESPONSE = 2
+
+# Stage 3 response stored when the chairman could not be reached
+SYNTHESIS_FAILED_RESPONSE = "Error: Unable to generate final synthesis."
+
+
+def response_label(index: int) -> str:
+    """
+    Anonymized label letter(s) for the response at an index.
+
+    A..Z, then AA, AB, ... so councils are not limited to 26 members.
+
+    Args:
+        index: Zero-based response index
+
+    Returns:
+        Label such as 'A', 'Z' or 'AA'
+    """
+    label = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+async def stage1_collect_responses(
+    user_query: str,
+    members: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
     """
-    Stage 1: Collect individual responses from all council models.
+    Stage 1: Collect individual responses from the council models of this round.
 
     Args:
         user_query: The user's question
+        members: Council members to ask (default: sampled from the registry)
 
     Returns:
         List of dicts with 'model' and 'response' keys
     """
     messages = [{"role": "user", "content": user_query}]
 
+    if members is None:
+        members = await registry.select_members()
+
     # Query all models in parallel
-    responses = await query_models_parallel(COUNCIL_MODELS, messages)
+    responses = await query_models_parallel(members, messages, stage="stage1")
 
     # Format results
     stage1_results = []
@@ -27,42 +73,31 @@ async def stage1_collect_responses(user_query: str) -> List[Dict[str, Any]]:
             stage1_results.append({
                 "model": model,
                 "response": response.get('content', ''),
-                "duration_seconds": response.get('duration_seconds', 0)
+                "reasoning": response.get('reasoning'),
+                "duration_seconds": response.get('duration_seconds', 0),
+                "usage": response.get('usage')
             })
 
     return stage1_results
 
 
-async def stage2_collect_rankings(
-    user_query: str,
-    stage1_results: List[Dict[str, Any]]
-) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+def build_ranking_prompt(user_query: str, labeled_responses: List[Tuple[str, Dict[str, Any]]]) -> str:
     """
-    Stage 2: Each model ranks the anonymized responses.
+    Build the Stage 2 prompt asking a reviewer to rank anonymized responses.
 
     Args:
         user_query: The original user query
-        stage1_results: Results from Stage 1
+        labeled_responses: (label, Stage 1 result) pairs shown to the reviewer
 
     Returns:
-        Tuple of (rankings list, label_to_model mapping)
+        Prompt text
     """
-    # Create anonymized labels for responses (Response A, Response B, etc.)
-    labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
-
-    # Create mapping from label to model name
-    label_to_model = {
-        f"Response {label}": result['model']
-        for label, result in zip(labels, stage1_results)
-    }
-
-    # Build the ranking prompt
     responses_text = "\n\n".join([
         f"Response {label}:\n{result['response']}"
-        for label, result in zip(labels, stage1_results)
+        for label, result in labeled_responses
     ])
 
-    ranking_prompt = f"""You are evaluating different responses to the following question:
+    return f"""You are evaluating different responses to the following question:
 
 Question: {user_query}
 
@@ -79,6 +114,7 @@ IMPORTANT: Your final ranking MUST be formatted EXACTLY as follows:
 - Then list the responses from best to worst as a numbered list
 - Each line should be: number, period, space, then ONLY the response label (e.g., "1. Response A")
 - Do not add any other text or explanations in the ranking section
+- End with the line "END OF RANKING"
 
 Example of the correct format for your ENTIRE response:
 
@@ -90,17 +126,111 @@ FINAL RANKING:
 1. Response C
 2. Response A
 3. Response B
+END OF RANKING
 
 Now provide your evaluation and ranking:"""
 
-    messages = [{"role": "user", "content": ranking_prompt}]
 
-    # Get rankings from all council models in parallel
-    responses = await query_models_parallel(COUNCIL_MODELS, messages)
+def assign_review_shards(
+    response_count: int,
+    reviewer_count: int,
+    review_size: int
+) -> List[List[int]]:
+    """
+    Assign each Stage 2 reviewer the responses it ranks.
+
+    With review_size 0 (or at least the number of responses) every reviewer
+    ranks every response. Otherwise each reviewer gets review_size responses
+    (raised if needed so each response gets MIN_REVIEWS_PER_RESPONSE reviews),
+    chosen greedily as a balanced incomplete block design: responses with the
+    fewest reviews so far first, then those that have appeared least often
+    together with the ones already in the shard, so positions from different
+    shards can be compared.
+
+    Args:
+        response_count: Number of Stage 1 responses
+        reviewer_count: Number of reviewers
+        review_size: Responses per reviewer (0 = all)
+
+    Returns:
+        List (one per reviewer) of sorted response indices
+    """
+    size = review_size
+    if 0 < size < response_count and reviewer_count:
+        size = max(size, math.ceil(MIN_REVIEWS_PER_RESPONSE * response_count / reviewer_count))
+    if size <= 0 or size >= response_count:
+        return [list(range(response_count)) for _ in range(reviewer_count)]
+
+    review_counts = [0] * response_count
+    pair_counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    shards = []
+    for _ in range(reviewer_count):
+        shard: List[int] = []
+        for _ in range(size):
+            candidates = [index for index in range(response_count) if index not in shard]
+            best = min(candidates, key=lambda index: (
+                review_counts[index],
+                sum(pair_counts[(min(index, other), max(index, other))] for other in shard),
+                random.random()
+            ))
+            shard.append(best)
+        for position, index in enumerate(shard):
+            review_counts[index] += 1
+            for other in shard[position + 1:]:
+                pair_counts[(min(index, other), max(index, other))] += 1
+        shards.append(sorted(shard))
+    return shards
+
+
+async def stage2_collect_rankings(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    reviewers: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Stage 2: Each model ranks the anonymized responses.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Results from Stage 1
+        reviewers: Members that rank (default: the members that answered in Stage 1)
+
+    Returns:
+        Tuple of (rankings list, label_to_model mapping)
+    """
+    if reviewers is None:
+        reviewers = registry.members_by_name([result['model'] for result in stage1_results])
+
+    # Create anonymized labels for responses (Response A, Response B, ..., Response AA, ...)
+    labels = [response_label(i) for i in range(len(stage1_results))]
+
+    # Create mapping from label to model name
+    label_to_model = {
+        f"Response {label}": result['model']
+        for label, result in zip(labels, stage1_results)
+    }
+
+    # Each reviewer ranks its shard of the responses (all of them unless sharded)
+    review_size = registry.get_registry().get("review_size", STAGE2_REVIEW_SIZE)
+    shards = assign_review_shards(len(stage1_results), len(reviewers), review_size)
+
+    # Get rankings from the reviewers in parallel
+    responses = await asyncio.gather(*[
+        query_model(
+            reviewer,
+            [{"role": "user", "content": build_ranking_prompt(
+                user_query,
+                [(labels[i], stage1_results[i]) for i in shard]
+            )}],
+            stage="stage2"
+        )
+        for reviewer, shard in zip(reviewers, shards)
+    ])
 
     # Format results
     stage2_results = []
-    for model, response in responses.items():
+    for reviewer, shard, response in zip(reviewers, shards, responses):
+        model = reviewer['model_name']
         if response is not None:
             full_text = response.get('content', '')
             parsed = parse_ranking_from_text(full_text)
@@ -108,7 +238,10 @@ Now provide your evaluation and ranking:"""
                 "model": model,
                 "ranking": full_text,
                 "parsed_ranking": parsed,
-                "duration_seconds": response.get('duration_seconds', 0)
+                "reviewed_labels": [f"Response {labels[i]}" for i in shard],
+                "reasoning": response.get('reasoning'),
+                "duration_seconds": response.get('duration_seconds', 0),
+                "usage": response.get('usage')
             })
         else:
             print(f"WARNING: Model {model} returned None for Stage 2 ranking")
@@ -163,23 +296,207 @@ Provide a clear, well-reasoned final answer that represents the council's collec
     messages = [{"role": "user", "content": chairman_prompt}]
 
     # Query the chairman model
-    response = await query_model(CHAIRMAN_MODEL, messages)
+    chairman = registry.chairman()
+    response = await query_model(chairman, messages, stage="stage3")
 
     if response is None:
         # Fallback if chairman fails
         return {
-            "model": CHAIRMAN_MODEL['model_name'],
-            "response": "Error: Unable to generate final synthesis.",
+            "model": chairman['model_name'],
+            "response": SYNTHESIS_FAILED_RESPONSE,
             "duration_seconds": 0
         }
 
     return {
-        "model": CHAIRMAN_MODEL['model_name'],
+        "model": chairman['model_name'],
+        "response": response.get('content', ''),
+        "reasoning": response.get('reasoning'),
+        "duration_seconds": response.get('duration_seconds', 0),
+        "usage": response.get('usage')
+    }
+
+
+async def stage3_draft_from_stage1(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Speculative Stage 3: Chairman drafts a final answer from Stage 1 alone.
+
+    Runs concurrently with Stage 2. The chairman is asked to name the response
+    its draft relies on most, so the draft can later be checked against the
+    peer consensus.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+
+    Returns:
+        Dict with 'model', 'response', 'primary_source' and 'duration_seconds'
+        keys, or None if the chairman failed
+    """
+    # Use the same anonymized labels as Stage 2
+    labels = [response_label(i) for i in range(len(stage1_results))]
+
+    responses_text = "\n\n".join([
+        f"Response {label}:\n{result['response']}"
+        for label, result in zip(labels, stage1_results)
+    ])
+
+    draft_prompt = f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question.
+
+Original Question: {user_query}
+
+Here are the responses from different models (anonymized):
+
+{responses_text}
+
+Your task as Chairman is to synthesize these responses into a single, comprehensive, accurate answer to the user's original question.
+
+IMPORTANT: After your answer, add one last line formatted EXACTLY as follows, naming the response your answer relies on most:
+PRIMARY SOURCE: Response X
+
+Provide your answer now:"""
+
+    messages = [{"role": "user", "content": draft_prompt}]
+
+    chairman = registry.chairman()
+    response = await query_model(chairman, messages, stage="stage3_draft")
+
+    if response is None:
+        return None
+
+    content = response.get('content', '')
+    match = re.search(r'PRIMARY SOURCE:\s*(' + LABEL_PATTERN + ')', content)
+    primary_source = match.group(1) if match else None
+    if match:
+        # Drop the marker line from the user-facing answer
+        content = content[:match.start()].rstrip()
+
+    return {
+        "model": chairman['model_name'],
+        "response": content,
+        "primary_source": primary_source,
+        "reasoning": response.get('reasoning'),
+        "duration_seconds": response.get('duration_seconds', 0),
+        "usage": response.get('usage')
+    }
+
+
+async def stage3_finalize_speculative(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    draft: Optional[Dict[str, Any]],
+    label_to_model: Dict[str, str],
+    aggregate_rankings: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Speculative Stage 3: keep or revise the chairman's draft after Stage 2.
+
+    The draft is kept when its primary source is the response the council
+    ranked best (or when there is no usable consensus). Otherwise the chairman
+    runs a short revision pass over its own draft instead of a full synthesis.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+        stage2_results: Rankings from Stage 2
+        draft: Result of stage3_draft_from_stage1 (or None if it failed)
+        label_to_model: Mapping from anonymous labels to model names
+        aggregate_rankings: Aggregate rankings computed from Stage 2
+
+    Returns:
+        Dict with 'model', 'response', 'speculative' and 'duration_seconds' keys
+    """
+    if draft is None:
+        # Draft failed, fall back to the regular synthesis
+        result = await stage3_synthesize_final(user_query, stage1_results, stage2_results)
+        result["speculative"] = "fallback"
+        return result
+
+    premise_model = label_to_model.get(draft.get("primary_source"))
+    consensus_model = aggregate_rankings[0]['model'] if aggregate_rankings else None
+
+    if consensus_model is None or premise_model == consensus_model:
+        return {
+            "model": draft['model'],
+            "response": draft['response'],
+            "speculative": "kept",
+            "reasoning": draft.get('reasoning'),
+            "duration_seconds": draft['duration_seconds'],
+            "usage": draft.get('usage')
+        }
+
+    # The council preferred a different answer: revise the draft
+    consensus_response = next(
+        (result['response'] for result in stage1_results if result['model'] == consensus_model),
+        ''
+    )
+    rankings_text = "\n".join([
+        f"{position}. {entry['model']} (average rank {entry['average_rank']})"
+        for position, entry in enumerate(aggregate_rankings, start=1)
+    ])
+
+    revision_prompt = f"""You are the Chairman of an LLM Council. You drafted an answer before the council finished ranking the responses, and the council preferred a different response than the one your draft relied on.
+
+Original Question: {user_query}
+
+Your draft:
+{draft['response']}
+
+Council ranking (best first):
+{rankings_text}
+
+Response ranked best by the council:
+{consensus_response}
+
+Revise your draft so it reflects the council's preferred response where it is more accurate or insightful. Keep whatever in your draft is still correct. Provide only the revised final answer:"""
+
+    messages = [{"role": "user", "content": revision_prompt}]
+
+    chairman = registry.chairman()
+    response = await query_model(chairman, messages, stage="stage3_revision")
+
+    if response is None:
+        # Revision failed, the draft is still a usable answer
+        return {
+            "model": draft['model'],
+            "response": draft['response'],
+            "speculative": "kept",
+            "reasoning": draft.get('reasoning'),
+            "duration_seconds": draft['duration_seconds'],
+            "usage": draft.get('usage')
+        }
+
+    return {
+        "model": chairman['model_name'],
         "response": response.get('content', ''),
-        "duration_seconds": response.get('duration_seconds', 0)
+        "speculative": "revised",
+        "reasoning": response.get('reasoning'),
+        "duration_seconds": round(draft['duration_seconds'] + response.get('duration_seconds', 0), 2),
+        # Both chairman calls (draft and revision) count towards Stage 3
+        "usage": usage.combine([draft.get('usage'), response.get('usage')])
     }
 
 
+def strip_reasoning(results: Any) -> Any:
+    """
+    Drop reasoning traces from stage results before they leave the backend.
+
+    Args:
+        results: A stage result dict or a list of them
+
+    Returns:
+        Copies of the results without their 'reasoning' keys
+    """
+    if isinstance(results, list):
+        return [strip_reasoning(result) for result in results]
+    if isinstance(results, dict):
+        return {key: value for key, value in results.items() if key != 'reasoning'}
+    return results
+
+
 def parse_ranking_from_text(ranking_text: str) -> List[str]:
     """
     Parse the FINAL RANKING section from the model's response.
@@ -190,8 +507,6 @@ def parse_ranking_from_text(ranking_text: str) -> List[str]:
     Returns:
         List of response labels in ranked order
     """
-    import re
-
     # Look for "FINAL RANKING:" section
     if "FINAL RANKING:" in ranking_text:
         # Extract everything after "FINAL RANKING:"
@@ -200,55 +515,72 @@ def parse_ranking_from_text(ranking_text: str) -> List[str]:
             ranking_section = parts[1]
             # Try to extract numbered list format (e.g., "1. Response A")
             # This pattern looks for: number, period, optional space, "Response X"
-            numbered_matches = re.findall(r'\d+\.\s*Response [A-Z]', ranking_section)
+            numbered_matches = re.findall(r'\d+\.\s*' + LABEL_PATTERN, ranking_section)
             if numbered_matches:
                 # Extract just the "Response X" part
-                return [re.search(r'Response [A-Z]', m).group() for m in numbered_matches]
+                return [re.search(LABEL_PATTERN, m).group() for m in numbered_matches]
 
             # Fallback: Extract all "Response X" patterns in order
-            matches = re.findall(r'Response [A-Z]', ranking_section)
+            matches = re.findall(LABEL_PATTERN, ranking_section)
             return matches
 
     # Fallback: try to find any "Response X" patterns in order
-    matches = re.findall(r'Response [A-Z]', ranking_text)
+    matches = re.findall(LABEL_PATTERN, ranking_text)
     return matches
 
 
 def calculate_aggregate_rankings(
     stage2_results: List[Dict[str, Any]],
-    label_to_model: Dict[str, str]
+    label_to_model: Dict[str, str],
+    weights: Optional[Dict[str, float]] = None
 ) -> List[Dict[str, Any]]:
     """
     Calculate aggregate rankings across all models.
 
+    Reviewers may have ranked only a shard of the responses (see
+    assign_review_shards). Each position is normalized to [0, 1] over the
+    number of responses that reviewer was shown, averaged, and mapped back
+    to the 1..N rank scale, so full and partial rankings combine
+    consistently (for full rankings this is the plain average position).
+
     Args:
         stage2_results: Rankings from each model
         label_to_model: Mapping from anonymous labels to model names
+        weights: Reviewer model name -> vote weight (default: registry weights)
 
     Returns:
-        List of dicts with model name and average rank, sorted best to worst
+        List of dicts with model name and (weighted) average rank, sorted best to worst
     """
-    from collections import defaultdict
-
-    # Track positions for each model
+    # Track (normalized position, reviewer weight) for each model
     model_positions = defaultdict(list)
+    response_count = len(label_to_model)
 
     for ranking in stage2_results:
         ranking_text = ranking['ranking']
+        reviewer = ranking.get('model')
+        weight = weights.get(reviewer, 1.0) if weights is not None else registry.weight(reviewer)
+
+        # Only labels the reviewer was shown count, each once
+        shown = ranking.get('reviewed_labels') or list(label_to_model)
+        if len(shown) < 2 and response_count > 1:
+            continue
 
         # Parse the ranking from the structured format
-        parsed_ranking = parse_ranking_from_text(ranking_text)
+        parsed_ranking = []
+        for label in parse_ranking_from_text(ranking_text):
+            if label in label_to_model and label in shown and label not in parsed_ranking:
+                parsed_ranking.append(label)
 
-        for position, label in enumerate(parsed_ranking, start=1):
-            if label in label_to_model:
-                model_name = label_to_model[label]
-                model_positions[model_name].append(position)
+        for position, label in enumerate(parsed_ranking):
+            normalized = position / (len(shown) - 1) if len(shown) > 1 else 0.0
+            model_positions[label_to_model[label]].append((normalized, weight))
 
     # Calculate average position for each model
     aggregate = []
     for model, positions in model_positions.items():
         if positions:
-            avg_rank = sum(positions) / len(positions)
+            normalized = sum(position * weight for position, weight in positions) / sum(weight for _, weight in positions)
+            avg_rank = 1 + normalized * (response_count - 1)
             aggregate.append({
                 "model": model,
                 "average_rank": round(avg_rank, 2),
@@ -261,81 +593,160 @@ def calculate_aggregate_rankings(
     return aggregate
 
 
-async def generate_conversation_title(user_query: str) -> str:
+async def run_full_council(
+    user_query: str,
+    speculative: bool = SPECULATIVE_CHAIRMAN
+) -> Tuple[List, List, Dict, Dict]:
     """
-    Generate a short title for a conversation based on the first user message.
+    Run the complete 3-stage council process.
+
+    Concurrent calls with the same question share a single round.
 
     Args:
-        user_query: The first user message
+        user_query: The user's question
+        speculative: Let the chairman draft from Stage 1 while Stage 2 runs
 
     Returns:
-        A short title (3-5 words)
+        Tuple of (stage1_results, stage2_results, stage3_result, metadata)
     """
-    title_prompt = f"""Generate a very short title (3-5 words maximum) that summarizes the following question.
-The title should be concise and descriptive. Do not use quotes or punctuation in the title.
-
-Question: {user_query}
-
-Title:"""
+    return await _inflight_rounds.do(
+        ("full", user_query.strip(), speculative),
+        lambda: _run_full_council(user_query, speculative)
+    )
 
-    messages = [{"role": "user", "content": title_prompt}]
 
-    # Use the chairman model for title generation
-    response = await query_model(CHAIRMAN_MODEL, messages)
+async def _run_full_council(user_query: str, speculative: bool) -> Tuple[List, List, Dict, Dict]:
+    """Run one (uncoalesced) 3-stage council round."""
+    # Stage 1: Collect individual responses
+    stage1_results = await stage1_collect_responses(user_query)
 
-    if response is None:
-        # Fallback to a generic title
-        return "New Conversation"
+    # If no models responded successfully, return error
+    if not stage1_results:
+        return [], [], {
+            "model": "error",
+            "response": "All models failed to respond. Please try again."
+        }, {}
 
-    title = response.get('content', 'New Conversation').strip()
+    # Speculative mode: start the chairman's draft alongside Stage 2
+    draft_task = None
+    if speculative:
+        draft_task = asyncio.create_task(stage3_draft_from_stage1(user_query, stage1_results))
+
+    try:
+        # Stage 2: Collect rankings
+        stage2_results, label_to_model = await stage2_collect_rankings(user_query, stage1_results)
+
+        # Calculate aggregate rankings (and feed them into member quality for sampling)
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        registry.record_rankings(aggregate_rankings)
+
+        # Stage 3: Synthesize final answer (or keep/revise the speculative draft)
+        if draft_task:
+            stage3_result = await stage3_finalize_speculative(
+                user_query,
+                stage1_results,
+                stage2_results,
+                await draft_task,
+                label_to_model,
+                aggregate_rankings
+            )
+        else:
+            stage3_result = await stage3_synthesize_final(
+                user_query,
+                stage1_results,
+                stage2_results
+            )
+    finally:
+        # Don't leave the draft running if Stage 2 failed or the round was cancelled
+        if draft_task and not draft_task.done():
+            draft_task.cancel()
 
-    # Clean up the title - remove quotes, limit length
-    title = title.strip('"\'')
+    # Prepare metadata
+    metadata = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": aggregate_rankings,
+        "usage": usage.round_usage(stage1_results, stage2_results, stage3_result)
+    }
 
-    # Truncate if too long
-    if len(title) > 50:
-        title = title[:47] + "..."
+    return stage1_results, stage2_results, stage3_result, metadata
 
-    return title
 
 
-async def run_full_council(user_query: str) -> Tuple[List, List, Dict, Dict]:
+def subscribe_council_events(
+    user_query: str,
+    speculative: bool = SPECULATIVE_CHAIRMAN
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Run the complete 3-stage council process.
+    Subscribe to the stage events of a council round for a question.
+
+    Concurrent subscribers asking the same question share one round and all
+    receive the same events, including those emitted before they subscribed.
 
     Args:
         user_query: The user's question
+        speculative: Let the chairman draft from Stage 1 while Stage 2 runs
 
     Returns:
-        Tuple of (stage1_results, stage2_results, stage3_result, metadata)
+        Async iterator over event dicts (see stream_council_events)
     """
-    # Stage 1: Collect individual responses
-    stage1_results = await stage1_collect_responses(user_query)
+    return _inflight_rounds.stream(
+        ("stream", user_query.strip(), speculative),
+        lambda: stream_council_events(user_query, speculative)
+    )
 
-    # If no models responded successfully, return error
-    if not stage1_results:
-        return [], [], {
-            "model": "error",
-            "response": "All models failed to respond. Please try again."
-        }, {}
 
-    # Stage 2: Collect rankings
-    stage2_results, label_to_model = await stage2_collect_rankings(user_query, stage1_results)
+async def stream_council_events(
+    user_query: str,
+    speculative: bool = SPECULATIVE_CHAIRMAN
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the 3-stage council process, yielding an event as each stage starts and completes.
 
-    # Calculate aggregate rankings
-    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+    Args:
+        user_query: The user's question
+        speculative: Let the chairman draft from Stage 1 while Stage 2 runs
 
-    # Stage 3: Synthesize final answer
-    stage3_result = await stage3_synthesize_final(
-        user_query,
-        stage1_results,
-        stage2_results
-    )
+    Yields:
+        Event dicts with a 'type' key ('stage1_start', 'stage1_complete', ...)
+        and, for completions, the stage results under 'data'
+    """
+    # Stage 1: Collect responses
+    yield {'type': 'stage1_start'}
+    stage1_results = await stage1_collect_responses(user_query)
+    yield {'type': 'stage1_complete', 'data': stage1_results}
+
+    # Speculative mode: chairman drafts while Stage 2 runs
+    draft_task = None
+    if speculative and stage1_results:
+        draft_task = asyncio.create_task(stage3_draft_from_stage1(user_query, stage1_results))
+
+    try:
+        # Stage 2: Collect rankings
+        yield {'type': 'stage2_start'}
+        stage2_results, label_to_model = await stage2_collect_rankings(user_query, stage1_results)
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        registry.record_rankings(aggregate_rankings)
+        yield {
+            'type': 'stage2_complete',
+            'data': stage2_results,
+            'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}
+        }
 
-    # Prepare metadata
-    metadata = {
-        "label_to_model": label_to_model,
-        "aggregate_rankings": aggregate_rankings
+        # Stage 3: Synthesize final answer
+        yield {'type': 'stage3_start'}
+        if draft_task:
+            stage3_result = await stage3_finalize_speculative(
+                user_query, stage1_results, stage2_results,
+                await draft_task, label_to_model, aggregate_rankings
+            )
+        else:
+            stage3_result = await stage3_synthesize_final(user_query, stage1_results, stage2_results)
+    finally:
+        # Don't leave the draft running if Stage 2 failed or the stream was closed
+        if draft_task and not draft_task.done():
+            draft_task.cancel()
+    yield {
+        'type': 'stage3_complete',
+        'data': stage3_result,
+        'metadata': {'usage': usage.round_usage(stage1_results, stage2_results, stage3_result)}
     }
-
-    return stage1_results, stage2_results, stage3_result, metadata
@@ -1,25 +1,164 @@
 """Flask API client for making LLM requests."""
 
+import asyncio
 import httpx
+import json
+import re
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple
+from . import latency, scheduler, usage
+from .config import REASONING_MAX_TOKENS, GENERATION_PROFILES, NUM_CTX
+from .singleflight import SingleFlight
+
+# Identical concurrent model calls share one request
+_inflight = SingleFlight()
+
+# Shared connection pool, opened at startup (see open_client)
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def open_client():
+    """Open the shared connection pool used for all Flask API requests."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+
+
+async def close_client():
+    """Close the shared connection pool."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@asynccontextmanager
+async def _http_client():
+    """Use the shared pool if it is open, otherwise a one-off client (e.g. in scripts)."""
+    if _client is not None:
+        yield _client
+    else:
+        async with httpx.AsyncClient(timeout=None) as client:
+            yield client
+
+
+def split_reasoning(text: str) -> Tuple[Optional[str], str]:
+    """
+    Split a reasoning model's output into its thinking trace and its answer.
+
+    Handles a complete <think>...</think> block, a closing tag without an
+    opening one (when the chat template opens the block), and an unclosed
+    block (generation cut off while still thinking).
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Tuple of (thinking trace or None, answer)
+    """
+    match = re.search(r'<think>(.*?)</think>', text, re.DOTALL)
+    if match:
+        thinking = match.group(1).strip()
+        answer = text[:match.start()] + text[match.end():]
+        return thinking or None, answer.strip()
+
+    if '</think>' in text:
+        thinking, answer = text.split('</think>', 1)
+        return thinking.strip() or None, answer.strip()
+
+    if '<think>' in text:
+        before, thinking = text.split('<think>', 1)
+        return thinking.strip() or None, before.strip()
+
+    return None, text
 
 
 async def query_model(
     model_config: Dict[str, str],
-    messages: List[Dict[str, str]]
+    messages: List[Dict[str, str]],
+    options: Optional[Dict[str, Any]] = None,
+    stage: str = "default"
 ) -> Optional[Dict[str, Any]]:
     """
     Query a single model via Flask API.
 
+    Concurrent calls with the same model, endpoint, messages and options are
+    coalesced into a single request whose result is shared. Each request gets
+    an adaptive deadline from the model's recent latency for this stage.
+
     Args:
-        model_config: Dict with 'model_name' and 'flask_url' keys
+        model_config: Dict with 'model_name' and 'flask_url' keys (and
+            optionally 'num_ctx', default NUM_CTX)
         messages: List of message dicts with 'role' and 'content'
+        options: Optional Ollama generation options, overriding the stage's
+            profile; num_ctx always comes from the model config
+        stage: Stage the call belongs to, used for its generation profile,
+            latency stats and deadline
 
     Returns:
-        Response dict with 'content' and 'duration_seconds', or None if failed
+        Response dict with 'content', 'reasoning', 'duration_seconds' and
+        'usage' (token counts and timings, see usage.from_response), or None
+        if failed. 'content' never includes the thinking trace.
     """
-    
+    options = {**GENERATION_PROFILES.get(stage, {}), **(options or {})}
+    # One context size per model in every stage, so Ollama never reloads it
+    options['num_ctx'] = model_config.get('num_ctx', NUM_CTX)
+
+    key = (
+        model_config.get('model_name'),
+        model_config.get('flask_url'),
+        json.dumps(messages, sort_keys=True),
+        json.dumps(options, sort_keys=True)
+    )
+    response = await _inflight.do(key, lambda: _query_model(model_config, messages, options, stage))
+    # Hand each caller its own copy of the shared result
+    return dict(response) if response is not None else None
+
+
+def _check_context(options: Dict[str, Any], prompt_chars: int, model_name: str, stage: str) -> bool:
+    """
+    Warn when the prompt plus the output budget does not fit in num_ctx.
+
+    Ollama drops the start of a prompt that does not fit, which for Stage 2
+    and 3 means losing the question and the first responses. num_ctx is not
+    grown per call, since every change reloads the model; raise the model's
+    num_ctx (or NUM_CTX) instead.
+
+    Args:
+        options: Generation options (num_ctx, num_predict)
+        prompt_chars: Total characters of the prompt messages
+        model_name: Model name, for the warning
+        stage: Stage of the call, for the warning
+
+    Returns:
+        True if the call fits
+    """
+    num_ctx = options.get('num_ctx')
+    if not num_ctx:
+        return True
+
+    needed = prompt_chars // latency.CHARS_PER_TOKEN + (options.get('num_predict') or 0)
+    if needed <= num_ctx:
+        return True
+    budget = "an uncapped output" if options.get('num_predict') is None else f"{options['num_predict']} output tokens"
+    print(
+        f"WARNING: {stage} prompt for {model_name} (~{prompt_chars // latency.CHARS_PER_TOKEN} tokens) "
+        f"plus {budget} exceeds num_ctx {num_ctx}; the prompt may be truncated"
+    )
+    return False
+
+
+async def _query_model(
+    model_config: Dict[str, str],
+    messages: List[Dict[str, str]],
+    options: Optional[Dict[str, Any]] = None,
+    stage: str = "default"
+) -> Optional[Dict[str, Any]]:
+    """Send a single (uncoalesced) request to a model's Flask API."""
     flask_url = model_config['flask_url']
     chat_endpoint = f"{flask_url}/chat"
     
@@ -31,43 +170,86 @@ async def query_model(
         "messages": messages,
     }
 
-    start_time = time.time()
-    
-    try:
-        # Set timeout to None to let Flask API handle its own timeout
-        async with httpx.AsyncClient(timeout=None) as client:
-            response = await client.post(
-                chat_endpoint,
-                headers=headers,
-                json=payload
-            )
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            response.raise_for_status()
+    options = dict(options or {})
+    if model_config.get('reasoning'):
+        # Ask Ollama to return the trace separately from the answer
+        payload['think'] = True
+        # Thinking counts against num_predict: add the thinking budget, or lift the cap
+        if REASONING_MAX_TOKENS:
+            options['num_predict'] = options.get('num_predict', 0) + REASONING_MAX_TOKENS
+        else:
+            options.pop('num_predict', None)
+
+    model_name = model_config.get('model_name', 'unknown')
+    prompt_chars = sum(len(message.get('content', '')) for message in messages)
+    _check_context(options, prompt_chars, model_name, stage)
+    if options:
+        payload['options'] = options
+
+    # Adaptive deadline, passed on so the wrapper stops Ollama's generation too
+    timeout = await asyncio.to_thread(latency.deadline, model_name, stage, prompt_chars, options.get('num_predict'))
+    payload['timeout'] = timeout
+
+    # Wait for a slot on the endpoint (by priority, fair across conversations)
+    async with scheduler.slot(model_config):
+        start_time = time.time()
+
+        try:
+            async with _http_client() as client:
+                # Allow a little slack over the wrapper's own deadline for the round trip
+                response = await client.post(
+                    chat_endpoint,
+                    headers=headers,
+                    json=payload,
+                    timeout=timeout + 5
+                )
+                end_time = time.time()
+                duration = end_time - start_time
+
+                if response.status_code == 504:
+                    await asyncio.to_thread(latency.record, model_name, stage, timeout, prompt_chars, 0, timed_out=True)
 
-            data = response.json()
-            
-            content = data['message']['content']
+                response.raise_for_status()
 
-            return {
-                'content': content,
-                'duration_seconds': round(duration, 2)
-            }
+                data = response.json()
 
-    except Exception as e:
-        end_time = time.time()
-        duration = end_time - start_time
-        print(f"Error querying model {model_config.get('model_name', 'unknown')} at {flask_url}: {e}")
-        print(f"Request took {duration:.2f}s before failing")
-        import traceback
-        traceback.print_exc()
-        return None
+                message = data['message']
+                reasoning, content = split_reasoning(message['content'])
+                # Ollama returns the trace in 'thinking' when think is enabled
+                reasoning = message.get('thinking') or reasoning
+
+                output_chars = len(message['content']) + len(message.get('thinking') or '')
+                await asyncio.to_thread(latency.record, model_name, stage, duration, prompt_chars, output_chars)
+
+                return {
+                    'content': content,
+                    'reasoning': reasoning,
+                    'duration_seconds': round(duration, 2),
+                    'usage': usage.from_response(data)
+                }
+
+        except httpx.TimeoutException:
+            duration = time.time() - start_time
+            # Capped at the deadline: the extra is round-trip slack, not generation time
+            await asyncio.to_thread(latency.record, model_name, stage, min(duration, timeout), prompt_chars, 0, timed_out=True)
+            print(f"Timeout querying model {model_name} at {flask_url} after {duration:.2f}s (deadline {timeout}s)")
+            return None
+
+        except Exception as e:
+            end_time = time.time()
+            duration = end_time - start_time
+            print(f"Error querying model {model_config.get('model_name', 'unknown')} at {flask_url}: {e}")
+            print(f"Request took {duration:.2f}s before failing")
+            import traceback
+            traceback.print_exc()
+            return None
 
 
 async def query_models_parallel(
     model_configs: List[Dict[str, str]],
-    messages: List[Dict[str, str]]
+    messages: List[Dict[str, str]],
+    options: Optional[Dict[str, Any]] = None,
+    stage: str = "default"
 ) -> Dict[str, Optional[Dict[str, Any]]]:
     """
     Query multiple models in parallel.
@@ -75,6 +257,8 @@ async def query_models_parallel(
     Args:
         model_configs: List of model config dicts with 'model_name' and 'flask_url'
         messages: List of message dicts to send to each model
+        options: Optional Ollama generation options
+        stage: Stage the calls belong to
 
     Returns:
         Dict mapping model name to response dict (or None if failed)
@@ -82,7 +266,7 @@ async def query_models_parallel(
     import asyncio
 
     # Create tasks for all models
-    tasks = [query_model(model_config, messages) for model_config in model_configs]
+    tasks = [query_model(model_config, messages, options, stage) for model_config in model_configs]
 
     # Wait for all to complete
     responses = await asyncio.gather(*tasks)
@@ -104,8 +288,8 @@ async def check_model_health(flask_url: str) -> bool:
     health_endpoint = f"{flask_url}/health"
     
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(health_endpoint)
+        async with _http_client() as client:
+            response = await client.get(health_endpoint, timeout=5.0)
             return response.status_code == 200
     except Exception:
         return False
@@ -131,3 +315,29 @@ async def check_all_models_health(model_configs: List[Dict[str, str]]) -> Dict[s
     
     # Map model names to their health status
     return {config['model_name']: status for config, status in zip(model_configs, health_statuses)}
+
+
+async def warm_up_model(model_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Probe a model endpoint and, if healthy, warm it with a one-token generation.
+
+    Args:
+        model_config: Model config dict with 'model_name' and 'flask_url'
+
+    Returns:
+        Dict with 'healthy', 'warm' and 'seconds' keys
+    """
+    start_time = time.time()
+    healthy = await check_model_health(model_config['flask_url'])
+    warm = False
+    if healthy:
+        # Without thinking, so the single token is not spent inside a <think> block
+        response = await query_model(
+            {**model_config, 'reasoning': False},
+            [{"role": "user", "content": "Hi"}],
+            options={"num_predict": 1},
+            stage="warmup"
+        )
+        warm = response is not None
+    return {"healthy": healthy, "warm": warm, "seconds": round(time.time() - start_time, 2)}
+
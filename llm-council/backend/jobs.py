@@ -0,0 +1,374 @@
+"""Background council jobs backed by a durable SQLite queue.
+
+A job is one council round submitted for a conversation. Workers claim jobs
+with a lease, checkpoint the results of each stage into the queue, and renew
+the lease while they work. If the backend stops mid-round, the lease expires
+and the next worker to claim the job resumes at the first unfinished stage.
+
+Workers run inside each API process (JOB_WORKERS) and can also run as a
+standalone process, e.g. with JOB_WORKERS=0 on the API servers:
+
+    python -m backend.jobs --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import storage, titles, scheduler, usage, registry
+from .flask import open_client, close_client
+from .config import JOBS_DB, JOB_WORKERS, JOB_LEASE_SECONDS, JOB_POLL_INTERVAL
+from .council import (
+    stage1_collect_responses,
+    stage2_collect_rankings,
+    stage3_synthesize_final,
+    calculate_aggregate_rankings,
+    strip_reasoning,
+)
+
+# Job statuses; 'completed' and 'failed' are final
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# Stages in the order they are checkpointed
+STAGES = ["stage1", "stage2", "stage3", "saved"]
+
+# Worker tasks started by start_workers
+_workers: List[asyncio.Task] = []
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """Open the queue database in a transaction, creating the schema if needed."""
+    Path(JOBS_DB).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            is_first_message INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            stage TEXT,
+            stage1 TEXT,
+            stage2 TEXT,
+            stage3 TEXT,
+            metadata TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_until REAL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a queue row to a job dict with decoded stage results."""
+    job = dict(row)
+    for key in ("stage1", "stage2", "stage3", "metadata"):
+        job[key] = json.loads(job[key]) if job[key] is not None else None
+    job["is_first_message"] = bool(job["is_first_message"])
+    return job
+
+
+def submit_job(conversation_id: str, content: str, is_first_message: bool) -> Dict[str, Any]:
+    """
+    Queue a council round for a conversation.
+
+    Args:
+        conversation_id: Conversation the round belongs to
+        content: The user's message
+        is_first_message: Whether to generate a conversation title
+
+    Returns:
+        The queued job dict
+    """
+    now = time.time()
+    job_id = str(uuid.uuid4())
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO jobs (id, conversation_id, content, is_first_message, status, attempts, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 'queued', 0, ?, ?)
+            """,
+            (job_id, conversation_id, content, int(is_first_message), now, now)
+        )
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a job from the queue.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        Job dict or None if not found
+    """
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job fields exposed through the API (no worker internals or reasoning traces)."""
+    return {
+        "id": job["id"],
+        "conversation_id": job["conversation_id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "stage1": strip_reasoning(job["stage1"]),
+        "stage2": strip_reasoning(job["stage2"]),
+        "stage3": strip_reasoning(job["stage3"]),
+        "metadata": job["metadata"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+def claim_next_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Claim the oldest queued job, or a running job whose lease has expired.
+
+    Args:
+        worker_id: Identifier of the claiming worker
+
+    Returns:
+        The claimed job dict, or None if there is nothing to do
+    """
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute(
+            """
+            SELECT id FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+            ORDER BY created_at
+            LIMIT 1
+            """,
+            (now,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'running', worker_id = ?, lease_until = ?, attempts = attempts + 1, updated_at = ?
+            WHERE id = ?
+            """,
+            (worker_id, now + JOB_LEASE_SECONDS, now, row["id"])
+        )
+    return get_job(row["id"])
+
+
+def _update_job(job_id: str, worker_id: str, **fields) -> bool:
+    """Update a job the worker still holds the lease for; returns False if the lease was lost."""
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{key} = ?" for key in fields)
+    values = [
+        json.dumps(value) if key in ("stage1", "stage2", "stage3", "metadata") else value
+        for key, value in fields.items()
+    ]
+    with _connect() as conn:
+        cursor = conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE id = ? AND worker_id = ? AND status = 'running'",
+            (*values, job_id, worker_id)
+        )
+    return cursor.rowcount == 1
+
+
+class LeaseLostError(Exception):
+    """Raised when another worker has taken over a job."""
+
+
+def _checkpoint(job: Dict[str, Any], worker_id: str, **fields):
+    """Persist stage results and renew the lease."""
+    fields["lease_until"] = time.time() + JOB_LEASE_SECONDS
+    if not _update_job(job["id"], worker_id, **fields):
+        raise LeaseLostError(f"Job {job['id']} was taken over by another worker")
+    job.update(fields)
+
+
+async def _renew_lease(job_id: str, worker_id: str):
+    """Keep a job's lease alive while a long stage is running."""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        await asyncio.to_thread(_update_job, job_id, worker_id, lease_until=time.time() + JOB_LEASE_SECONDS)
+
+
+def _saved_message_index(conversation_id: str, job_id: str) -> Optional[int]:
+    """Index of the assistant message a job already saved, or None."""
+    conversation = storage.get_conversation(conversation_id)
+    if conversation is None:
+        return None
+    for index, message in enumerate(conversation["messages"]):
+        if message.get("role") == "assistant" and (message.get("metadata") or {}).get("job_id") == job_id:
+            return index
+    return None
+
+
+async def run_job(job: Dict[str, Any], worker_id: str):
+    """
+    Run (or resume) a job from the first stage that has not been checkpointed.
+
+    Queue and storage calls block on SQLite and file locks, so they run in
+    worker threads rather than on the event loop.
+
+    Args:
+        job: Claimed job dict
+        worker_id: Identifier of the worker holding the lease
+    """
+    content = job["content"]
+    done = STAGES.index(job["stage"]) + 1 if job["stage"] else 0
+
+    if done < 1:
+        stage1_results = await stage1_collect_responses(content)
+        if not stage1_results:
+            # Nothing to rank or synthesize; fail the job instead of running Stages 2 and 3
+            raise RuntimeError("All models failed to respond. Please try again.")
+        await asyncio.to_thread(_checkpoint, job, worker_id, stage="stage1", stage1=stage1_results)
+
+    if done < 2:
+        stage2_results, label_to_model = await stage2_collect_rankings(content, job["stage1"])
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        registry.record_rankings(aggregate_rankings)
+        await asyncio.to_thread(_checkpoint, job, worker_id, stage="stage2", stage2=stage2_results, metadata={
+            "label_to_model": label_to_model,
+            "aggregate_rankings": aggregate_rankings
+        })
+
+    if done < 3:
+        stage3_result = await stage3_synthesize_final(content, job["stage1"], job["stage2"])
+        await asyncio.to_thread(_checkpoint, job, worker_id, stage="stage3", stage3=stage3_result)
+
+    if done < 4:
+        # A worker that crashed after saving but before the checkpoint must
+        # not add the message a second time on resume
+        if await asyncio.to_thread(_saved_message_index, job["conversation_id"], job["id"]) is None:
+            metadata = {
+                **(job["metadata"] or {}),
+                "usage": usage.round_usage(job["stage1"], job["stage2"], job["stage3"]),
+                "job_id": job["id"]
+            }
+            await asyncio.to_thread(
+                storage.add_assistant_message,
+                job["conversation_id"], job["stage1"], job["stage2"], job["stage3"], metadata
+            )
+        await asyncio.to_thread(_checkpoint, job, worker_id, stage="saved")
+
+        # The title call runs at background priority and may wait behind
+        # interactive traffic; the job does not hold its worker and lease for it
+        if job["is_first_message"]:
+            titles.start_refine_title(job["conversation_id"], content)
+
+    await asyncio.to_thread(_update_job, job["id"], worker_id, status="completed", lease_until=None)
+
+
+async def _claim(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Claim a job in a thread; a job claimed while shutting down is handed back."""
+    claim = asyncio.ensure_future(asyncio.to_thread(claim_next_job, worker_id))
+    try:
+        return await asyncio.shield(claim)
+    except asyncio.CancelledError:
+        job = await claim
+        if job is not None:
+            await asyncio.to_thread(_update_job, job["id"], worker_id, status="queued", lease_until=None)
+        raise
+
+
+async def _worker_loop(worker_id: str):
+    """Claim and run jobs until cancelled."""
+    while True:
+        job = await _claim(worker_id)
+        if job is None:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            continue
+
+        renewer = asyncio.create_task(_renew_lease(job["id"], worker_id))
+        try:
+            with scheduler.request_context(scheduler.BATCH, job["conversation_id"]):
+                await run_job(job, worker_id)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back right away (no lease wait), so
+            # the next worker to poll resumes it from its last checkpoint
+            await asyncio.shield(asyncio.to_thread(_update_job, job["id"], worker_id, status="queued", lease_until=None))
+            raise
+        except LeaseLostError as e:
+            print(f"WARNING: {e}")
+        except Exception as e:
+            print(f"Error running job {job['id']}: {e}")
+            await asyncio.to_thread(_update_job, job["id"], worker_id, status="failed", error=str(e), lease_until=None)
+        finally:
+            renewer.cancel()
+
+
+def start_workers(count: int = JOB_WORKERS):
+    """Start the background worker pool on the running event loop."""
+    for _ in range(count):
+        worker_id = str(uuid.uuid4())
+        _workers.append(asyncio.create_task(_worker_loop(worker_id)))
+
+
+async def stop_workers():
+    """
+    Cancel the worker pool.
+
+    Interrupted jobs are put back in the queue immediately and resumed from
+    their last checkpoint by the next worker. Only a worker that dies without
+    shutting down (crash, SIGKILL) leaves its job to be reclaimed once the
+    lease expires.
+    """
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def run_standalone(count: int = JOB_WORKERS):
+    """Run a worker pool outside the API server until cancelled."""
+    await open_client()
+    start_workers(count)
+    try:
+        await asyncio.gather(*_workers)
+    finally:
+        await stop_workers()
+        await close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run LLM Council background job workers.")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1), help="Number of concurrent workers")
+    args = parser.parse_args()
+
+    print(f"Starting {args.workers} job workers (queue: {JOBS_DB})")
+    try:
+        asyncio.run(run_standalone(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
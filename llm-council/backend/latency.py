@@ -0,0 +1,148 @@
+"""Rolling latency statistics and adaptive request deadlines per model and stage.
+
+Every model call records how long it took and how much text went in and came
+out. Deadlines for the next call are derived from those observations instead
+of a fixed timeout, so a stalled generation is cut off after a few multiples
+of what the model normally needs for a prompt of that size.
+
+Observations are kept in the shared store, so every worker process derives
+deadlines and statistics from the same samples.
+"""
+
+import json
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from . import shared
+
+from .config import (
+    LATENCY_WINDOW,
+    LATENCY_MIN_SAMPLES,
+    DEFAULT_TIMEOUT_SECONDS,
+    MIN_TIMEOUT_SECONDS,
+    MAX_TIMEOUT_SECONDS,
+    TIMEOUT_SAFETY_FACTOR,
+)
+
+# Rough characters-per-token ratio used to estimate token counts from text
+CHARS_PER_TOKEN = 4
+
+# Shared-store list key prefix; the rest of the key is the JSON [model, stage]
+KEY_PREFIX = "latency:"
+
+
+def _key(model: str, stage: str) -> str:
+    return KEY_PREFIX + json.dumps([model, stage])
+
+
+def _observations(model: str, stage: str) -> List[Dict[str, Any]]:
+    key = _key(model, stage)
+    return shared.get_lists(key).get(key, [])
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def record(
+    model: str,
+    stage: str,
+    duration: float,
+    prompt_chars: int,
+    output_chars: int,
+    timed_out: bool = False
+):
+    """
+    Record one model call.
+
+    Args:
+        model: Model name
+        stage: Stage the call belonged to ('stage1', 'stage2', 'stage3', 'title', ...)
+        duration: Wall-clock duration in seconds
+        prompt_chars: Total characters of the prompt messages
+        output_chars: Characters of the generated output
+        timed_out: The call hit its deadline (pass the deadline as duration)
+    """
+    shared.append(_key(model, stage), {
+        "duration": duration,
+        "prompt_chars": prompt_chars,
+        "output_chars": output_chars,
+        "timed_out": timed_out,
+    }, max_items=LATENCY_WINDOW)
+
+
+def deadline(model: str, stage: str, prompt_chars: int, max_tokens: Optional[int] = None) -> float:
+    """
+    Compute the deadline for a call from recent observations.
+
+    The estimate is the larger of the p95 duration of completed calls scaled
+    by how much bigger this prompt is than usual, and (when a token budget is known) the time to
+    generate that budget at the model's slow-end throughput. It is multiplied
+    by TIMEOUT_SAFETY_FACTOR and clamped to [MIN_TIMEOUT_SECONDS, MAX_TIMEOUT_SECONDS].
+    Timed-out calls are left out: their duration is only the previous
+    deadline, and counting it would ratchet deadlines upward.
+
+    Args:
+        model: Model name
+        stage: Stage of the call
+        prompt_chars: Total characters of the prompt messages
+        max_tokens: Generation budget (num_predict), if any
+
+    Returns:
+        Deadline in seconds
+    """
+    observations = [o for o in _observations(model, stage) if not o["timed_out"]]
+    if len(observations) < LATENCY_MIN_SAMPLES:
+        return DEFAULT_TIMEOUT_SECONDS
+
+    durations = [o["duration"] for o in observations]
+    typical_prompt = percentile([o["prompt_chars"] for o in observations], 50) or 1
+    size_ratio = max(1.0, prompt_chars / typical_prompt)
+    estimate = percentile(durations, 95) * size_ratio
+
+    if max_tokens:
+        rates = [
+            (o["output_chars"] / CHARS_PER_TOKEN) / o["duration"]
+            for o in observations
+            if o["duration"] > 0 and o["output_chars"] > 0
+        ]
+        if rates:
+            estimate = max(estimate, max_tokens / percentile(rates, 10))
+
+    return round(min(MAX_TIMEOUT_SECONDS, max(MIN_TIMEOUT_SECONDS, estimate * TIMEOUT_SAFETY_FACTOR)), 1)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the current observations.
+
+    Timed-out calls count at their deadline, so a model that keeps timing
+    out still looks slow without its samples exceeding what it was allowed.
+
+    Returns:
+        Dict mapping model name to {stage: summary}, where each summary has
+        sample count, p50/p95 duration, tokens/s estimate and timeout count
+    """
+    summary: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    for key, observations in shared.get_lists(KEY_PREFIX).items():
+        model, stage = json.loads(key[len(KEY_PREFIX):])
+        durations = [o["duration"] for o in observations]
+        completed = [o for o in observations if not o["timed_out"] and o["duration"] > 0]
+        tokens_per_second = None
+        if completed:
+            tokens_per_second = round(
+                sum(o["output_chars"] / CHARS_PER_TOKEN for o in completed) / sum(o["duration"] for o in completed),
+                2
+            )
+        summary[model][stage] = {
+            "samples": len(observations),
+            "p50_seconds": round(percentile(durations, 50), 2),
+            "p95_seconds": round(percentile(durations, 95), 2),
+            "tokens_per_second": tokens_per_second,
+            "timeouts": sum(1 for o in observations if o["timed_out"]),
+        }
+    return dict(summary)
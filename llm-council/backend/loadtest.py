@@ -0,0 +1,545 @@
+"""Replay-based load testing from recorded traffic.
+
+Three commands:
+
+- record: build a traffic recording (NDJSON, one question per line) from the
+  stored conversations and the streamed rounds' event logs: when each
+  question arrived, and how long each model took in each stage. Round event
+  logs are deleted after ROUND_LOG_TTL_SECONDS (24 hours), so
+  per-model latencies are only available for recent rounds; record soon
+  after the traffic of interest.
+- standin: serve a stand-in for the Flask /chat endpoints that replays the
+  recorded per-model latencies, so the backend can be load tested without
+  the model machines. It writes a council file pointing at itself.
+- replay: re-issue the recorded questions through send_message_stream at N x
+  speed, once per concurrency limit, and report stream latency and the
+  backend's event-loop lag for each limit.
+
+Usage:
+    python -m backend.loadtest record -o traffic.ndjson
+    python -m backend.loadtest standin traffic.ndjson --port 5055 --council-file /tmp/loadtest/council.json
+
+    # Backend under test, with its own data directory and the stand-in council
+    cd /tmp/loadtest && COUNCIL_FILE=council.json PYTHONPATH=/path/to/llm-council python -m backend.main
+
+    python -m backend.loadtest replay traffic.ndjson --speed 10 --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from . import storage
+from .config import ROUNDS_DIR
+from .latency import percentile
+
+# Assumed time between a round finishing and the next question in the same
+# conversation, for messages stored before user messages had timestamps
+ESTIMATED_THINK_SECONDS = 30.0
+
+# A round log and a stored user message belong together if their times are this close
+ROUND_MATCH_SECONDS = 60.0
+
+# Stand-in latency when nothing was recorded for a model and stage
+DEFAULT_STANDIN_SECONDS = 1.0
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """Unix time of a stored (UTC, ISO format) timestamp."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def _stage_latencies(stage1: List[Dict], stage2: List[Dict], stage3: Dict) -> Dict[str, Dict[str, float]]:
+    """Per-model stage durations of one round."""
+    models: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for stage, results in (("stage1", stage1), ("stage2", stage2), ("stage3", [stage3] if stage3 else [])):
+        for result in results:
+            if result.get("model") and result.get("model") != "error":
+                models[result["model"]][stage] = result.get("duration_seconds", 0)
+    return dict(models)
+
+
+def _round_seconds(latencies: Dict[str, Dict[str, float]]) -> float:
+    """Approximate wall-clock duration of a round from its stage latencies."""
+    return sum(
+        max((stages.get(stage, 0) for stages in latencies.values()), default=0)
+        for stage in ("stage1", "stage2", "stage3")
+    )
+
+
+def record_from_conversations(conversations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Extract recorded requests from stored conversations.
+
+    Args:
+        conversations: Conversation dicts (e.g. storage.iter_conversations())
+
+    Returns:
+        List of requests with 'conversation', 'message_index', 'at' (Unix
+        time), 'content', 'models' (model -> stage -> seconds) and 'chairman'
+    """
+    requests = []
+    for conversation in conversations:
+        messages = conversation.get("messages", [])
+        at = _parse_time(conversation.get("created_at"))
+        for index, message in enumerate(messages):
+            if message.get("role") != "user":
+                continue
+            # Older messages have no timestamp: estimate from the previous round
+            at = _parse_time(message.get("created_at")) or at
+            if at is None:
+                break
+            reply = messages[index + 1] if index + 1 < len(messages) else {}
+            stage3 = reply.get("stage3") or {}
+            latencies = _stage_latencies(reply.get("stage1") or [], reply.get("stage2") or [], stage3)
+            requests.append({
+                "conversation": conversation["id"],
+                "message_index": index,
+                "at": at,
+                "content": message.get("content", ""),
+                "models": latencies,
+                "chairman": stage3.get("model") if stage3.get("model") != "error" else None,
+            })
+            at += _round_seconds(latencies) + ESTIMATED_THINK_SECONDS
+    return requests
+
+
+def record_from_round_logs(conversations: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Extract recorded requests from streamed rounds' event logs.
+
+    Round logs have exact arrival times. The question text is taken from the
+    stored user message closest in time to the round start.
+
+    Args:
+        conversations: Stored conversations by ID
+
+    Returns:
+        List of requests (same format as record_from_conversations)
+    """
+    if not os.path.isdir(ROUNDS_DIR):
+        return []
+
+    requests = []
+    for name in sorted(os.listdir(ROUNDS_DIR)):
+        if not name.endswith(".ndjson"):
+            continue
+        start = conversation_id = None
+        stage1, stage2, stage3 = [], [], {}
+        with open(os.path.join(ROUNDS_DIR, name), "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partially written last line of a running round
+                    continue
+                event = entry["event"]
+                if event["type"] == "round_start":
+                    start = entry.get("ts")
+                    conversation_id = event.get("conversation_id")
+                elif event["type"] == "stage1_complete":
+                    stage1 = event.get("data") or []
+                elif event["type"] == "stage2_complete":
+                    stage2 = event.get("data") or []
+                elif event["type"] == "stage3_complete":
+                    stage3 = event.get("data") or {}
+        # Logs written before rounds recorded times and conversations are skipped
+        if start is None or conversation_id is None:
+            continue
+
+        content, message_index = "", None
+        messages = conversations.get(conversation_id, {}).get("messages", [])
+        candidates = [
+            (abs(_parse_time(message.get("created_at")) - start), index)
+            for index, message in enumerate(messages)
+            if message.get("role") == "user" and _parse_time(message.get("created_at")) is not None
+        ]
+        if candidates:
+            distance, index = min(candidates)
+            if distance <= ROUND_MATCH_SECONDS:
+                content, message_index = messages[index]["content"], index
+
+        requests.append({
+            "conversation": conversation_id,
+            "message_index": message_index,
+            "at": start,
+            "content": content or f"Replayed question from round {name[:-len('.ndjson')]}",
+            "models": _stage_latencies(stage1, stage2, stage3),
+            "chairman": stage3.get("model") if stage3.get("model") != "error" else None,
+        })
+    return requests
+
+
+def record(source: str = "all") -> List[Dict[str, Any]]:
+    """
+    Build a traffic recording.
+
+    Args:
+        source: 'conversations', 'rounds' or 'all' (round logs take precedence
+            for rounds found in both)
+
+    Returns:
+        Requests sorted by arrival, with 'offset' (seconds since the first
+        request) instead of 'at'
+    """
+    conversations = {conversation["id"]: conversation for conversation in storage.iter_conversations()}
+
+    requests = []
+    if source in ("rounds", "all"):
+        requests = record_from_round_logs(conversations)
+    if source in ("conversations", "all"):
+        seen = {(request["conversation"], request["message_index"]) for request in requests}
+        requests += [
+            request for request in record_from_conversations(conversations.values())
+            if (request["conversation"], request["message_index"]) not in seen
+        ]
+
+    requests.sort(key=lambda request: request["at"])
+    first = requests[0]["at"] if requests else 0
+    for request in requests:
+        request["offset"] = round(request.pop("at") - first, 3)
+    return requests
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """Read a recording written by the record command."""
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Stand-in Flask endpoints ---
+
+def standin_endpoints(recording: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Stand-in endpoints for the recorded models.
+
+    Returns:
+        List of {'model_name', 'role'} dicts; endpoint i is served at /m/i
+    """
+    chairmen = {request["chairman"] for request in recording if request.get("chairman")}
+    members = sorted({
+        model for request in recording for model, stages in request["models"].items()
+        if "stage1" in stages
+    })
+    return (
+        [{"model_name": model, "role": "member"} for model in members]
+        + [{"model_name": model, "role": "chairman"} for model in sorted(chairmen)]
+    )
+
+
+def standin_council(recording: List[Dict[str, Any]], base_url: str) -> Dict[str, Any]:
+    """Council registry pointing at the stand-in endpoints (see registry.py)."""
+    endpoints = standin_endpoints(recording)
+    configs = [
+        {"model_name": endpoint["model_name"], "flask_url": f"{base_url}/m/{index}"}
+        for index, endpoint in enumerate(endpoints)
+    ]
+    chairmen = [config for config, endpoint in zip(configs, endpoints) if endpoint["role"] == "chairman"]
+    return {
+        "members": [config for config, endpoint in zip(configs, endpoints) if endpoint["role"] == "member"],
+        # The most recent recordings' chairman if several were used
+        "chairman": chairmen[-1] if chairmen else configs[0],
+        "round_size": 0,
+    }
+
+
+def _infer_stage(role: str, prompt: str, options: Dict[str, Any]) -> str:
+    """Which council stage a /chat request belongs to, from its prompt."""
+    if options.get("num_predict") == 1:
+        return "warmup"
+    if prompt.startswith("Generate a very short title"):
+        return "title"
+    if role == "chairman":
+        return "stage3"
+    if "FINAL RANKING:" in prompt:
+        return "stage2"
+    return "stage1"
+
+
+def create_standin_app(recording: List[Dict[str, Any]], latency_scale: float = 1.0, parallel: int = 1):
+    """
+    Build the stand-in app replaying recorded per-model latencies.
+
+    Args:
+        recording: Recorded requests
+        latency_scale: Multiplier for the replayed latencies
+        parallel: Concurrent generations per endpoint (like OLLAMA_NUM_PARALLEL)
+
+    Returns:
+        FastAPI app serving GET /m/{i}/health and POST /m/{i}/chat
+    """
+    from fastapi import FastAPI, HTTPException, Request
+
+    endpoints = standin_endpoints(recording)
+    samples: Dict[tuple, List[float]] = defaultdict(list)
+    for request in recording:
+        for model, stages in request["models"].items():
+            for stage, seconds in stages.items():
+                samples[(model, stage)].append(seconds)
+                samples[(None, stage)].append(seconds)
+    slots = [asyncio.Semaphore(parallel) for _ in endpoints]
+
+    app = FastAPI(title="LLM Council load test stand-in")
+
+    def endpoint_for(index: int) -> Dict[str, Any]:
+        if not 0 <= index < len(endpoints):
+            raise HTTPException(status_code=404, detail="Unknown endpoint")
+        return endpoints[index]
+
+    @app.get("/m/{index}/health")
+    async def health(index: int):
+        return {"status": "healthy", "model": endpoint_for(index)["model_name"]}
+
+    @app.post("/m/{index}/chat")
+    async def chat(index: int, request: Request):
+        endpoint = endpoint_for(index)
+        data = await request.json()
+        prompt = data["messages"][-1]["content"]
+        stage = _infer_stage(endpoint["role"], prompt, data.get("options") or {})
+
+        if stage == "warmup":
+            seconds = 0.0
+        else:
+            recorded = samples.get((endpoint["model_name"], stage)) or samples.get((None, stage))
+            seconds = (random.choice(recorded) if recorded else DEFAULT_STANDIN_SECONDS) * latency_scale
+
+        if stage == "stage2":
+            # A well-formed ranking of the labels in the prompt, in random order
+            labels = re.findall(r"^(Response [A-Z]+):$", prompt, re.MULTILINE)
+            random.shuffle(labels)
+            content = "FINAL RANKING:\n" + "\n".join(f"{i}. {label}" for i, label in enumerate(labels, start=1))
+            content += "\nEND OF RANKING"
+        elif stage == "title":
+            content = "Replayed Question"
+        else:
+            content = f"Replayed {stage} answer from {endpoint['model_name']}."
+
+        async with slots[index]:
+            await asyncio.sleep(seconds)
+
+        nanoseconds = int(seconds * 1e9)
+        return {
+            "model": endpoint["model_name"],
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(content) // 4,
+            "prompt_eval_duration": nanoseconds // 10,
+            "eval_duration": nanoseconds - nanoseconds // 10,
+            "load_duration": 0,
+            "total_duration": nanoseconds,
+        }
+
+    return app
+
+
+# --- Replay ---
+
+async def _send_message_stream(client: httpx.AsyncClient, conversation_id: str, content: str) -> Dict[str, Any]:
+    """Send one message through the streaming endpoint and time its events."""
+    start_time = time.time()
+    timings: Dict[str, float] = {}
+    error = None
+    try:
+        async with client.stream(
+            "POST",
+            f"/api/conversations/{conversation_id}/message/stream",
+            json={"content": content}
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                timings.setdefault(event["type"], round(time.time() - start_time, 3))
+                if event["type"] == "error":
+                    error = event.get("message", "error")
+                if event["type"] in ("complete", "error"):
+                    break
+    except (httpx.HTTPError, ValueError) as e:
+        error = str(e) or type(e).__name__
+    if error is None and "complete" not in timings:
+        error = "Stream ended before completion"
+    return {"latency": round(time.time() - start_time, 3), "events": timings, "error": error}
+
+
+def _summarize(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"samples": 0}
+    return {
+        "samples": len(values),
+        "p50_seconds": round(percentile(values, 50), 3),
+        "p95_seconds": round(percentile(values, 95), 3),
+        "max_seconds": round(max(values), 3),
+    }
+
+
+async def replay(
+    recording: List[Dict[str, Any]],
+    backend_url: str,
+    speed: float = 1.0,
+    concurrency: int = 8,
+    timeout: float = 600.0
+) -> Dict[str, Any]:
+    """
+    Re-issue recorded traffic against a backend.
+
+    Questions keep their recorded arrival offsets divided by speed. Each
+    recorded conversation becomes a new conversation whose questions are
+    sent one after another; at most `concurrency` rounds are in flight.
+
+    Args:
+        recording: Recorded requests
+        backend_url: Base URL of the backend under test
+        speed: Arrival speed-up factor
+        concurrency: Maximum rounds in flight
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        Report with request/error counts, throughput, stream latency
+        percentiles (complete and per stage event) and backend loop lag
+    """
+    run_id = f"{int(time.time())}"
+    by_conversation: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for request in recording:
+        by_conversation[request["conversation"]].append(request)
+
+    results: List[Dict[str, Any]] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=backend_url, timeout=timeout) as client:
+        started_at = time.time()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def run_conversation(requests: List[Dict[str, Any]]):
+            try:
+                response = await client.post("/api/conversations", json={})
+                response.raise_for_status()
+                conversation_id = response.json()["id"]
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                # Record the conversation's questions as failed and let the others run
+                error = f"Conversation create failed: {str(e) or type(e).__name__}"
+                results.extend({"latency": 0.0, "events": {}, "error": error} for _ in requests)
+                return
+            for index, request in enumerate(requests):
+                delay = start + request["offset"] / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Unique text, so identical recorded questions are not coalesced
+                content = f"[replay {run_id} {request['conversation']}:{index}] {request['content']}"
+                async with slots:
+                    results.append(await _send_message_stream(client, conversation_id, content))
+
+        await asyncio.gather(*[run_conversation(requests) for requests in by_conversation.values()])
+        wall_seconds = time.time() - started_at
+
+        try:
+            loop_lag = (await client.get("/api/stats/loop", params={"since": started_at})).json()
+        except (httpx.HTTPError, ValueError):
+            loop_lag = None
+
+    succeeded = [result for result in results if result["error"] is None]
+    return {
+        "concurrency": concurrency,
+        "speed": speed,
+        "requests": len(results),
+        "errors": len(results) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 1),
+        "rounds_per_minute": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else None,
+        "latency": _summarize([result["latency"] for result in succeeded]),
+        "events": {
+            event: _summarize([result["events"][event] for result in succeeded if event in result["events"]])
+            for event in ("stage1_complete", "stage2_complete", "stage3_complete")
+        },
+        "loop_lag": loop_lag,
+        "error_samples": sorted({result["error"] for result in results if result["error"]})[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay LLM Council traffic for load testing.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record traffic from stored conversations and round logs")
+    record_parser.add_argument("-o", "--output", default="-", help="Output file ('-' for stdout)")
+    record_parser.add_argument("--source", choices=["all", "conversations", "rounds"], default="all")
+
+    standin_parser = subparsers.add_parser("standin", help="Serve stand-in /chat endpoints with recorded latencies")
+    standin_parser.add_argument("recording")
+    standin_parser.add_argument("--host", default="127.0.0.1")
+    standin_parser.add_argument("--port", type=int, default=5055)
+    standin_parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for replayed latencies")
+    standin_parser.add_argument("--parallel", type=int, default=1, help="Concurrent generations per endpoint")
+    standin_parser.add_argument("--council-file", help="Write a council file pointing at the stand-in")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay traffic against a backend")
+    replay_parser.add_argument("recording")
+    replay_parser.add_argument("--backend", default="http://localhost:8001")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Arrival speed-up factor")
+    replay_parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency limits to test")
+    replay_parser.add_argument("--limit", type=int, help="Only replay the first N requests")
+    replay_parser.add_argument("--timeout", type=float, default=600.0)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        requests = record(args.source)
+        f = sys.stdout if args.output == "-" else open(args.output, "w")
+        try:
+            for request in requests:
+                f.write(json.dumps(request) + "\n")
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        print(f"Recorded {len(requests)} requests", file=sys.stderr)
+
+    elif args.command == "standin":
+        import uvicorn
+
+        recording = load_recording(args.recording)
+        council = standin_council(recording, f"http://{args.host}:{args.port}")
+        if args.council_file:
+            os.makedirs(os.path.dirname(args.council_file) or ".", exist_ok=True)
+            with open(args.council_file, "w") as f:
+                json.dump(council, f, indent=2)
+            print(f"Wrote council file {args.council_file}", file=sys.stderr)
+        else:
+            print(json.dumps(council, indent=2))
+        uvicorn.run(create_standin_app(recording, args.latency_scale, args.parallel), host=args.host, port=args.port)
+
+    else:
+        recording = load_recording(args.recording)[:args.limit]
+        reports = []
+        for concurrency in [int(level) for level in args.concurrency.split(",") if level.strip()]:
+            report = asyncio.run(replay(recording, args.backend, args.speed, concurrency, args.timeout))
+            lag = report["loop_lag"] or {}
+            print(
+                f"concurrency {concurrency}: {report['requests']} requests, {report['errors']} errors, "
+                f"p50 {report['latency'].get('p50_seconds')}s, p95 {report['latency'].get('p95_seconds')}s, "
+                f"loop lag p95 {lag.get('p95_ms')}ms",
+                file=sys.stderr
+            )
+            reports.append(report)
+        print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
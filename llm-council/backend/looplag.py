@@ -0,0 +1,53 @@
+"""Event-loop lag monitoring.
+
+A background task sleeps for a fixed interval and records how much later
+than requested it woke up. Blocking work on the event loop (file I/O, JSON
+encoding of large results, CPU-bound parsing) shows up as lag, which delays
+every streamed event and request in the process.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .latency import percentile
+
+# Seconds between lag measurements
+LAG_INTERVAL = 0.1
+
+# Samples kept (about 15 minutes at LAG_INTERVAL)
+LAG_WINDOW = 9000
+
+# (wall-clock time, lag in seconds)
+_samples: Deque[Tuple[float, float]] = deque(maxlen=LAG_WINDOW)
+
+
+async def monitor(interval: float = LAG_INTERVAL):
+    """Measure event-loop lag until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        _samples.append((time.time(), max(0.0, loop.time() - start - interval)))
+
+
+def stats(since: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Summarize event-loop lag (this worker process).
+
+    Args:
+        since: Only use samples taken after this Unix time
+
+    Returns:
+        Dict with sample count and p50/p95/max lag in milliseconds
+    """
+    lags = [lag for taken_at, lag in _samples if since is None or taken_at > since]
+    if not lags:
+        return {"samples": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    return {
+        "samples": len(lags),
+        "p50_ms": round(percentile(lags, 50) * 1000, 1),
+        "p95_ms": round(percentile(lags, 95) * 1000, 1),
+        "max_ms": round(max(lags) * 1000, 1),
+    }
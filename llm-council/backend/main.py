@@ -1,20 +1,39 @@
 """FastAPI backend for LLM Council."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uuid
 import json
+import hmac
 import asyncio
-
-from . import storage
-from .council import run_full_council, generate_conversation_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
-from .flask import check_all_models_health
-
-app = FastAPI(title="LLM Council API")
+from contextlib import asynccontextmanager
+
+from . import storage, transfer, search, rounds, jobs, shared, latency, titles, scheduler, startup, usage, registry, analytics, looplag
+from .council import run_full_council, strip_reasoning
+from .config import WORKERS, HEALTH_CACHE_SECONDS, ADMIN_TOKEN
+from .flask import check_all_models_health, open_client, close_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the connection pool, start job workers and warm endpoints in the background."""
+    await open_client()
+    jobs.start_workers()
+    # Not awaited: liveness answers immediately, readiness once warm-up succeeds
+    startup_task = asyncio.create_task(startup.run_startup())
+    lag_task = asyncio.create_task(looplag.monitor())
+    cleanup_task = asyncio.create_task(rounds.cleanup_periodically())
+    yield
+    startup_task.cancel()
+    lag_task.cancel()
+    cleanup_task.cancel()
+    await jobs.stop_workers()
+    await close_client()
+
+
+app = FastAPI(title="LLM Council API", lifespan=lifespan)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -23,9 +42,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Round-Id"],
 )
 
 
+# References to fire-and-forget tasks so they are not garbage collected
+_background_tasks = set()
+
+
 class CreateConversationRequest(BaseModel):
     """Request to create a new conversation."""
     pass
@@ -58,29 +82,106 @@ async def root():
     return {"status": "ok", "service": "LLM Council API"}
 
 
+@app.get("/api/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/api/health/ready")
+async def readiness():
+    """Readiness probe: 503 until the chairman and enough council members are warm."""
+    state = startup.status()
+    return JSONResponse(status_code=200 if startup.is_ready() else 503, content=state)
+
+
 @app.get("/api/health")
 async def health_check():
     """Check health status of all LLM endpoints."""
-    # Combine all models to check
-    all_models = COUNCIL_MODELS + [CHAIRMAN_MODEL]
-    
-    # Check health of all models
-    health_status = await check_all_models_health(all_models)
+    # Reuse a recent result from any worker process instead of re-probing
+    health_status = await asyncio.to_thread(shared.get, "health")
+    if health_status is None:
+        # Combine all models to check
+        all_models = registry.council_members() + [registry.chairman()]
+
+        # Check health of all models
+        health_status = await check_all_models_health(all_models)
+        await asyncio.to_thread(shared.set, "health", health_status, ttl=HEALTH_CACHE_SECONDS)
     
     return {
         "models": health_status,
-        "chairman": CHAIRMAN_MODEL['model_name']
+        "chairman": registry.chairman()['model_name']
     }
 
 
+@app.get("/api/stats/latency")
+def latency_stats():
+    """Rolling latency statistics per model and stage (shared by all worker processes)."""
+    return latency.snapshot()
+
+
+@app.get("/api/stats/scheduler")
+async def scheduler_stats():
+    """Endpoint slot usage and queue wait times per priority class (this worker process)."""
+    return scheduler.stats()
+
+
+@app.get("/api/stats/usage")
+def usage_stats():
+    """Token counts, prefill/decode tokens/s and model load times per model, from stored rounds."""
+    # Plain def: reading conversation files runs in FastAPI's threadpool
+    return usage.report()
+
+
+@app.get("/api/stats/loop")
+async def loop_stats(since: Optional[float] = None):
+    """Event-loop lag percentiles (this worker process), optionally since a Unix time."""
+    return looplag.stats(since)
+
+
+@app.get("/api/stats/analytics")
+def analytics_stats():
+    """Per-model win rate, average rank, latency percentiles and ranking parse-failure rate."""
+    # Plain def: reading conversation files runs in FastAPI's threadpool
+    return analytics.compute()
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Allow a request only with 'Authorization: Bearer <ADMIN_TOKEN>'."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled (set ADMIN_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/api/council", dependencies=[Depends(require_admin)])
+def get_council():
+    """Current council registry and per-member sampling stats."""
+    return {
+        **registry.get_registry(),
+        "member_stats": registry.member_stats()
+    }
+
+
+@app.put("/api/council", dependencies=[Depends(require_admin)])
+async def update_council(council: Dict[str, Any]):
+    """Replace the council registry (members, chairman, round_size)."""
+    try:
+        registry.update_registry(council)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return registry.get_registry()
+
+
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
+def list_conversations():
     """List all conversations (metadata only)."""
     return storage.list_conversations()
 
 
 @app.post("/api/conversations", response_model=Conversation)
-async def create_conversation(request: CreateConversationRequest):
+def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
     conversation = storage.create_conversation(conversation_id)
@@ -88,7 +189,7 @@ async def create_conversation(request: CreateConversationRequest):
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
+def get_conversation(conversation_id: str):
     """Get a specific conversation with all its messages."""
     conversation = storage.get_conversation(conversation_id)
     if conversation is None:
@@ -97,7 +198,7 @@ async def get_conversation(conversation_id: str):
 
 
 @app.delete("/api/conversations/{conversation_id}")
-async def delete_conversation(conversation_id: str):
+def delete_conversation(conversation_id: str):
     """Delete a specific conversation."""
     success = storage.delete_conversation(conversation_id)
     if not success:
@@ -105,6 +206,69 @@ async def delete_conversation(conversation_id: str):
     return {"status": "deleted", "id": conversation_id}
 
 
+@app.get("/api/conversations/{conversation_id}/messages/{message_index}/reasoning")
+def get_reasoning(conversation_id: str, message_index: int):
+    """Get the reasoning traces of an assistant message (loaded on demand)."""
+    traces = storage.get_reasoning_traces(conversation_id, message_index)
+    if traces is None:
+        raise HTTPException(status_code=404, detail="Reasoning traces not found")
+    return traces
+
+
+@app.get("/api/search")
+def search_conversations(q: str, limit: int = 20, offset: int = 0):
+    """Full-text search over user questions, Stage 1 responses and Stage 3 syntheses."""
+    # Plain def: FastAPI runs it in a worker thread, so indexing the existing
+    # history on the first search after an upgrade does not block the event loop
+    search.ensure_built(storage.iter_conversations)
+
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    results = search.search(q, limit=limit, offset=offset)
+    return {"query": q, "limit": limit, "offset": offset, **results}
+
+
+@app.get("/api/export")
+async def export_conversations(compress: bool = False, include_reasoning: bool = False):
+    """Stream all conversations as NDJSON (optionally gzip-compressed)."""
+    lines = transfer.export_lines(include_reasoning=include_reasoning)
+
+    if compress:
+        return StreamingResponse(
+            transfer.gzip_chunks(lines),
+            media_type="application/gzip",
+            headers={"Content-Disposition": "attachment; filename=conversations.ndjson.gz"}
+        )
+
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=conversations.ndjson"}
+    )
+
+
+@app.post("/api/import")
+async def import_conversations(
+    request: Request,
+    overwrite: bool = False,
+    batch_size: int = transfer.DEFAULT_BATCH_SIZE
+):
+    """
+    Import conversations from an NDJSON request body.
+    Accepts gzip bodies (Content-Encoding: gzip or Content-Type: application/gzip).
+    """
+    gzipped = (
+        request.headers.get("content-encoding") == "gzip"
+        or request.headers.get("content-type") == "application/gzip"
+    )
+
+    return await transfer.aimport_lines(
+        transfer.aiter_lines(request.stream(), gzipped=gzipped),
+        batch_size=batch_size,
+        overwrite=overwrite,
+    )
+
+
 @app.post("/api/conversations/{conversation_id}/message")
 async def send_message(conversation_id: str, request: SendMessageRequest):
     """
@@ -112,114 +276,186 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
     Returns the complete response with all stages.
     """
     # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
+    conversation = await asyncio.to_thread(storage.get_conversation, conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
     is_first_message = len(conversation["messages"]) == 0
 
-    # Add user message
-    storage.add_user_message(conversation_id, request.content)
+    # Add user message (in a thread: the conversation lock may have to wait)
+    await asyncio.to_thread(storage.add_user_message, conversation_id, request.content)
 
-    # If this is the first message, generate a title
+    # If this is the first message, set a title now and refine it in the background
     if is_first_message:
-        title = await generate_conversation_title(request.content)
-        storage.update_conversation_title(conversation_id, title)
+        await asyncio.to_thread(titles.set_initial_title, conversation_id, request.content)
+        title_task = asyncio.create_task(titles.refine_title(conversation_id, request.content))
+        _background_tasks.add(title_task)
+        title_task.add_done_callback(_background_tasks.discard)
 
     # Run the 3-stage council process
-    stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-        request.content
-    )
+    with scheduler.request_context(scheduler.INTERACTIVE, conversation_id):
+        stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
+            request.content
+        )
 
     # Add assistant message with all stages
-    storage.add_assistant_message(
+    await asyncio.to_thread(
+        storage.add_assistant_message,
         conversation_id,
         stage1_results,
         stage2_results,
-        stage3_result
+        stage3_result,
+        metadata
     )
 
-    # Return the complete response with metadata
+    # Return the complete response with metadata (reasoning traces are fetched separately)
     return {
-        "stage1": stage1_results,
-        "stage2": stage2_results,
-        "stage3": stage3_result,
+        "stage1": strip_reasoning(stage1_results),
+        "stage2": strip_reasoning(stage2_results),
+        "stage3": strip_reasoning(stage3_result),
         "metadata": metadata
     }
 
 
+@app.post("/api/conversations/{conversation_id}/jobs", status_code=202)
+async def submit_job(conversation_id: str, request: SendMessageRequest):
+    """
+    Queue a message as a background council job.
+    Returns immediately with a job ID to poll or subscribe to.
+    """
+    conversation = await asyncio.to_thread(storage.get_conversation, conversation_id)
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    is_first_message = len(conversation["messages"]) == 0
+
+    # The user message is stored right away so it survives restarts with the job
+    await asyncio.to_thread(storage.add_user_message, conversation_id, request.content)
+    if is_first_message:
+        await asyncio.to_thread(titles.set_initial_title, conversation_id, request.content)
+    job = await asyncio.to_thread(jobs.submit_job, conversation_id, request.content, is_first_message)
+    return jobs.public_job(job)
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Get the status and stage results of a background job."""
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.public_job(job)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Subscribe to a background job's progress.
+    Returns Server-Sent Events whenever the job reaches a new stage or status.
+    """
+    if await asyncio.to_thread(jobs.get_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_generator():
+        last_seen = None
+        while True:
+            job = await asyncio.to_thread(jobs.get_job, job_id)
+            progress = (job["status"], job["stage"])
+            if progress != last_seen:
+                last_seen = progress
+                yield f"data: {json.dumps({'type': 'progress', 'data': jobs.public_job(job)})}\n\n"
+            if job["status"] in jobs.TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(1)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+    )
+
+
+def sse_stream(council_round: rounds.CouncilRound, last_event_id: int = 0):
+    """Stream a round's events as Server-Sent Events, starting after last_event_id."""
+    async def event_generator():
+        async for event_id, event in council_round.subscribe(last_event_id):
+            yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Round-Id": council_round.id,
+        }
+    )
+
+
 @app.post("/api/conversations/{conversation_id}/message/stream")
 async def send_message_stream(conversation_id: str, request: SendMessageRequest):
     """
     Send a message and stream the 3-stage council process.
     Returns Server-Sent Events as each stage completes.
+
+    The round runs in the background: it keeps going and saves its result
+    if the client disconnects, and can be resumed via /api/rounds/{round_id}/events.
     """
     # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
+    conversation = await asyncio.to_thread(storage.get_conversation, conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
     is_first_message = len(conversation["messages"]) == 0
 
-    async def event_generator():
+    council_round = rounds.start_round(conversation_id, request.content, is_first_message)
+    return sse_stream(council_round)
+
+
+@app.get("/api/rounds/{round_id}/events")
+async def resume_round_stream(
+    round_id: str,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Resume a round's event stream after a disconnect.
+    Pass the last received event ID as the Last-Event-ID header (or last_event_id query param).
+    """
+    if last_event_id is None:
         try:
-            # Add user message
-            storage.add_user_message(conversation_id, request.content)
-
-            # Start title generation in parallel (don't await yet)
-            title_task = None
-            if is_first_message:
-                title_task = asyncio.create_task(generate_conversation_title(request.content))
-
-            # Stage 1: Collect responses
-            yield f"data: {json.dumps({'type': 'stage1_start'})}\n\n"
-            stage1_results = await stage1_collect_responses(request.content)
-            yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
-
-            # Stage 2: Collect rankings
-            yield f"data: {json.dumps({'type': 'stage2_start'})}\n\n"
-            stage2_results, label_to_model = await stage2_collect_rankings(request.content, stage1_results)
-            aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-            yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}})}\n\n"
-
-            # Stage 3: Synthesize final answer
-            yield f"data: {json.dumps({'type': 'stage3_start'})}\n\n"
-            stage3_result = await stage3_synthesize_final(request.content, stage1_results, stage2_results)
-            yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
-
-            # Wait for title generation if it was started
-            if title_task:
-                title = await title_task
-                storage.update_conversation_title(conversation_id, title)
-                yield f"data: {json.dumps({'type': 'title_complete', 'data': {'title': title}})}\n\n"
-
-            # Save complete assistant message
-            storage.add_assistant_message(
-                conversation_id,
-                stage1_results,
-                stage2_results,
-                stage3_result
-            )
-
-            # Send completion event
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
-
-        except Exception as e:
-            # Send error event
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            last_event_id = int(last_event_id_header or 0)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    council_round = rounds.get_round(round_id)
+    if council_round is not None:
+        return sse_stream(council_round, last_event_id)
+
+    # Round not in this process (finished earlier, or running in another
+    # worker): follow its on-disk event log instead
+    if not await asyncio.to_thread(rounds.has_event_log, round_id):
+        raise HTTPException(status_code=404, detail="Round not found")
+
+    async def follow_generator():
+        async for event_id, event in rounds.follow_event_log(round_id, last_event_id):
+            if event_id is None:
+                yield f"data: {json.dumps(event)}\n\n"
+            else:
+                yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
 
     return StreamingResponse(
-        event_generator(),
+        follow_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
     )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    if WORKERS > 1:
+        # Multiple processes need an import string instead of the app object
+        uvicorn.run("backend.main:app", host="0.0.0.0", port=8001, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,330 @@
+"""Runtime-reloadable council registry.
+
+The council (members and chairman) is read from COUNCIL_FILE, a JSON file
+that is re-read whenever it changes, so members can be added, removed,
+re-weighted or disabled without a restart, by editing the file or through
+the admin API (which writes the same file, so every worker process picks the
+change up). Without the file, COUNCIL_MODELS and CHAIRMAN_MODEL from config
+are used.
+
+File format:
+
+    {
+      "members": [
+        {"model_name": "gemma3:4b", "flask_url": "$GEMMA_URL", "weight": 1.0},
+        {"model_name": "qwen2.5:1.5b", "flask_url": "https://...", "enabled": false}
+      ],
+      "chairman": {"model_name": "deepseek-r1:7b", "flask_url": "$DEEPSEEK_URL", "reasoning": true},
+      "round_size": 4,
+      "review_size": 3
+    }
+
+URLs in the file may reference environment variables; councils submitted
+through the admin API may not (they are stored as given, and expanding them
+would let an API client read the server's environment). With round_size > 0
+(at least 2) each round uses a sub-council of that many members, sampled by weight, recent quality
+(average rank in Stage 2) and speed. With review_size > 0 each Stage 2
+reviewer ranks only that many responses (see council.assign_review_shards).
+"""
+
+import asyncio
+import copy
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from . import latency, shared
+from .config import (
+    COUNCIL_MODELS,
+    CHAIRMAN_MODEL,
+    COUNCIL_FILE,
+    COUNCIL_ROUND_SIZE,
+    COUNCIL_CHECK_SECONDS,
+    STAGE2_REVIEW_SIZE,
+)
+
+# Recent quality scores kept per member
+QUALITY_WINDOW = 50
+
+# Quality assumed for members without rankings yet (middle of the field)
+DEFAULT_QUALITY = 0.5
+
+_cache: Dict[str, Any] = {"mtime": None, "checked_at": 0.0, "registry": None}
+_quality: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=QUALITY_WINDOW))
+
+
+def _default_registry() -> Dict[str, Any]:
+    return {
+        "members": copy.deepcopy(COUNCIL_MODELS),
+        "chairman": copy.deepcopy(CHAIRMAN_MODEL),
+        "round_size": COUNCIL_ROUND_SIZE,
+        "review_size": STAGE2_REVIEW_SIZE,
+    }
+
+
+def _resolve(model_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand environment variables in a model config's URL (file/env registry only)."""
+    model_config = dict(model_config)
+    if model_config.get("flask_url"):
+        model_config["flask_url"] = os.path.expandvars(model_config["flask_url"])
+    return model_config
+
+
+def validate(registry: Dict[str, Any], allow_env: bool = True) -> List[str]:
+    """
+    Check a council registry for problems (e.g. a missing URL env var).
+
+    Problems never include URLs, which may carry credentials once resolved.
+
+    Args:
+        registry: Registry dict with 'members', 'chairman' and optional
+            'round_size' and 'review_size'
+        allow_env: Whether URLs may reference environment variables (only
+            for the council file and config, never for API input)
+
+    Returns:
+        List of human-readable problems (empty if the registry is usable)
+    """
+    problems = []
+    members = registry.get("members")
+    chairman = registry.get("chairman")
+    if not isinstance(members, list) or not members:
+        return ["No council members configured"]
+    if not isinstance(chairman, dict):
+        return ["No chairman configured"]
+
+    seen_names = set()
+    for role, model_config in [("council member", m) for m in members] + [("chairman", chairman)]:
+        if not isinstance(model_config, dict):
+            problems.append(f"A {role} entry is not an object")
+            continue
+        model_name = model_config.get("model_name")
+        url = model_config.get("flask_url")
+        if not model_name:
+            problems.append(f"A {role} has no model_name")
+        elif role == "council member" and model_name in seen_names:
+            problems.append(f"Council member {model_name} is listed twice")
+        seen_names.add(model_name)
+        if url is not None and not isinstance(url, str):
+            problems.append(f"URL for {role} {model_name} is not a string")
+            continue
+        if url and "$" in url:
+            if not allow_env:
+                problems.append(f"URL for {role} {model_name} must not reference environment variables")
+                continue
+            url = os.path.expandvars(url)
+            if "$" in url:
+                problems.append(f"URL for {role} {model_name} references an unset environment variable")
+                continue
+        if not url:
+            problems.append(f"No URL configured for {role} {model_name}")
+        elif not url.startswith(("http://", "https://")):
+            problems.append(f"URL for {role} {model_name} is not http(s)")
+        weight = model_config.get("weight", 1.0)
+        if not isinstance(weight, (int, float)) or weight <= 0:
+            problems.append(f"Weight of {role} {model_name} must be a positive number")
+        num_ctx = model_config.get("num_ctx", 1)
+        if not isinstance(num_ctx, int) or isinstance(num_ctx, bool) or num_ctx <= 0:
+            problems.append(f"num_ctx of {role} {model_name} must be a positive integer")
+
+    for key in ("round_size", "review_size"):
+        value = registry.get(key, 0)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            problems.append(f"{key} must be a non-negative integer")
+    # A round needs at least two members for Stage 2 to rank anything
+    if registry.get("round_size") == 1:
+        problems.append("round_size must be 0 (all members) or at least 2")
+    return problems
+
+
+def get_registry() -> Dict[str, Any]:
+    """
+    The current council registry, re-read from COUNCIL_FILE if it changed.
+
+    Returns:
+        Registry dict with 'members', 'chairman', 'round_size' and 'review_size'
+    """
+    now = time.time()
+    if _cache["registry"] is not None and now - _cache["checked_at"] < COUNCIL_CHECK_SECONDS:
+        return _cache["registry"]
+    _cache["checked_at"] = now
+
+    try:
+        mtime = os.path.getmtime(COUNCIL_FILE)
+    except OSError:
+        mtime = None
+
+    if _cache["registry"] is None or mtime != _cache["mtime"]:
+        registry = _default_registry()
+        if mtime is not None:
+            try:
+                with open(COUNCIL_FILE, "r") as f:
+                    loaded = json.load(f)
+                problems = validate(loaded)
+                if problems:
+                    raise ValueError("; ".join(problems))
+                registry = {"round_size": COUNCIL_ROUND_SIZE, "review_size": STAGE2_REVIEW_SIZE, **loaded}
+            except (OSError, ValueError) as e:
+                # Keep the last good council rather than running with a broken one
+                print(f"WARNING: Ignoring invalid council file {COUNCIL_FILE}: {e}")
+                if _cache["registry"] is not None:
+                    registry = _cache["registry"]
+        _cache["registry"] = registry
+        _cache["mtime"] = mtime
+
+    return _cache["registry"]
+
+
+def update_registry(registry: Dict[str, Any]):
+    """
+    Replace the council registry (admin API); all worker processes pick it up.
+
+    URLs are stored exactly as given; environment variable references are
+    rejected rather than expanded.
+
+    Args:
+        registry: New registry dict
+
+    Raises:
+        ValueError: If the registry is invalid
+    """
+    problems = validate(registry, allow_env=False)
+    if problems:
+        raise ValueError("; ".join(problems))
+
+    os.makedirs(os.path.dirname(COUNCIL_FILE) or ".", exist_ok=True)
+    tmp_path = f"{COUNCIL_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, COUNCIL_FILE)
+
+    # Reload right away in this process
+    _cache["checked_at"] = 0.0
+    _cache["registry"] = None
+
+
+def council_members() -> List[Dict[str, Any]]:
+    """All enabled council members (URLs resolved)."""
+    return [_resolve(member) for member in get_registry()["members"] if member.get("enabled", True)]
+
+
+def chairman() -> Dict[str, Any]:
+    """The chairman model config (URL resolved)."""
+    return _resolve(get_registry()["chairman"])
+
+
+def members_by_name(model_names: List[str]) -> List[Dict[str, Any]]:
+    """Council members with the given names (unknown names are skipped), in that order."""
+    by_name = {member["model_name"]: member for member in council_members()}
+    return [by_name[name] for name in model_names if name in by_name]
+
+
+def weight(model_name: str) -> float:
+    """Configured weight of a council member (1.0 if unknown)."""
+    for member in get_registry()["members"]:
+        if member.get("model_name") == model_name:
+            return member.get("weight", 1.0)
+    return 1.0
+
+
+def record_rankings(aggregate_rankings: List[Dict[str, Any]]):
+    """
+    Update member quality from a round's aggregate rankings.
+
+    The best-ranked member of a round scores 1.0 and the worst 0.0.
+
+    Args:
+        aggregate_rankings: Output of calculate_aggregate_rankings
+    """
+    if len(aggregate_rankings) < 2:
+        return
+    last = len(aggregate_rankings) - 1
+    for position, entry in enumerate(aggregate_rankings):
+        _quality[entry["model"]].append(1 - position / last)
+
+
+def quality(model_name: str) -> float:
+    """Mean recent quality score of a member (DEFAULT_QUALITY without data)."""
+    scores = _quality.get(model_name)
+    if not scores:
+        return DEFAULT_QUALITY
+    return sum(scores) / len(scores)
+
+
+def member_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-member inputs of sub-council sampling.
+
+    Returns:
+        Dict mapping member name to weight, quality, typical Stage 1 latency
+        and the resulting sampling score
+    """
+    stats = latency.snapshot()
+    health = shared.get("health") or {}
+    members = council_members()
+
+    known = [
+        stats[member["model_name"]]["stage1"]["p50_seconds"]
+        for member in members
+        if "stage1" in stats.get(member["model_name"], {})
+    ]
+    # Members without latency data are assumed to be typical
+    typical_latency = sorted(known)[len(known) // 2] if known else 1.0
+
+    result = {}
+    for member in members:
+        name = member["model_name"]
+        member_latency = stats.get(name, {}).get("stage1", {}).get("p50_seconds", typical_latency)
+        score = member.get("weight", 1.0) * (0.1 + quality(name)) / max(member_latency, 0.1)
+        result[name] = {
+            "weight": member.get("weight", 1.0),
+            "quality": round(quality(name), 3),
+            "p50_seconds": member_latency,
+            "healthy": health.get(name, True),
+            "score": round(score, 4),
+        }
+    return result
+
+
+async def select_members(round_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Choose the council members for one round.
+
+    With round_size 0 (or at least the number of healthy members) every
+    healthy member takes part. A round_size of 1 (only possible through
+    COUNCIL_ROUND_SIZE; the council file rejects it) is raised to 2, since
+    Stage 2 needs two responses to rank. Otherwise members are sampled without
+    replacement with probability proportional to their score (weight x
+    quality / latency), so fast, well-ranked members are preferred while the
+    others still get rounds to update their stats.
+
+    Args:
+        round_size: Members per round (defaults to the registry's round_size)
+
+    Returns:
+        List of member configs, in registry order
+    """
+    if round_size is None:
+        round_size = get_registry().get("round_size", 0)
+
+    members = council_members()
+    # Latency and health come from the shared SQLite store
+    stats = await asyncio.to_thread(member_stats)
+    healthy = [member for member in members if stats[member["model_name"]]["healthy"]]
+    # With every member marked unhealthy, try them all rather than none
+    candidates = healthy or members
+
+    if round_size <= 0 or round_size >= len(candidates):
+        return candidates
+
+    # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+    keys = {
+        member["model_name"]: math.log(random.random() or 1e-12) / stats[member["model_name"]]["score"]
+        for member in candidates
+    }
+    chosen = set(sorted(keys, key=keys.get, reverse=True)[:max(round_size, 2)])
+    return [member for member in candidates if member["model_name"] in chosen]
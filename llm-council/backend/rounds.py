@@ -0,0 +1,311 @@
+"""Council rounds that run independently of the HTTP connection.
+
+Each streamed round gets an ID and an event log: a bounded in-memory buffer
+plus an NDJSON file under ROUNDS_DIR. Clients that disconnect can reconnect
+with Last-Event-ID and resume where they left off, while the round itself
+keeps running and saves its result. Log file I/O runs in worker threads, and
+old logs are removed by a periodic background task (cleanup_periodically).
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, TextIO, Tuple
+
+from . import storage, titles, scheduler
+from .config import (
+    ROUNDS_DIR,
+    ROUND_EVENT_BUFFER,
+    ROUND_RETENTION_SECONDS,
+    ROUND_LOG_TTL_SECONDS,
+    ROUND_STALE_SECONDS,
+    ROUND_CLEANUP_SECONDS,
+)
+from .council import subscribe_council_events, strip_reasoning
+
+# Events after which a round produces nothing more
+TERMINAL_EVENTS = {"complete", "error"}
+
+# Rounds currently running or recently finished, by round ID
+_rounds: Dict[str, "CouncilRound"] = {}
+
+
+def get_round_log_path(round_id: str) -> str:
+    """Get the file path for a round's event log."""
+    return os.path.join(ROUNDS_DIR, f"{round_id}.ndjson")
+
+
+def public_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip reasoning traces from a council event before it is sent or logged."""
+    if 'data' in event:
+        return {**event, 'data': strip_reasoning(event['data'])}
+    return event
+
+
+class CouncilRound:
+    """One council round for a conversation, with a replayable event log."""
+
+    def __init__(self, round_id: str, conversation_id: str):
+        self.id = round_id
+        self.conversation_id = conversation_id
+        self.events: deque = deque(maxlen=ROUND_EVENT_BUFFER)
+        self.last_event_id = 0
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+        self.log_path = get_round_log_path(round_id)
+        # Kept open for the whole round; only used from worker threads
+        self._log_file: Optional[TextIO] = None
+        # Keeps log lines in event order while they are written in a thread
+        self._log_lock = asyncio.Lock()
+
+    def _append_log(self, event_id: int, event: Dict[str, Any]):
+        """Write one event to the log file (blocking, run in a worker thread)."""
+        if self._log_file is None:
+            Path(ROUNDS_DIR).mkdir(parents=True, exist_ok=True)
+            self._log_file = open(self.log_path, 'a')
+        self._log_file.write(json.dumps({"id": event_id, "ts": time.time(), "event": event}) + "\n")
+        # Flushed per event so followers in other workers see it
+        self._log_file.flush()
+        if event['type'] in TERMINAL_EVENTS:
+            self._close_log()
+
+    def _close_log(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    async def emit(self, event: Dict[str, Any]):
+        """Append an event to the log and wake up subscribers."""
+        # The event is on disk before subscribers see it, so events that fall
+        # out of the in-memory buffer can always be read back from the log
+        async with self._log_lock:
+            event_id = self.last_event_id + 1
+            await asyncio.to_thread(self._append_log, event_id, event)
+            async with self._changed:
+                self.last_event_id = event_id
+                self.events.append((event_id, event))
+                if event['type'] in TERMINAL_EVENTS:
+                    self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self, last_event_id: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Iterate over the round's events after last_event_id, waiting for new ones.
+
+        Args:
+            last_event_id: ID of the last event the client already has
+
+        Yields:
+            Tuples of (event ID, event dict)
+        """
+        position = last_event_id
+
+        # Events that fell out of the in-memory buffer are read back from disk
+        if self.events and self.events[0][0] > position + 1:
+            for event_id, event in await asyncio.to_thread(read_event_log, self.id):
+                if event_id > position and event_id < self.events[0][0]:
+                    yield event_id, event
+                    position = event_id
+
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.last_event_id > position or self.done)
+                pending = [(event_id, event) for event_id, event in self.events if event_id > position]
+                finished = self.done
+            for event_id, event in pending:
+                yield event_id, event
+                position = event_id
+            if finished and position >= self.last_event_id:
+                return
+
+    async def run(self, content: str, is_first_message: bool):
+        """Run the round to completion, saving the result regardless of subscribers."""
+        with scheduler.request_context(scheduler.INTERACTIVE, self.conversation_id):
+            await self._run(content, is_first_message)
+
+    async def _run(self, content: str, is_first_message: bool):
+        try:
+            await self.emit({'type': 'round_start', 'round_id': self.id, 'conversation_id': self.conversation_id})
+
+            # Add user message (storage calls run in a thread: the conversation lock may have to wait)
+            await asyncio.to_thread(storage.add_user_message, self.conversation_id, content)
+
+            # Instant title now; an LLM title (if enabled) is generated in parallel
+            title_task = None
+            if is_first_message:
+                title = await asyncio.to_thread(titles.set_initial_title, self.conversation_id, content)
+                await self.emit({'type': 'title_complete', 'data': {'title': title}})
+                title_task = titles.start_refine_title(self.conversation_id, content)
+
+            # Run the council; identical concurrent questions share one round
+            stage1_results, stage2_results, stage3_result, metadata = [], [], {}, {}
+            async for event in subscribe_council_events(content):
+                if event['type'] == 'stage1_complete':
+                    stage1_results = event['data']
+                elif event['type'] == 'stage2_complete':
+                    stage2_results = event['data']
+                elif event['type'] == 'stage3_complete':
+                    stage3_result = event['data']
+                metadata.update(event.get('metadata', {}))
+                await self.emit(public_event(event))
+
+            # Send the refined title if it is already there; otherwise it is
+            # saved when ready, without holding up the round
+            if title_task and title_task.done() and title_task.result():
+                await self.emit({'type': 'title_complete', 'data': {'title': title_task.result()}})
+
+            # Save complete assistant message
+            await asyncio.to_thread(
+                storage.add_assistant_message,
+                self.conversation_id,
+                stage1_results,
+                stage2_results,
+                stage3_result,
+                metadata
+            )
+
+            # Send completion event
+            await self.emit({'type': 'complete'})
+
+        except Exception as e:
+            await self.emit({'type': 'error', 'message': str(e)})
+
+        finally:
+            # Normally closed after the terminal event; this covers cancellation
+            self._close_log()
+            # Keep the round around for late reconnects, then rely on the disk log
+            asyncio.get_running_loop().call_later(ROUND_RETENTION_SECONDS, _rounds.pop, self.id, None)
+
+
+def start_round(conversation_id: str, content: str, is_first_message: bool) -> CouncilRound:
+    """
+    Start a council round in the background.
+
+    Args:
+        conversation_id: Conversation the round belongs to
+        content: The user's message
+        is_first_message: Whether to generate a conversation title
+
+    Returns:
+        The running CouncilRound
+    """
+    council_round = CouncilRound(str(uuid.uuid4()), conversation_id)
+    _rounds[council_round.id] = council_round
+    council_round.task = asyncio.create_task(council_round.run(content, is_first_message))
+    return council_round
+
+
+def get_round(round_id: str) -> Optional[CouncilRound]:
+    """Get a running or recently finished round by ID."""
+    return _rounds.get(round_id)
+
+
+def has_event_log(round_id: str) -> bool:
+    """Whether a round's event log exists on disk."""
+    path = get_round_log_path(round_id)
+    return os.path.basename(path) == f"{round_id}.ndjson" and os.path.exists(path)
+
+
+def read_event_log(round_id: str) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Read a round's event log from disk (blocking; call it from a worker thread).
+
+    Args:
+        round_id: Round identifier
+
+    Returns:
+        List of (event ID, event dict), empty if there is no log
+    """
+    if not has_event_log(round_id):
+        return []
+    path = get_round_log_path(round_id)
+
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                events.append((entry["id"], entry["event"]))
+    return events
+
+
+async def follow_event_log(round_id: str, last_event_id: int = 0) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Follow a round's on-disk event log, e.g. for a round running in another worker process.
+
+    Yields logged events after last_event_id, then keeps polling the file for
+    new ones until a terminal event is seen. If the log stops growing for
+    ROUND_STALE_SECONDS, the round is assumed dead and an error event is yielded.
+
+    Args:
+        round_id: Round identifier
+        last_event_id: ID of the last event the client already has
+
+    Yields:
+        Tuples of (event ID, event dict); a final error for a stale or
+        deleted log has ID None
+    """
+    path = get_round_log_path(round_id)
+    offset = 0
+    partial = ""
+    while True:
+        try:
+            chunk, offset, modified_at = await asyncio.to_thread(_read_log_from, path, offset)
+        except FileNotFoundError:
+            # Cleaned up (TTL) while being followed
+            yield None, {'type': 'error', 'message': 'Round event log is no longer available'}
+            return
+
+        # Only complete lines are parsed; a half-written line waits for the next poll
+        *lines, partial = (partial + chunk).split("\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["id"] > last_event_id:
+                yield entry["id"], entry["event"]
+            if entry["event"]["type"] in TERMINAL_EVENTS:
+                return
+
+        if time.time() - modified_at > ROUND_STALE_SECONDS:
+            yield None, {'type': 'error', 'message': 'Round is no longer running'}
+            return
+        await asyncio.sleep(0.5)
+
+
+def _read_log_from(path: str, offset: int) -> Tuple[str, int, float]:
+    """Read a log from offset; returns (new text, new offset, modification time)."""
+    with open(path, 'r') as f:
+        f.seek(offset)
+        chunk = f.read()
+        offset = f.tell()
+    return chunk, offset, os.path.getmtime(path)
+
+
+async def cleanup_periodically(interval: float = ROUND_CLEANUP_SECONDS):
+    """Delete expired round logs every interval seconds until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(cleanup_round_logs)
+        except OSError as e:
+            print(f"WARNING: Round log cleanup failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def cleanup_round_logs():
+    """Delete event logs of rounds that are no longer in memory and older than the TTL."""
+    if not os.path.isdir(ROUNDS_DIR):
+        return
+
+    cutoff = time.time() - ROUND_LOG_TTL_SECONDS
+    with os.scandir(ROUNDS_DIR) as entries:
+        for entry in entries:
+            round_id = entry.name[:-len(".ndjson")]
+            if entry.name.endswith(".ndjson") and round_id not in _rounds and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
@@ -0,0 +1,166 @@
+"""Priority scheduling and fair queuing of model calls per endpoint.
+
+Each Flask endpoint gets a fixed number of concurrency slots. When all slots
+are busy, waiting calls are served by priority class first (interactive before
+batch before background) and round-robin across conversations within a
+class, so one conversation (or a batch job) cannot monopolize an endpoint.
+
+The priority and conversation of a call come from context variables set with
+request_context(), so they follow the round through asyncio tasks without
+being passed through every function.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+
+from .config import ENDPOINT_CONCURRENCY
+from .latency import percentile
+
+# Priority classes, most urgent first
+INTERACTIVE = 0
+BATCH = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+# Queue wait samples kept per priority class
+WAIT_WINDOW = 500
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("priority", default=INTERACTIVE)
+_conversation: contextvars.ContextVar = contextvars.ContextVar("conversation", default=None)
+
+
+@contextmanager
+def request_context(priority: int, conversation_id: Optional[str] = None):
+    """
+    Set the priority class and conversation for model calls made in this context.
+
+    Args:
+        priority: INTERACTIVE, BATCH or BACKGROUND
+        conversation_id: Conversation the calls belong to (for fairness)
+    """
+    priority_token = _priority.set(priority)
+    conversation_token = _conversation.set(conversation_id)
+    try:
+        yield
+    finally:
+        _priority.reset(priority_token)
+        _conversation.reset(conversation_token)
+
+
+class EndpointScheduler:
+    """Concurrency slots for one endpoint, with prioritized, fair waiting queues."""
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self.active = 0
+        # priority -> conversation -> waiting futures, conversations in round-robin order
+        self.waiting: Dict[int, "OrderedDict[Any, Deque[asyncio.Future]]"] = defaultdict(OrderedDict)
+
+    def waiting_count(self) -> int:
+        return sum(len(queue) for by_conversation in self.waiting.values() for queue in by_conversation.values())
+
+    async def acquire(self, priority: int, conversation_id: Any):
+        """Wait for a slot."""
+        if self.active < self.slots and self.waiting_count() == 0:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[priority].setdefault(conversation_id, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we were cancelled: pass it on
+                self.release()
+            else:
+                self._remove(priority, conversation_id, future)
+            raise
+
+    def release(self):
+        """Free a slot and hand it to the next waiter."""
+        self.active -= 1
+        while self.active < self.slots:
+            future = self._next_waiter()
+            if future is None:
+                return
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in sorted(self.waiting):
+            by_conversation = self.waiting[priority]
+            if not by_conversation:
+                continue
+            conversation_id, queue = next(iter(by_conversation.items()))
+            future = queue.popleft()
+            # Round-robin: this conversation goes to the back of its class
+            del by_conversation[conversation_id]
+            if queue:
+                by_conversation[conversation_id] = queue
+            return future
+        return None
+
+    def _remove(self, priority: int, conversation_id: Any, future: asyncio.Future):
+        queue = self.waiting[priority].get(conversation_id)
+        if queue and future in queue:
+            queue.remove(future)
+            if not queue:
+                del self.waiting[priority][conversation_id]
+
+
+_endpoints: Dict[str, EndpointScheduler] = {}
+_wait_times: Dict[int, Deque[float]] = defaultdict(lambda: deque(maxlen=WAIT_WINDOW))
+
+
+@asynccontextmanager
+async def slot(model_config: Dict[str, Any]):
+    """
+    Hold one of the endpoint's concurrency slots for the duration of a call.
+
+    Args:
+        model_config: Model config dict with 'flask_url'
+    """
+    url = model_config.get('flask_url')
+    endpoint = _endpoints.get(url)
+    if endpoint is None:
+        endpoint = _endpoints[url] = EndpointScheduler(model_config.get('max_concurrency', ENDPOINT_CONCURRENCY))
+
+    priority = _priority.get()
+    queued_at = time.time()
+    await endpoint.acquire(priority, _conversation.get())
+    _wait_times[priority].append(time.time() - queued_at)
+    try:
+        yield
+    finally:
+        endpoint.release()
+
+
+def stats() -> Dict[str, Any]:
+    """
+    Current queue state and queue-time metrics.
+
+    Returns:
+        Dict with per-endpoint 'active'/'waiting' counts and per-priority
+        queue wait percentiles (seconds)
+    """
+    return {
+        "endpoints": {
+            url: {"slots": endpoint.slots, "active": endpoint.active, "waiting": endpoint.waiting_count()}
+            for url, endpoint in _endpoints.items()
+        },
+        "queue_wait": {
+            PRIORITY_NAMES[priority]: {
+                "samples": len(waits),
+                "p50_seconds": round(percentile(list(waits), 50), 3),
+                "p95_seconds": round(percentile(list(waits), 95), 3),
+            }
+            for priority, waits in _wait_times.items()
+            if waits
+        },
+    }
@@ -0,0 +1,242 @@
+"""Full-text search index over conversation history (SQLite FTS5).
+
+The index is updated incrementally by storage as messages are written, so a
+search never has to open conversation files.
+"""
+
+import html
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from .config import SEARCH_DB
+
+# Serializes first-time builds within a process
+_build_lock = threading.Lock()
+
+# Match markers passed to snippet(); control characters, so stored text is
+# escaped around them before they become <mark> tags
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """Open the index database in a transaction, creating the schema if needed."""
+    Path(SEARCH_DB).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(SEARCH_DB)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+            conversation_id UNINDEXED,
+            message_index UNINDEXED,
+            kind UNINDEXED,
+            model UNINDEXED,
+            content,
+            tokenize = 'porter unicode61'
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _assistant_rows(conversation_id: str, message_index: int, message: Dict[str, Any]) -> List[tuple]:
+    """Build index rows for the Stage 1 responses and Stage 3 synthesis of a message."""
+    rows = [
+        (conversation_id, message_index, "stage1", result.get("model", ""), result.get("response", ""))
+        for result in message.get("stage1", [])
+    ]
+    stage3 = message.get("stage3") or {}
+    if stage3.get("response"):
+        rows.append((conversation_id, message_index, "stage3", stage3.get("model", ""), stage3["response"]))
+    return rows
+
+
+def _conversation_rows(conversation: Dict[str, Any]) -> List[tuple]:
+    """Build index rows for every message of a conversation."""
+    rows = []
+    for index, message in enumerate(conversation.get("messages", [])):
+        if message.get("role") == "user":
+            rows.append((conversation["id"], index, "user", "", message.get("content", "")))
+        elif message.get("role") == "assistant":
+            rows.extend(_assistant_rows(conversation["id"], index, message))
+    return rows
+
+
+def _insert(conn: sqlite3.Connection, rows: List[tuple]):
+    conn.executemany(
+        "INSERT INTO entries (conversation_id, message_index, kind, model, content) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+
+
+def index_user_message(conversation_id: str, message_index: int, content: str):
+    """
+    Index a user question.
+
+    Args:
+        conversation_id: Conversation identifier
+        message_index: Index of the message in the conversation
+        content: User message content
+    """
+    with _connect() as conn:
+        _insert(conn, [(conversation_id, message_index, "user", "", content)])
+
+
+def index_assistant_message(conversation_id: str, message_index: int, message: Dict[str, Any]):
+    """
+    Index the Stage 1 responses and Stage 3 synthesis of an assistant message.
+
+    Args:
+        conversation_id: Conversation identifier
+        message_index: Index of the message in the conversation
+        message: Assistant message dict with 'stage1' and 'stage3'
+    """
+    with _connect() as conn:
+        _insert(conn, _assistant_rows(conversation_id, message_index, message))
+
+
+def index_conversation(conversation: Dict[str, Any]):
+    """
+    (Re)index a whole conversation, replacing any previous entries.
+
+    Args:
+        conversation: Full conversation dict
+    """
+    with _connect() as conn:
+        conn.execute("DELETE FROM entries WHERE conversation_id = ?", (conversation["id"],))
+        _insert(conn, _conversation_rows(conversation))
+
+
+def remove_conversation(conversation_id: str):
+    """
+    Remove a conversation from the index.
+
+    Args:
+        conversation_id: Conversation identifier
+    """
+    with _connect() as conn:
+        conn.execute("DELETE FROM entries WHERE conversation_id = ?", (conversation_id,))
+
+
+def is_built() -> bool:
+    """Check whether the index has been built from the full history."""
+    with _connect() as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'built'").fetchone()
+    return row is not None
+
+
+def rebuild_index(conversations: Iterable[Dict[str, Any]]) -> int:
+    """
+    Rebuild the index from scratch.
+
+    Args:
+        conversations: Iterable of full conversation dicts (e.g. storage.iter_conversations())
+
+    Returns:
+        Number of conversations indexed
+    """
+    count = 0
+    with _connect() as conn:
+        conn.execute("DELETE FROM entries")
+        for conversation in conversations:
+            _insert(conn, _conversation_rows(conversation))
+            count += 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built', '1')")
+    return count
+
+
+def ensure_built(load_conversations: Callable[[], Iterable[Dict[str, Any]]]) -> bool:
+    """
+    Build the index from the full history if it has never been built.
+
+    Blocking; call from a worker thread. Concurrent callers wait for a single
+    build instead of each rebuilding.
+
+    Args:
+        load_conversations: Returns the conversations to index (only called
+            when a build is needed)
+
+    Returns:
+        True if this call built the index
+    """
+    if is_built():
+        return False
+    with _build_lock:
+        if is_built():
+            return False
+        rebuild_index(load_conversations())
+        return True
+
+
+def _to_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all terms (no operator syntax)."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def _highlight(snippet: str) -> str:
+    """HTML-escape a snippet and turn its match markers into <mark> tags."""
+    return (
+        html.escape(snippet)
+        .replace(_MATCH_START, "<mark>")
+        .replace(_MATCH_END, "</mark>")
+    )
+
+
+def search(query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """
+    Search the index, best matches first.
+
+    Args:
+        query: Free-text search query
+        limit: Maximum number of results to return
+        offset: Number of results to skip (for pagination)
+
+    Returns:
+        Dict with 'total' match count and 'results' list of matches, each with
+        conversation_id, message_index, kind, model, snippet (HTML-escaped
+        text with matches in <mark> tags) and score
+    """
+    match_query = _to_match_query(query)
+    if not match_query:
+        return {"total": 0, "results": []}
+
+    with _connect() as conn:
+        total = conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE entries MATCH ?", (match_query,)
+        ).fetchone()[0]
+        rows = conn.execute(
+            """
+            SELECT conversation_id, message_index, kind, model,
+                   snippet(entries, 4, ?, ?, '...', 16),
+                   bm25(entries)
+            FROM entries
+            WHERE entries MATCH ?
+            ORDER BY bm25(entries)
+            LIMIT ? OFFSET ?
+            """,
+            (_MATCH_START, _MATCH_END, match_query, limit, offset)
+        ).fetchall()
+
+    return {
+        "total": total,
+        "results": [
+            {
+                "conversation_id": conversation_id,
+                "message_index": int(message_index),
+                "kind": kind,
+                "model": model or None,
+                "snippet": _highlight(snippet),
+                # bm25 is lower-is-better; flip it so higher scores rank higher
+                "score": round(-score, 4)
+            }
+            for conversation_id, message_index, kind, model, snippet, score in rows
+        ]
+    }
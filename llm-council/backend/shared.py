@@ -0,0 +1,132 @@
+"""Key-value store shared by all backend worker processes (SQLite).
+
+Process-local dicts are invisible to the other uvicorn workers; anything that
+should be shared between them (caches, health state) goes here instead.
+Values are JSON-encoded and can expire. Besides single values, the store
+keeps bounded lists (e.g. recent latency samples) that every worker appends to.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import SHARED_DB
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """Open the shared store in a transaction, creating the schema if needed."""
+    Path(SHARED_DB).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(SHARED_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kv (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS list_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS list_items_key ON list_items (key, id)")
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def get(key: str, default: Any = None) -> Any:
+    """
+    Get a value from the shared store.
+
+    Args:
+        key: Key to look up
+        default: Returned if the key is missing or expired
+
+    Returns:
+        The stored value, or default
+    """
+    with _connect() as conn:
+        row = conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return default
+    value, expires_at = row
+    if expires_at is not None and expires_at < time.time():
+        return default
+    return json.loads(value)
+
+
+def set(key: str, value: Any, ttl: Optional[float] = None):
+    """
+    Store a value in the shared store.
+
+    Args:
+        key: Key to store under
+        value: JSON-serializable value
+        ttl: Seconds until the value expires (None to keep it)
+    """
+    expires_at = time.time() + ttl if ttl is not None else None
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at)
+        )
+        # Opportunistically drop expired entries
+        conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+
+
+def delete(key: str):
+    """Remove a key from the shared store."""
+    with _connect() as conn:
+        conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+
+def append(key: str, value: Any, max_items: int):
+    """
+    Append a value to a shared bounded list, dropping its oldest items.
+
+    Args:
+        key: List to append to
+        value: JSON-serializable value
+        max_items: Number of most recent items kept
+    """
+    with _connect() as conn:
+        conn.execute("INSERT INTO list_items (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        conn.execute(
+            """
+            DELETE FROM list_items WHERE key = ? AND id <= (
+                SELECT id FROM list_items WHERE key = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (key, key, max_items)
+        )
+
+
+def get_lists(prefix: str = "") -> Dict[str, List[Any]]:
+    """
+    Read all shared lists whose key starts with a prefix.
+
+    Args:
+        prefix: Key prefix to match
+
+    Returns:
+        Dict mapping key to its items, oldest first
+    """
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT key, value FROM list_items WHERE substr(key, 1, ?) = ? ORDER BY id",
+            (len(prefix), prefix)
+        ).fetchall()
+    lists: Dict[str, List[Any]] = {}
+    for key, value in rows:
+        lists.setdefault(key, []).append(json.loads(value))
+    return lists
@@ -0,0 +1,134 @@
+"""In-flight request coalescing ("singleflight") for identical concurrent work."""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key.
+
+    While a call for a key is running, later callers with the same key wait
+    for (or subscribe to) that call instead of starting their own. Nothing is
+    cached: once the call finishes, the next caller starts a fresh one. The
+    shared work is cancelled when its last caller (or subscriber) goes away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._streams: Dict[Hashable, "_SharedStream"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument coroutine function doing the actual work
+
+        Returns:
+            The shared result of fn()
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda t: self._forget(self._calls, key, t))
+
+        self._waiters[task] += 1
+        try:
+            # Shield so one caller going away does not cancel the work for the others
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # The last caller went away: stop the work and let the next
+                    # caller start a fresh call rather than join a cancelled one
+                    self._forget(self._calls, key, task)
+                    task.cancel()
+
+    def stream(self, key: Hashable, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Run the async generator fn() once for all concurrent subscribers with the same key.
+
+        Every subscriber receives every event from the start, including events
+        produced before it subscribed.
+
+        Args:
+            key: Identity of the stream
+            fn: Zero-argument function returning the async generator doing the work
+
+        Returns:
+            Async iterator over the shared events
+        """
+        shared = self._streams.get(key)
+        if shared is None or shared.abandoned:
+            shared = _SharedStream(fn())
+            self._streams[key] = shared
+            shared.task.add_done_callback(lambda t: self._forget(self._streams, key, shared))
+        # Counted here rather than when iteration starts, so a subscriber that
+        # has not started yet keeps the stream alive
+        shared.subscribers += 1
+        return shared.subscribe()
+
+    @staticmethod
+    def _forget(registry: Dict[Hashable, Any], key: Hashable, entry: Any):
+        """Remove a finished entry, unless it has already been replaced."""
+        if registry.get(key) is entry:
+            del registry[key]
+
+
+class _SharedStream:
+    """
+    An async generator driven by one background task and fanned out to subscribers.
+
+    The task is cancelled when the last subscriber leaves before it finishes;
+    the stream is then marked abandoned so new subscribers start a fresh one.
+    """
+
+    def __init__(self, generator: AsyncIterator[Any]):
+        self.events: List[Any] = []
+        self.error: BaseException = None
+        self.done = False
+        self.subscribers = 0
+        self.abandoned = False
+        self._changed = asyncio.Condition()
+        self.task = asyncio.ensure_future(self._run(generator))
+
+    async def _run(self, generator: AsyncIterator[Any]):
+        try:
+            async for event in generator:
+                async with self._changed:
+                    self.events.append(event)
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: position < len(self.events) or self.done)
+                    pending = self.events[position:]
+                    finished = self.done
+                for event in pending:
+                    yield event
+                position += len(pending)
+                if finished and position == len(self.events):
+                    if self.error is not None:
+                        raise self.error
+                    return
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and not self.task.done():
+                self.abandoned = True
+                self.task.cancel()
@@ -0,0 +1,122 @@
+"""Startup phase: config validation, endpoint probing/warm-up and readiness.
+
+The app answers liveness probes as soon as it is up, but only reports ready
+once the chairman and enough council members have answered a health check
+(and, with STARTUP_WARM_UP, a one-token generation), so load balancers do not
+route questions to a backend whose models are still cold or unreachable.
+Once ready, the endpoints keep being health-checked, and readiness is dropped
+again (until they are back and re-warmed) when the council can no longer answer.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from . import registry, shared
+from .config import (
+    STARTUP_WARM_UP,
+    MIN_READY_MEMBERS,
+    STARTUP_RETRY_SECONDS,
+    READY_CHECK_SECONDS,
+    HEALTH_CACHE_SECONDS,
+)
+from .flask import check_model_health, warm_up_model
+
+# Startup state of this worker process: 'starting' -> 'ready', or 'waiting'
+# while unreachable endpoints are retried (also after having been ready)
+_state: Dict[str, Any] = {
+    "phase": "starting",
+    "started_at": time.time(),
+    "ready_at": None,
+    "problems": [],
+    "endpoints": {},
+}
+
+
+def is_ready() -> bool:
+    """Whether this process has finished startup and can answer questions."""
+    return _state["phase"] == "ready"
+
+
+def status() -> Dict[str, Any]:
+    """Startup state (phase, config problems, per-model probe results)."""
+    return dict(_state)
+
+
+async def _probe(model_config: Dict[str, Any], warm: bool) -> Dict[str, Any]:
+    """Health-check one endpoint and optionally warm it."""
+    if not model_config.get('flask_url'):
+        return {"healthy": False, "warm": False, "seconds": 0.0}
+    if warm:
+        return await warm_up_model(model_config)
+    start_time = time.time()
+    healthy = await check_model_health(model_config['flask_url'])
+    return {"healthy": healthy, "warm": False, "seconds": round(time.time() - start_time, 2)}
+
+
+async def probe_endpoints(warm: bool = STARTUP_WARM_UP) -> Dict[str, Dict[str, Any]]:
+    """
+    Probe all council and chairman endpoints concurrently.
+
+    Args:
+        warm: Also send a one-token generation to each healthy endpoint
+
+    Returns:
+        Dict mapping model name to {'healthy', 'warm', 'seconds'}
+    """
+    all_models: List[Dict[str, Any]] = registry.council_members() + [registry.chairman()]
+    results = await asyncio.gather(*[_probe(model_config, warm) for model_config in all_models])
+    endpoints = {model_config['model_name']: result for model_config, result in zip(all_models, results)}
+
+    # Seed the shared health cache so /api/health and title selection can use it
+    health = {name: result["healthy"] for name, result in endpoints.items()}
+    await asyncio.to_thread(shared.set, "health", health, ttl=HEALTH_CACHE_SECONDS)
+    return endpoints
+
+
+def _council_can_answer(endpoints: Dict[str, Dict[str, Any]], require_warm: bool = False) -> bool:
+    """Whether the chairman and enough members are healthy (and warm, if required)."""
+    key = "warm" if require_warm else "healthy"
+    members = registry.council_members()
+    usable_members = sum(
+        1 for model_config in members
+        if endpoints.get(model_config['model_name'], {}).get(key)
+    )
+    chairman_usable = endpoints.get(registry.chairman()['model_name'], {}).get(key, False)
+    return chairman_usable and usable_members >= min(MIN_READY_MEMBERS, len(members))
+
+
+async def run_startup():
+    """
+    Validate config, then probe and warm endpoints until the council can answer.
+
+    Runs in the background from the app lifespan for the life of the process.
+    Until ready (and after dropping out of ready), endpoints are probed and,
+    with STARTUP_WARM_UP, warmed every STARTUP_RETRY_SECONDS; readiness then
+    requires the warm-up to have succeeded. Once ready, a plain health check
+    runs every READY_CHECK_SECONDS.
+    """
+    _state["problems"] = registry.validate(registry.get_registry())
+    for problem in _state["problems"]:
+        print(f"WARNING: {problem}")
+
+    while True:
+        warm = STARTUP_WARM_UP and not is_ready()
+        _state["endpoints"] = await probe_endpoints(warm=warm)
+        if _council_can_answer(_state["endpoints"], require_warm=warm):
+            if not is_ready():
+                _state["phase"] = "ready"
+                _state["ready_at"] = time.time()
+                print(f"Council ready after {_state['ready_at'] - _state['started_at']:.1f}s")
+            await asyncio.sleep(READY_CHECK_SECONDS)
+            continue
+
+        if is_ready():
+            print("WARNING: Council is no longer ready")
+        _state["phase"] = "waiting"
+        unusable = [
+            name for name, result in _state["endpoints"].items()
+            if not result["healthy"] or (warm and not result["warm"])
+        ]
+        print(f"WARNING: Council not ready, unreachable or cold endpoints: {', '.join(unusable)}")
+        await asyncio.sleep(STARTUP_RETRY_SECONDS)
@@ -1,11 +1,34 @@
 """JSON-based storage for conversations."""
 
+import gzip
 import json
 import os
+import re
+import shutil
+import threading
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Iterator, Set, Tuple
 from pathlib import Path
-from .config import DATA_DIR
+from . import search
+from .config import DATA_DIR, REASONING_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single worker only
+    fcntl = None
+
+# Serializes cached scans, whose caches are shared by concurrent report requests
+_scan_lock = threading.Lock()
+
+# Conversation ids end up in file and directory names, so only allow a
+# strict character set (uuid4 ids match); rules out "..", "/" and "."
+CONVERSATION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+
+def is_valid_conversation_id(conversation_id: Any) -> bool:
+    """Whether a conversation id is safe to use in file paths."""
+    return isinstance(conversation_id, str) and CONVERSATION_ID_PATTERN.fullmatch(conversation_id) is not None
 
 
 def ensure_data_dir():
@@ -18,6 +41,40 @@ def get_conversation_path(conversation_id: str) -> str:
     return os.path.join(DATA_DIR, f"{conversation_id}.json")
 
 
+@contextmanager
+def conversation_lock(conversation_id: str):
+    """
+    Hold an exclusive lock on a conversation across worker processes.
+
+    Used around read-modify-write updates so concurrent writers from
+    different workers cannot overwrite each other's messages.
+    """
+    ensure_data_dir()
+    if fcntl is None:
+        yield
+        return
+
+    with open(os.path.join(DATA_DIR, f"{conversation_id}.lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    """Write JSON via a temp file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def create_conversation(conversation_id: str) -> Dict[str, Any]:
     """
     Create a new conversation.
@@ -38,9 +95,7 @@ def create_conversation(conversation_id: str) -> Dict[str, Any]:
     }
 
     # Save to file
-    path = get_conversation_path(conversation_id)
-    with open(path, 'w') as f:
-        json.dump(conversation, f, indent=2)
+    _write_json_atomic(get_conversation_path(conversation_id), conversation)
 
     return conversation
 
@@ -73,9 +128,7 @@ def save_conversation(conversation: Dict[str, Any]):
     """
     ensure_data_dir()
 
-    path = get_conversation_path(conversation['id'])
-    with open(path, 'w') as f:
-        json.dump(conversation, f, indent=2)
+    _write_json_atomic(get_conversation_path(conversation['id']), conversation)
 
 
 def delete_conversation(conversation_id: str) -> bool:
@@ -93,7 +146,12 @@ def delete_conversation(conversation_id: str) -> bool:
     if not os.path.exists(path):
         return False
 
-    os.remove(path)
+    # The lock file is kept: removing it would let a process that is waiting
+    # on the old inode and one that creates a new file both hold "the" lock
+    with conversation_lock(conversation_id):
+        os.remove(path)
+    delete_reasoning_traces(conversation_id)
+    _update_search_index(search.remove_conversation, conversation_id)
     return True
 
 
@@ -126,6 +184,130 @@ def list_conversations() -> List[Dict[str, Any]]:
     return conversations
 
 
+def iter_conversations() -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over all stored conversations, loading one file at a time.
+
+    Yields:
+        Full conversation dicts
+    """
+    ensure_data_dir()
+
+    with os.scandir(DATA_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                with open(entry.path, 'r') as f:
+                    yield json.load(f)
+
+
+def map_conversations_cached(
+    cache: Dict[str, Tuple[int, Any]],
+    analyze: Callable[[Dict[str, Any]], Any]
+) -> Tuple[List[Any], int]:
+    """
+    Apply a function to every stored conversation, reusing results for unchanged files.
+
+    Results are cached per file by modification time, so aggregate reports
+    only re-read conversations that were added or changed since the last call.
+
+    Args:
+        cache: Caller-owned dict mapping file path to (mtime_ns, result);
+            updated in place, deleted conversations are dropped
+        analyze: Function computing the per-conversation result
+
+    Returns:
+        Tuple of (results for all current conversations, files re-read)
+    """
+    ensure_data_dir()
+
+    with _scan_lock:
+        seen = set()
+        recomputed = 0
+        with os.scandir(DATA_DIR) as entries:
+            for entry in entries:
+                if not (entry.name.endswith('.json') and entry.is_file()):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                    cached = cache.get(entry.path)
+                    if cached is None or cached[0] != mtime:
+                        with open(entry.path, 'r') as f:
+                            conversation = json.load(f)
+                        cache[entry.path] = (mtime, analyze(conversation))
+                        recomputed += 1
+                    seen.add(entry.path)
+                except (OSError, ValueError) as e:
+                    # Deleted or being replaced mid-scan; picked up on the next call
+                    print(f"WARNING: Skipping {entry.path}: {e}")
+
+        for path in list(cache):
+            if path not in seen:
+                del cache[path]
+
+        return [result for _, result in cache.values()], recomputed
+
+
+def save_conversations_batch(
+    conversations: List[Dict[str, Any]],
+    overwrite: bool = False
+) -> Tuple[Set[str], int]:
+    """
+    Save a batch of conversations all-or-nothing.
+
+    Every conversation is first written to a temporary file; the files only
+    replace their targets once the whole batch has been written, and the
+    reasoning traces of replaced conversations are deleted. The
+    conversation locks are held throughout, so the batch cannot interleave
+    with messages being added by a worker.
+
+    Args:
+        conversations: Conversation dicts to save
+        overwrite: Replace conversations that already exist
+
+    Returns:
+        Tuple of (ids of the saved conversations, skipped count)
+    """
+    ensure_data_dir()
+
+    with ExitStack() as locks:
+        # Lock in a fixed order so two batches cannot deadlock each other
+        for conversation_id in sorted({conversation['id'] for conversation in conversations}):
+            locks.enter_context(conversation_lock(conversation_id))
+
+        staged = []
+        replaced = []
+        skipped = 0
+        try:
+            for conversation in conversations:
+                path = get_conversation_path(conversation['id'])
+                # Repeated ids within a batch keep their first occurrence
+                if (not overwrite and os.path.exists(path)) or any(path == target for _, target, _ in staged):
+                    skipped += 1
+                    continue
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                staged.append((tmp_path, path, conversation))
+                if os.path.exists(path):
+                    replaced.append(conversation['id'])
+                with open(tmp_path, 'w') as f:
+                    json.dump(conversation, f, indent=2)
+        except BaseException:
+            for tmp_path, _, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        for tmp_path, path, _ in staged:
+            os.replace(tmp_path, path)
+        # Traces of the replaced messages would be served for the new ones
+        for conversation_id in replaced:
+            delete_reasoning_traces(conversation_id)
+
+    for _, _, conversation in staged:
+        _update_search_index(search.index_conversation, conversation)
+
+    return {conversation['id'] for _, _, conversation in staged}, skipped
+
+
 def add_user_message(conversation_id: str, content: str):
     """
     Add a user message to a conversation.
@@ -134,23 +316,28 @@ def add_user_message(conversation_id: str, content: str):
         conversation_id: Conversation identifier
         content: User message content
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
 
-    conversation["messages"].append({
-        "role": "user",
-        "content": content
-    })
+        message_index = len(conversation["messages"])
+        conversation["messages"].append({
+            "role": "user",
+            "content": content,
+            "created_at": datetime.utcnow().isoformat()
+        })
 
-    save_conversation(conversation)
+        save_conversation(conversation)
+        _update_search_index(search.index_user_message, conversation_id, message_index, content)
 
 
 def add_assistant_message(
     conversation_id: str,
     stage1: List[Dict[str, Any]],
     stage2: List[Dict[str, Any]],
-    stage3: Dict[str, Any]
+    stage3: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
 ):
     """
     Add an assistant message with all 3 stages to a conversation.
@@ -160,19 +347,118 @@ def add_assistant_message(
         stage1: List of individual model responses
         stage2: List of model rankings
         stage3: Final synthesized response
+        metadata: Round metadata (label mapping, aggregate rankings, usage)
+    """
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        # Reasoning traces are stored separately and loaded on demand
+        message_index = len(conversation["messages"])
+        stage1, stage1_traces = _extract_reasoning(stage1)
+        stage2, stage2_traces = _extract_reasoning(stage2)
+        [stage3], stage3_traces = _extract_reasoning([stage3])
+        traces = {
+            stage: stage_traces
+            for stage, stage_traces in (("stage1", stage1_traces), ("stage2", stage2_traces), ("stage3", stage3_traces))
+            if stage_traces
+        }
+        if traces:
+            save_reasoning_traces(conversation_id, message_index, traces)
+
+        message = {
+            "role": "assistant",
+            "stage1": stage1,
+            "stage2": stage2,
+            "stage3": stage3
+        }
+        if metadata:
+            message["metadata"] = metadata
+        conversation["messages"].append(message)
+
+        save_conversation(conversation)
+        _update_search_index(search.index_assistant_message, conversation_id, message_index, message)
+
+
+def _update_search_index(update, *args):
+    """Apply a search index update; a failing index never blocks a write."""
+    try:
+        update(*args)
+    except Exception as e:
+        print(f"WARNING: Search index update failed: {e}")
+
+
+def _extract_reasoning(entries: List[Dict[str, Any]]):
+    """
+    Split reasoning traces out of stage result entries.
+
+    Entries that had a trace are marked with 'has_reasoning'.
+
+    Returns:
+        Tuple of (entries without traces, dict mapping model name to trace)
+    """
+    cleaned = []
+    traces = {}
+    for entry in entries:
+        entry = dict(entry)
+        reasoning = entry.pop("reasoning", None)
+        if reasoning:
+            traces[entry.get("model", "unknown")] = reasoning
+            entry["has_reasoning"] = True
+        cleaned.append(entry)
+    return cleaned, traces
+
+
+def get_reasoning_path(conversation_id: str, message_index: int) -> str:
+    """Get the file path for the reasoning traces of one assistant message."""
+    if not is_valid_conversation_id(conversation_id):
+        raise ValueError(f"Invalid conversation id: {conversation_id!r}")
+    return os.path.join(REASONING_DIR, conversation_id, f"{message_index}.json.gz")
+
+
+def save_reasoning_traces(conversation_id: str, message_index: int, traces: Dict[str, Dict[str, str]]):
+    """
+    Save the reasoning traces of an assistant message, gzip-compressed.
+
+    Args:
+        conversation_id: Conversation identifier
+        message_index: Index of the assistant message in the conversation
+        traces: Dict mapping stage name to {model name: trace}
+    """
+    path = get_reasoning_path(conversation_id, message_index)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(traces, f)
+
+
+def delete_reasoning_traces(conversation_id: str):
+    """Delete every stored reasoning trace of a conversation."""
+    if is_valid_conversation_id(conversation_id):
+        shutil.rmtree(os.path.join(REASONING_DIR, conversation_id), ignore_errors=True)
+
+
+def get_reasoning_traces(conversation_id: str, message_index: int) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Load the reasoning traces of an assistant message.
+
+    Args:
+        conversation_id: Conversation identifier
+        message_index: Index of the assistant message in the conversation
+
+    Returns:
+        Dict mapping stage name to {model name: trace}, or None if not stored
+        (including for ids that cannot name a stored conversation)
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
+    if not is_valid_conversation_id(conversation_id):
+        return None
+    path = get_reasoning_path(conversation_id, message_index)
 
-    conversation["messages"].append({
-        "role": "assistant",
-        "stage1": stage1,
-        "stage2": stage2,
-        "stage3": stage3
-    })
+    if not os.path.exists(path):
+        return None
 
-    save_conversation(conversation)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
 
 
 def update_conversation_title(conversation_id: str, title: str):
@@ -183,9 +469,10 @@ def update_conversation_title(conversation_id: str, title: str):
         conversation_id: Conversation identifier
         title: New title for the conversation
     """
-    conversation = get_conversation(conversation_id)
-    if conversation is None:
-        raise ValueError(f"Conversation {conversation_id} not found")
+    with conversation_lock(conversation_id):
+        conversation = get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
 
-    conversation["title"] = title
-    save_conversation(conversation)
+        conversation["title"] = title
+        save_conversation(conversation)
@@ -0,0 +1,195 @@
+"""Conversation title generation.
+
+Titles are produced instantly by a local keyword heuristic. Optionally
+(TITLE_GENERATOR=llm) the fastest healthy council member then writes a better
+title in the background, which replaces the heuristic one when it arrives.
+The chairman is never used for titles.
+"""
+
+import asyncio
+import re
+from typing import Any, Dict, Optional
+
+from . import latency, registry, scheduler, shared, storage
+from .config import TITLE_GENERATOR
+from .flask import query_model
+
+DEFAULT_TITLE = "New Conversation"
+MAX_TITLE_LENGTH = 50
+MAX_TITLE_WORDS = 5
+
+# References to background refinements, so they are not garbage collected
+_refinements = set()
+
+STOPWORDS = {
+    "a", "about", "am", "an", "and", "any", "are", "as", "at", "be", "been", "but", "by",
+    "can", "could", "did", "do", "does", "explain", "for", "from", "give", "had", "has",
+    "have", "hello", "help", "hi", "how", "i", "if", "in", "into", "is", "it", "its",
+    "me", "my", "of", "on", "or", "please", "should", "so", "some", "tell", "than",
+    "that", "the", "their", "them", "then", "there", "these", "this", "to", "us", "vs", "was",
+    "we", "were", "what", "when", "where", "which", "who", "why", "will", "with",
+    "would", "you", "your",
+}
+
+
+def _truncate(title: str) -> str:
+    """Limit a title to MAX_TITLE_LENGTH characters."""
+    if len(title) > MAX_TITLE_LENGTH:
+        title = title[:MAX_TITLE_LENGTH - 3] + "..."
+    return title
+
+
+def heuristic_title(user_query: str) -> str:
+    """
+    Build a title from the first few keywords of the question.
+
+    Args:
+        user_query: The first user message
+
+    Returns:
+        A short title (up to 5 words)
+    """
+    words = re.findall(r"[A-Za-z0-9][A-Za-z0-9+#.'-]*", user_query)
+    keywords = []
+    for word in words:
+        word = word.strip(".'-")
+        if word and word.lower() not in STOPWORDS and word.lower() not in (k.lower() for k in keywords):
+            keywords.append(word)
+        if len(keywords) == MAX_TITLE_WORDS:
+            break
+
+    if not keywords:
+        return DEFAULT_TITLE
+
+    # Capitalize plain words, keep acronyms and mixed case (e.g. "GPU", "iPhone") as written
+    title = " ".join(word if word != word.lower() else word.capitalize() for word in keywords)
+    return _truncate(title)
+
+
+async def pick_title_model() -> Optional[Dict[str, Any]]:
+    """
+    Pick the fastest healthy council member for title generation.
+
+    Uses the shared health cache (members not known to be unhealthy are
+    eligible) and the median latency of their past title or Stage 1 calls.
+
+    Returns:
+        Model config dict, or None if no member is eligible
+    """
+    # Shared SQLite store reads, kept off the event loop
+    health = await asyncio.to_thread(shared.get, "health") or {}
+    stats = await asyncio.to_thread(latency.snapshot)
+
+    def typical_latency(model_config: Dict[str, Any]) -> float:
+        model_stats = stats.get(model_config['model_name'], {})
+        for stage in ("title", "stage1"):
+            if stage in model_stats:
+                return model_stats[stage]["p50_seconds"]
+        return float("inf")
+
+    candidates = [
+        model_config for model_config in registry.council_members()
+        if model_config.get('flask_url') and health.get(model_config['model_name'], True)
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=typical_latency)
+
+
+async def llm_title(user_query: str) -> Optional[str]:
+    """
+    Ask the fastest healthy council member for a title.
+
+    Args:
+        user_query: The first user message
+
+    Returns:
+        A short title (3-5 words), or None if no model could produce one
+    """
+    model_config = await pick_title_model()
+    if model_config is None:
+        return None
+
+    title_prompt = f"""Generate a very short title (3-5 words maximum) that summarizes the following question.
+The title should be concise and descriptive. Do not use quotes or punctuation in the title.
+
+Question: {user_query}
+
+Title:"""
+
+    messages = [{"role": "user", "content": title_prompt}]
+
+    response = await query_model(model_config, messages, stage="title")
+
+    if response is None:
+        return None
+
+    # Clean up the title - remove quotes, limit length
+    title = response.get('content', '').strip().strip('"\'')
+    if not title:
+        return None
+
+    return _truncate(title)
+
+
+def set_initial_title(conversation_id: str, user_query: str) -> str:
+    """
+    Give a new conversation its heuristic title right away.
+
+    Args:
+        conversation_id: Conversation identifier
+        user_query: The first user message
+
+    Returns:
+        The title that was set
+    """
+    title = heuristic_title(user_query)
+    storage.update_conversation_title(conversation_id, title)
+    return title
+
+
+def start_refine_title(conversation_id: str, user_query: str) -> asyncio.Task:
+    """
+    Run refine_title in the background, without holding up the caller.
+
+    Args:
+        conversation_id: Conversation identifier
+        user_query: The first user message
+
+    Returns:
+        The refinement task (its result is the new title or None)
+    """
+    task = asyncio.create_task(refine_title(conversation_id, user_query))
+    _refinements.add(task)
+    task.add_done_callback(_refinements.discard)
+    return task
+
+
+async def refine_title(conversation_id: str, user_query: str) -> Optional[str]:
+    """
+    Replace the heuristic title with an LLM title, if TITLE_GENERATOR is 'llm'.
+
+    Never raises: it runs in the background, and on failure the heuristic
+    title simply stays.
+
+    Args:
+        conversation_id: Conversation identifier
+        user_query: The first user message
+
+    Returns:
+        The new title, or None if it was not changed
+    """
+    if TITLE_GENERATOR != "llm":
+        return None
+
+    try:
+        with scheduler.request_context(scheduler.BACKGROUND, conversation_id):
+            title = await llm_title(user_query)
+        if title is None:
+            return None
+
+        await asyncio.to_thread(storage.update_conversation_title, conversation_id, title)
+        return title
+    except Exception as e:
+        print(f"WARNING: Title refinement failed for {conversation_id}: {e}")
+        return None
@@ -0,0 +1,323 @@
+"""Streaming NDJSON export/import of conversations.
+
+Each line of an export is one conversation as JSON. Exports are produced by
+generators and imports are consumed in batches, so memory use does not grow
+with the size of the history.
+
+Usage:
+    python -m backend.transfer export -o backup.ndjson.gz
+    python -m backend.transfer import backup.ndjson.gz --batch-size 200
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+from . import storage
+
+# Number of conversations written per import batch
+DEFAULT_BATCH_SIZE = 100
+
+# Roles a stored message can have
+MESSAGE_ROLES = ("user", "assistant")
+
+
+def export_lines(include_reasoning: bool = False) -> Iterator[str]:
+    """
+    Yield every stored conversation as one NDJSON line.
+
+    Args:
+        include_reasoning: Attach stored reasoning traces under 'reasoning_traces'
+
+    Yields:
+        JSON-encoded conversation lines ending with a newline
+    """
+    for conversation in storage.iter_conversations():
+        if include_reasoning:
+            traces = {}
+            for index, message in enumerate(conversation["messages"]):
+                if message.get("role") == "assistant":
+                    message_traces = storage.get_reasoning_traces(conversation["id"], index)
+                    if message_traces:
+                        traces[str(index)] = message_traces
+            if traces:
+                conversation["reasoning_traces"] = traces
+        yield json.dumps(conversation) + "\n"
+
+
+def gzip_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """
+    Gzip-compress a stream of text lines incrementally.
+
+    Args:
+        lines: Text lines to compress
+
+    Yields:
+        Compressed byte chunks forming a single gzip stream
+    """
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for line in lines:
+        chunk = compressor.compress(line.encode("utf-8"))
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+async def aiter_lines(chunks: AsyncIterable[bytes], gzipped: bool = False) -> AsyncIterator[bytes]:
+    """
+    Split an async stream of (optionally gzip-compressed) bytes into lines.
+
+    Lines are left undecoded, so invalid UTF-8 fails in parse_conversation
+    and is counted as an invalid line rather than ending the stream.
+
+    Args:
+        chunks: Raw request body chunks
+        gzipped: Whether the body is a gzip stream
+
+    Yields:
+        Byte lines without their trailing newline
+
+    Raises:
+        zlib.error: If the gzip stream is corrupt
+    """
+    decompressor = zlib.decompressobj(wbits=47) if gzipped else None  # 47 = auto-detect gzip/zlib
+    buffer = b""
+    async for chunk in chunks:
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if decompressor:
+        buffer += decompressor.flush()
+    if buffer:
+        for line in buffer.split(b"\n"):
+            yield line
+
+
+def parse_conversation(line: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+    """
+    Parse and validate one NDJSON line.
+
+    Args:
+        line: A single line of an export (bytes must be UTF-8)
+
+    Returns:
+        Conversation dict, or None for blank lines
+
+    Raises:
+        ValueError: If the line is not a valid conversation
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    conversation = json.loads(line)
+    if not isinstance(conversation, dict):
+        raise ValueError("Conversation must be a JSON object")
+
+    conversation_id = conversation.get("id")
+    if not storage.is_valid_conversation_id(conversation_id):
+        raise ValueError(f"Invalid conversation id: {conversation_id!r}")
+    for field in ("created_at", "title"):
+        if not isinstance(conversation.get(field, ""), str):
+            raise ValueError(f"Conversation {conversation_id} has a non-string {field}")
+    messages = conversation.get("messages")
+    if not isinstance(messages, list):
+        raise ValueError(f"Conversation {conversation_id} has no messages list")
+    for index, message in enumerate(messages):
+        if not isinstance(message, dict) or message.get("role") not in MESSAGE_ROLES:
+            raise ValueError(f"Conversation {conversation_id} has an invalid message at index {index}")
+        if message["role"] == "user" and not isinstance(message.get("content"), str):
+            raise ValueError(f"Conversation {conversation_id} has a user message without text at index {index}")
+
+    traces = conversation.get("reasoning_traces")
+    if traces is not None:
+        if not isinstance(traces, dict):
+            raise ValueError(f"Conversation {conversation_id} has invalid reasoning_traces")
+        for index, message_traces in traces.items():
+            if not (index.isdecimal() and int(index) < len(messages)) or not isinstance(message_traces, dict):
+                raise ValueError(f"Conversation {conversation_id} has invalid reasoning traces for message {index!r}")
+
+    conversation.setdefault("created_at", "")
+    conversation.setdefault("title", "New Conversation")
+    return conversation
+
+
+def import_batch(conversations: List[Dict[str, Any]], overwrite: bool = False) -> Dict[str, int]:
+    """
+    Write one batch of parsed conversations, including any reasoning traces.
+
+    Traces are only written for conversations that were actually imported,
+    so a skipped conversation keeps its existing traces.
+
+    Args:
+        conversations: Parsed conversation dicts
+        overwrite: Replace conversations that already exist
+
+    Returns:
+        Dict with 'imported' and 'skipped' counts
+    """
+    # Replaced conversations lose their old traces in save_conversations_batch
+    traces_by_id = {
+        conversation["id"]: conversation.pop("reasoning_traces")
+        for conversation in conversations
+        if "reasoning_traces" in conversation
+    }
+
+    imported_ids, skipped = storage.save_conversations_batch(conversations, overwrite=overwrite)
+
+    for conversation_id, traces in traces_by_id.items():
+        if conversation_id not in imported_ids:
+            continue
+        for index, message_traces in traces.items():
+            storage.save_reasoning_traces(conversation_id, int(index), message_traces)
+
+    return {"imported": len(imported_ids), "skipped": skipped}
+
+
+class _Importer:
+    """Batching state shared by the sync and async import loops."""
+
+    def __init__(self, batch_size: int, overwrite: bool):
+        self.batch_size = batch_size
+        self.overwrite = overwrite
+        self.stats = {"imported": 0, "skipped": 0, "errors": 0}
+        self.batch: List[Dict[str, Any]] = []
+
+    def add(self, line: Union[str, bytes]) -> Optional[List[Dict[str, Any]]]:
+        """Parse a line; returns a full batch once one is ready to write."""
+        try:
+            conversation = parse_conversation(line)
+        except ValueError as e:
+            print(f"WARNING: Skipping invalid conversation line: {e}")
+            self.stats["errors"] += 1
+            return None
+        if conversation is None:
+            return None
+
+        self.batch.append(conversation)
+        if len(self.batch) < self.batch_size:
+            return None
+        batch, self.batch = self.batch, []
+        return batch
+
+    def record(self, result: Dict[str, int]):
+        for key, value in result.items():
+            self.stats[key] += value
+
+
+def import_lines(
+    lines: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    overwrite: bool = False
+) -> Dict[str, int]:
+    """
+    Import conversations from NDJSON lines in batches.
+
+    Invalid lines are counted and skipped; they do not abort the import.
+
+    Args:
+        lines: NDJSON lines, e.g. an open file
+        batch_size: Conversations written per batch
+        overwrite: Replace conversations that already exist
+
+    Returns:
+        Dict with 'imported', 'skipped' and 'errors' counts
+    """
+    importer = _Importer(batch_size, overwrite)
+    for line in lines:
+        batch = importer.add(line)
+        if batch:
+            importer.record(import_batch(batch, overwrite))
+    if importer.batch:
+        importer.record(import_batch(importer.batch, overwrite))
+    return importer.stats
+
+
+async def aimport_lines(
+    lines: AsyncIterable[Union[str, bytes]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    overwrite: bool = False
+) -> Dict[str, int]:
+    """
+    Async variant of import_lines for streamed request bodies.
+
+    Batches are written in a worker thread so the event loop keeps serving
+    other requests during a large import. A corrupt gzip stream ends the
+    import with one more error; batches already written are kept.
+
+    Args:
+        lines: NDJSON lines (str or UTF-8 bytes), e.g. from aiter_lines
+        batch_size: Conversations written per batch
+        overwrite: Replace conversations that already exist
+
+    Returns:
+        Dict with 'imported', 'skipped' and 'errors' counts
+    """
+    importer = _Importer(batch_size, overwrite)
+    try:
+        async for line in lines:
+            batch = importer.add(line)
+            if batch:
+                importer.record(await asyncio.to_thread(import_batch, batch, overwrite))
+    except zlib.error as e:
+        print(f"WARNING: Stopping import at a corrupt gzip stream: {e}")
+        importer.stats["errors"] += 1
+    if importer.batch:
+        importer.record(await asyncio.to_thread(import_batch, importer.batch, overwrite))
+    return importer.stats
+
+
+def _open_text(path: str, mode: str):
+    """Open a path (or '-' for stdio) as text, gzip-compressed if it ends in .gz."""
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import LLM Council conversations as NDJSON.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export all conversations")
+    export_parser.add_argument("-o", "--output", default="-", help="Output file ('.gz' to compress, '-' for stdout)")
+    export_parser.add_argument("--include-reasoning", action="store_true", help="Include stored reasoning traces")
+
+    import_parser = subparsers.add_parser("import", help="Import conversations")
+    import_parser.add_argument("input", help="Input file ('.gz' if compressed, '-' for stdin)")
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    import_parser.add_argument("--overwrite", action="store_true", help="Replace existing conversations")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        f = _open_text(args.output, "w")
+        try:
+            count = 0
+            for line in export_lines(include_reasoning=args.include_reasoning):
+                f.write(line)
+                count += 1
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        print(f"Exported {count} conversations", file=sys.stderr)
+    else:
+        f = _open_text(args.input, "r")
+        try:
+            stats = import_lines(f, batch_size=args.batch_size, overwrite=args.overwrite)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        print(f"Imported {stats['imported']}, skipped {stats['skipped']}, errors {stats['errors']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Token and time accounting from Ollama's response statistics.
+
+Ollama reports, per generation, how many prompt tokens it evaluated
+(prefill), how many tokens it generated (decode), how long each phase took
+and how long loading the model took. Keeping these per call separates
+prefill cost from decode cost and makes cold loads visible.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import storage
+from .config import COLD_LOAD_SECONDS
+
+# Per-conversation partial reports, keyed by file path (see storage.map_conversations_cached)
+_cache: Dict[str, tuple] = {}
+
+# Ollama reports durations in nanoseconds
+NANOSECONDS = 1e9
+
+USAGE_FIELDS = (
+    "calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "prompt_seconds",
+    "generation_seconds",
+    "load_seconds",
+    "total_seconds",
+)
+
+
+def from_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the usage statistics of one Ollama /api/chat response.
+
+    Args:
+        data: Response JSON (as forwarded by the Flask wrapper)
+
+    Returns:
+        Usage dict with token counts and phase durations in seconds
+    """
+    return {
+        "calls": 1,
+        "prompt_tokens": data.get("prompt_eval_count") or 0,
+        "completion_tokens": data.get("eval_count") or 0,
+        "prompt_seconds": round((data.get("prompt_eval_duration") or 0) / NANOSECONDS, 3),
+        "generation_seconds": round((data.get("eval_duration") or 0) / NANOSECONDS, 3),
+        "load_seconds": round((data.get("load_duration") or 0) / NANOSECONDS, 3),
+        "total_seconds": round((data.get("total_duration") or 0) / NANOSECONDS, 3),
+    }
+
+
+def combine(usages: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Sum usage dicts (missing ones are skipped).
+
+    Returns:
+        Usage dict with the totals
+    """
+    total = {field: 0 for field in USAGE_FIELDS}
+    for usage in usages:
+        if not usage:
+            continue
+        for field in USAGE_FIELDS:
+            total[field] += usage.get(field, 0)
+    for field in USAGE_FIELDS:
+        if field.endswith("_seconds"):
+            total[field] = round(total[field], 3)
+    return total
+
+
+def round_usage(
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    stage3_result: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Aggregate the usage of a council round per stage and in total.
+
+    Args:
+        stage1_results: Stage 1 results (each may carry 'usage')
+        stage2_results: Stage 2 results
+        stage3_result: Stage 3 result
+
+    Returns:
+        Dict with 'stage1', 'stage2', 'stage3' and 'total' usage dicts
+    """
+    stages = {
+        "stage1": combine(result.get("usage") for result in stage1_results),
+        "stage2": combine(result.get("usage") for result in stage2_results),
+        "stage3": combine([stage3_result.get("usage")]),
+    }
+    stages["total"] = combine(stages.values())
+    return stages
+
+
+def rates(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive throughput figures from a usage dict.
+
+    Returns:
+        Dict with prefill and decode tokens/s (None when unknown) and the
+        average load time per call
+    """
+    def per_second(tokens: float, seconds: float) -> Optional[float]:
+        return round(tokens / seconds, 2) if seconds > 0 else None
+
+    calls = usage.get("calls", 0)
+    return {
+        "prefill_tokens_per_second": per_second(usage.get("prompt_tokens", 0), usage.get("prompt_seconds", 0)),
+        "decode_tokens_per_second": per_second(usage.get("completion_tokens", 0), usage.get("generation_seconds", 0)),
+        "average_load_seconds": round(usage.get("load_seconds", 0) / calls, 3) if calls else None,
+    }
+
+
+def _conversation_usage(conversation: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Usage totals and cold-load counts per model and stage for one conversation."""
+    partial: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    for message in conversation.get("messages", []):
+        if message.get("role") != "assistant":
+            continue
+        stage3 = message.get("stage3") or {}
+        entries = [("stage1", entry) for entry in message.get("stage1") or []]
+        entries += [("stage2", entry) for entry in message.get("stage2") or []]
+        entries.append(("stage3", stage3))
+        for stage, entry in entries:
+            if not entry.get("usage"):
+                continue
+            by_stage = partial[entry.get("model", "unknown")]
+            usage = entry["usage"]
+            previous = by_stage.get(stage, {"cold_loads": 0})
+            by_stage[stage] = {
+                **combine([previous, usage]),
+                "cold_loads": previous["cold_loads"] + (usage.get("load_seconds", 0) >= COLD_LOAD_SECONDS),
+            }
+    return dict(partial)
+
+
+def report() -> Dict[str, Any]:
+    """
+    Build a per-model usage report from stored conversations.
+
+    Per-conversation totals are cached by file modification time, so only
+    new or changed conversations are re-read.
+
+    Returns:
+        Dict mapping model name to its totals, throughput, cold load count
+        and per-stage breakdown
+    """
+    partials, _ = storage.map_conversations_cached(_cache, _conversation_usage)
+
+    by_model: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+    for partial in partials:
+        for model, by_stage in partial.items():
+            for stage, stage_usage in by_stage.items():
+                by_model[model][stage].append(stage_usage)
+
+    summary = {}
+    for model, by_stage in sorted(by_model.items()):
+        stages = {stage: combine(usages) for stage, usages in by_stage.items()}
+        total = combine(stages.values())
+        summary[model] = {
+            **total,
+            **rates(total),
+            # A stage 3 entry can combine two chairman calls, so this counts entries
+            "cold_loads": sum(usage["cold_loads"] for usages in by_stage.values() for usage in usages),
+            "stages": {stage: {**stage_total, **rates(stage_total)} for stage, stage_total in stages.items()},
+        }
+    return summary
@@ -84,6 +84,8 @@ export const api = {
 
   /**
    * Send a message and receive streaming updates.
+   * If the connection drops mid-round, the stream is resumed from the last
+   * received event (the round keeps running on the backend).
    * @param {string} conversationId - The conversation ID
    * @param {string} content - The message content
    * @param {function} onEvent - Callback function for each event: (eventType, data) => void
@@ -105,27 +107,76 @@ export const api = {
       throw new Error('Failed to send message');
     }
 
-    const reader = response.body.getReader();
-    const decoder = new TextDecoder();
-
-    while (true) {
-      const { done, value } = await reader.read();
-      if (done) break;
-
-      const chunk = decoder.decode(value);
-      const lines = chunk.split('\n');
-
-      for (const line of lines) {
-        if (line.startsWith('data: ')) {
-          const data = line.slice(6);
-          try {
-            const event = JSON.parse(data);
-            onEvent(event.type, event);
-          } catch (e) {
-            console.error('Failed to parse SSE event:', e);
-          }
-        }
+    const state = { roundId: response.headers.get('X-Round-Id'), lastEventId: 0, finished: false };
+    let currentResponse = response;
+
+    for (let attempt = 0; attempt <= MAX_STREAM_RECONNECTS; attempt++) {
+      try {
+        await readEventStream(currentResponse, state, onEvent);
+      } catch (e) {
+        console.error('Stream interrupted:', e);
       }
+      if (state.finished || !state.roundId) return;
+
+      // Resume the round from the last event we received
+      await new Promise((resolve) => setTimeout(resolve, 1000 * (attempt + 1)));
+      try {
+        currentResponse = await fetch(`${API_BASE}/api/rounds/${state.roundId}/events`, {
+          headers: { 'Last-Event-ID': String(state.lastEventId) },
+        });
+      } catch (e) {
+        console.error('Failed to resume stream:', e);
+        continue;
+      }
+      if (!currentResponse.ok) break;
+    }
+
+    if (!state.finished) {
+      onEvent('error', { type: 'error', message: 'Lost connection to the council' });
     }
   },
 };
+
+const MAX_STREAM_RECONNECTS = 5;
+
+/**
+ * Read Server-Sent Events from a response, tracking the last event ID.
+ */
+async function readEventStream(response, state, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const messages = buffer.split('\n\n');
+    buffer = messages.pop();
+
+    for (const message of messages) {
+      let data = null;
+      for (const line of message.split('\n')) {
+        if (line.startsWith('id: ')) {
+          state.lastEventId = parseInt(line.slice(4), 10);
+        } else if (line.startsWith('data: ')) {
+          data = line.slice(6);
+        }
+      }
+      if (data === null) continue;
+
+      try {
+        const event = JSON.parse(data);
+        if (event.type === 'round_start') {
+          state.roundId = event.round_id;
+        } else if (event.type === 'complete' || event.type === 'error') {
+          state.finished = true;
+        }
+        onEvent(event.type, event);
+      } catch (e) {
+        console.error('Failed to parse SSE event:', e);
+      }
+    }
+  }
+}
@@ -9,7 +9,8 @@ function deAnonymizeText(text, labelToModel) {
   // Replace each "Response X" with the actual model name
   Object.entries(labelToModel).forEach(([label, model]) => {
     const modelShortName = model;
-    result = result.replace(new RegExp(label, 'g'), `**${modelShortName}**`);
+    // Word boundary so "Response A" does not match inside "Response AB"
+    result = result.replace(new RegExp(`${label}\\b`, 'g'), `**${modelShortName}**`);
   });
   return result;
 }
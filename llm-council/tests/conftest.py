@@ -0,0 +1,12 @@
+import pytest
+
+from backend import registry
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Run every test in its own working directory, so data/ paths are fresh."""
+    monkeypatch.chdir(tmp_path)
+    registry._cache.update({"mtime": None, "checked_at": 0.0, "registry": None})
+    registry._quality.clear()
+    yield tmp_path
@@ -0,0 +1,74 @@
+from backend import analytics, storage
+from backend.council import SYNTHESIS_FAILED_RESPONSE
+
+
+def _message(stage2, stage3, labels="AB"):
+    return {
+        "role": "assistant",
+        "stage1": [{"model": label.lower(), "response": "...", "duration_seconds": 1.0} for label in labels],
+        "stage2": stage2,
+        "stage3": stage3,
+    }
+
+
+def _save(*messages):
+    storage.save_conversation({"id": "c", "created_at": "", "title": "t", "messages": list(messages)})
+
+
+def test_rankings_without_the_required_format_count_as_failures():
+    _save(_message(
+        [
+            {"model": "a", "ranking": "FINAL RANKING:\n1. Response B\n2. Response A", "duration_seconds": 1.0},
+            # Mentions both labels, but not as the required numbered list
+            {"model": "b", "ranking": "Response B is better than Response A.", "duration_seconds": 1.0},
+        ],
+        {"model": "chair", "response": "answer", "duration_seconds": 3.0},
+    ))
+
+    models = analytics.compute()["models"]
+
+    assert models["a"]["parse_failures"] == 0
+    assert models["b"]["parse_failures"] == 1
+
+
+def test_partial_numbered_list_counts_as_failure():
+    _save(_message(
+        [{"model": "a", "ranking": "FINAL RANKING:\n1. Response B\nResponse A is worse", "duration_seconds": 1.0}],
+        {"model": "chair", "response": "answer", "duration_seconds": 3.0},
+    ))
+
+    assert analytics.compute()["models"]["a"]["parse_failures"] == 1
+
+
+def test_failed_synthesis_is_left_out_of_stage3_latency():
+    _save(
+        _message([], {"model": "chair", "response": "answer", "duration_seconds": 3.0}),
+        _message([], {"model": "chair", "response": SYNTHESIS_FAILED_RESPONSE, "duration_seconds": 0}),
+    )
+
+    latency = analytics.compute()["models"]["chair"]["latency"]["stage3"]
+
+    assert latency["samples"] == 1
+    assert latency["p50_seconds"] == 3.0
+
+
+def test_average_rank_is_normalized_per_round():
+    ranking = {"model": "x", "ranking": "FINAL RANKING:\n1. Response B\n2. Response A\n3. Response C"}
+    _save(
+        _message([{"model": "a", "ranking": "FINAL RANKING:\n1. Response A\n2. Response B"}], {}),
+        _message([ranking], {}, labels="ABC"),
+    )
+
+    models = analytics.compute()["models"]
+
+    # a: best of two (0.0), then second of three (0.5)
+    assert models["a"]["average_rank"] == 0.25
+    assert models["a"]["wins"] == 1
+    assert models["c"]["average_rank"] == 1.0
+
+
+def test_unchanged_conversations_are_not_reread():
+    _save(_message([], {"model": "chair", "response": "answer", "duration_seconds": 3.0}))
+
+    assert analytics.compute()["recomputed"] == 1
+    assert analytics.compute()["recomputed"] == 0
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from backend import council
+
+
+def test_speculative_draft_is_cancelled_when_stage2_fails(monkeypatch):
+    draft_cancelled = asyncio.Event()
+
+    async def stage1(user_query, members=None):
+        return [{"model": "a", "response": "x"}, {"model": "b", "response": "y"}]
+
+    async def draft(user_query, stage1_results):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            draft_cancelled.set()
+            raise
+
+    async def stage2(user_query, stage1_results, reviewers=None):
+        await asyncio.sleep(0)
+        raise RuntimeError("stage 2 failed")
+
+    monkeypatch.setattr(council, "stage1_collect_responses", stage1)
+    monkeypatch.setattr(council, "stage3_draft_from_stage1", draft)
+    monkeypatch.setattr(council, "stage2_collect_rankings", stage2)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await council._run_full_council("question", speculative=True)
+        await asyncio.wait_for(draft_cancelled.wait(), timeout=1)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("responses, reviewers, review_size", [(6, 6, 3), (10, 5, 3), (9, 9, 4), (5, 3, 2)])
+def test_review_shards_are_balanced(responses, reviewers, review_size):
+    shards = council.assign_review_shards(responses, reviewers, review_size)
+
+    assert len(shards) == reviewers
+    assert all(len(set(shard)) == len(shard) for shard in shards)
+    sizes = {len(shard) for shard in shards}
+    assert len(sizes) == 1 and sizes.pop() >= review_size
+    counts = [sum(index in shard for shard in shards) for index in range(responses)]
+    assert min(counts) >= council.MIN_REVIEWS_PER_RESPONSE
+    assert max(counts) - min(counts) <= 1
+
+
+def test_review_shards_cover_everything_when_not_sharded():
+    assert council.assign_review_shards(4, 3, 0) == [[0, 1, 2, 3]] * 3
+    assert council.assign_review_shards(4, 3, 4) == [[0, 1, 2, 3]] * 3
+
+
+def test_review_shard_size_is_raised_to_reach_min_reviews():
+    # 2 reviewers x 2 responses could only give each of 6 responses 2/3 of a review
+    assert council.assign_review_shards(6, 2, 2) == [list(range(6))] * 2
+
+
+def _ranking(model, *labels, shown=None):
+    text = "FINAL RANKING:\n" + "\n".join(f"{i}. {label}" for i, label in enumerate(labels, 1))
+    result = {"model": model, "ranking": text}
+    if shown is not None:
+        result["reviewed_labels"] = shown
+    return result
+
+
+def test_full_rankings_average_positions():
+    label_to_model = {"Response A": "a", "Response B": "b", "Response C": "c"}
+    rankings = [
+        _ranking("a", "Response B", "Response A", "Response C"),
+        _ranking("b", "Response B", "Response C", "Response A"),
+    ]
+
+    aggregate = council.calculate_aggregate_rankings(rankings, label_to_model, weights={})
+
+    assert [(entry["model"], entry["average_rank"]) for entry in aggregate] == [("b", 1.0), ("a", 2.5), ("c", 2.5)]
+
+
+def test_partial_rankings_are_normalized_to_the_full_scale():
+    label_to_model = {f"Response {label}": label.lower() for label in "ABCD"}
+    rankings = [
+        # Last of two shown is as bad as last of four
+        _ranking("x", "Response A", "Response B", shown=["Response A", "Response B"]),
+        _ranking("y", "Response C", "Response D", "Response A", "Response B"),
+    ]
+
+    aggregate = {entry["model"]: entry for entry in council.calculate_aggregate_rankings(rankings, label_to_model, weights={})}
+
+    assert aggregate["b"]["average_rank"] == 4.0
+    assert aggregate["b"]["rankings_count"] == 2
+    assert aggregate["c"]["average_rank"] == 1.0
+    # Best of two (0) and third of four (2/3) average to 1/3 of the way down the 1..4 scale
+    assert aggregate["a"]["average_rank"] == 2.0
+
+
+def test_labels_outside_the_shard_are_ignored_and_weights_apply():
+    label_to_model = {"Response A": "a", "Response B": "b", "Response C": "c"}
+    rankings = [
+        _ranking("x", "Response C", "Response A", "Response B", shown=["Response A", "Response B"]),
+        _ranking("y", "Response B", "Response A", shown=["Response A", "Response B"]),
+    ]
+
+    aggregate = council.calculate_aggregate_rankings(rankings, label_to_model, weights={"x": 3.0})
+
+    assert "c" not in {entry["model"] for entry in aggregate}
+    assert aggregate[0]["model"] == "a"
+    # a: first for x (weight 3), last for y (weight 1) -> 1/4 of the way down the 1..3 scale
+    assert aggregate[0]["average_rank"] == 1.5
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import httpx
+
+from backend import flask, scheduler
+
+
+def test_check_context_accepts_prompts_that_fit(capsys):
+    assert flask._check_context({"num_ctx": 8192, "num_predict": 1536}, 4 * 4000, "m", "stage3")
+    assert capsys.readouterr().out == ""
+
+
+def test_check_context_warns_without_growing_num_ctx(capsys):
+    options = {"num_ctx": 8192, "num_predict": 1536}
+
+    assert not flask._check_context(options, 4 * 10000, "m", "stage3")
+    assert options["num_ctx"] == 8192
+    assert "WARNING" in capsys.readouterr().out
+
+
+def test_every_stage_and_the_warm_up_use_the_model_num_ctx(monkeypatch):
+    payloads = []
+
+    def handler(request):
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "ok"}})
+
+    model = {"model_name": "m", "flask_url": "http://model", "num_ctx": 12288}
+    long_prompt = [{"role": "user", "content": "x" * 4 * 20000}]
+
+    async def run():
+        monkeypatch.setattr(flask, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        scheduler._endpoints.clear()
+        try:
+            await flask.warm_up_model(model)
+            for stage in ("stage1", "stage2", "stage3", "title"):
+                await flask.query_model(model, [{"role": "user", "content": stage}], stage=stage)
+            await flask.query_model(model, long_prompt, stage="stage3")
+        finally:
+            await flask._client.aclose()
+
+    asyncio.run(run())
+
+    assert {payload["options"]["num_ctx"] for payload in payloads} == {12288}
+    assert payloads[0]["options"]["num_predict"] == 1
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from backend import jobs, storage, titles
+
+
+STAGE1 = [{"model": "a", "response": "first"}, {"model": "b", "response": "second"}]
+STAGE2 = [{"model": "a", "ranking": "FINAL RANKING:\n1. Response B\n2. Response A"}]
+STAGE3 = {"model": "chair", "response": "final"}
+
+
+def _expire_lease(job_id):
+    with jobs._connect() as conn:
+        conn.execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job_id,))
+
+
+@pytest.fixture
+def conversation():
+    storage.create_conversation("conv")
+    storage.add_user_message("conv", "question")
+    return "conv"
+
+
+def test_lease_blocks_other_workers_until_it_expires(conversation):
+    job = jobs.submit_job(conversation, "question", is_first_message=False)
+
+    claimed = jobs.claim_next_job("worker-1")
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == "running"
+    assert jobs.claim_next_job("worker-2") is None
+
+    _expire_lease(job["id"])
+    reclaimed = jobs.claim_next_job("worker-2")
+
+    assert reclaimed["id"] == job["id"]
+    assert reclaimed["worker_id"] == "worker-2"
+    assert reclaimed["attempts"] == 2
+    # The first worker has lost the job and can no longer checkpoint it
+    with pytest.raises(jobs.LeaseLostError):
+        jobs._checkpoint(claimed, "worker-1", stage="stage1", stage1=STAGE1)
+
+
+def test_resumed_job_skips_checkpointed_stages(conversation, monkeypatch):
+    calls = []
+
+    async def stage1(content):
+        calls.append("stage1")
+        return STAGE1
+
+    async def stage2(content, stage1_results):
+        calls.append("stage2")
+        return STAGE2, {"Response A": "a", "Response B": "b"}
+
+    async def stage3(content, stage1_results, stage2_results):
+        calls.append("stage3")
+        return STAGE3
+
+    monkeypatch.setattr(jobs, "stage1_collect_responses", stage1)
+    monkeypatch.setattr(jobs, "stage2_collect_rankings", stage2)
+    monkeypatch.setattr(jobs, "stage3_synthesize_final", stage3)
+
+    job = jobs.submit_job(conversation, "question", is_first_message=False)
+    claimed = jobs.claim_next_job("worker-1")
+    jobs._checkpoint(claimed, "worker-1", stage="stage1", stage1=STAGE1)
+
+    # The first worker dies; another one resumes after the lease expires
+    _expire_lease(job["id"])
+    resumed = jobs.claim_next_job("worker-2")
+    asyncio.run(jobs.run_job(resumed, "worker-2"))
+
+    assert calls == ["stage2", "stage3"]
+    assert jobs.get_job(job["id"])["status"] == "completed"
+    messages = storage.get_conversation(conversation)["messages"]
+    assert [message["role"] for message in messages] == ["user", "assistant"]
+    assert messages[1]["stage3"]["response"] == "final"
+
+
+def test_save_is_not_repeated_after_a_crash(conversation):
+    job = jobs.submit_job(conversation, "question", is_first_message=False)
+    claimed = jobs.claim_next_job("worker-1")
+    jobs._checkpoint(claimed, "worker-1", stage="stage3", stage1=STAGE1, stage2=STAGE2, stage3=STAGE3)
+    # Saved, but the worker crashed before checkpointing 'saved'
+    storage.add_assistant_message(conversation, STAGE1, STAGE2, STAGE3, {"job_id": job["id"]})
+
+    _expire_lease(job["id"])
+    asyncio.run(jobs.run_job(jobs.claim_next_job("worker-2"), "worker-2"))
+
+    messages = storage.get_conversation(conversation)["messages"]
+    assert [message["role"] for message in messages] == ["user", "assistant"]
+    assert jobs.get_job(job["id"])["status"] == "completed"
+
+
+def test_job_stops_when_stage1_is_empty(conversation, monkeypatch):
+    async def stage1(content):
+        return []
+
+    async def stage2(content, stage1_results):
+        raise AssertionError("Stage 2 must not run without responses")
+
+    monkeypatch.setattr(jobs, "stage1_collect_responses", stage1)
+    monkeypatch.setattr(jobs, "stage2_collect_rankings", stage2)
+
+    jobs.submit_job(conversation, "question", is_first_message=False)
+    claimed = jobs.claim_next_job("worker-1")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(jobs.run_job(claimed, "worker-1"))
+    assert len(storage.get_conversation(conversation)["messages"]) == 1
+
+
+def test_shutdown_requeues_interrupted_job(conversation, monkeypatch):
+    async def stage1(content):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(jobs, "stage1_collect_responses", stage1)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    job = jobs.submit_job(conversation, "question", is_first_message=False)
+
+    async def run():
+        jobs.start_workers(1)
+        while jobs.get_job(job["id"])["status"] != "running":
+            await asyncio.sleep(0.01)
+        await jobs.stop_workers()
+
+    asyncio.run(run())
+
+    requeued = jobs.get_job(job["id"])
+    assert requeued["status"] == "queued"
+    assert jobs.claim_next_job("worker-2")["id"] == job["id"]
+
+
+def test_job_completes_without_waiting_for_the_title(conversation, monkeypatch):
+    async def slow_title(conversation_id, content):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(titles, "refine_title", slow_title)
+    job = jobs.submit_job(conversation, "question", is_first_message=True)
+    claimed = jobs.claim_next_job("worker-1")
+    jobs._checkpoint(claimed, "worker-1", stage="stage3", stage1=STAGE1, stage2=STAGE2, stage3=STAGE3)
+
+    async def run():
+        await asyncio.wait_for(jobs.run_job(claimed, "worker-1"), timeout=1)
+        return len(titles._refinements)
+
+    assert asyncio.run(run()) == 1
+    assert jobs.get_job(job["id"])["status"] == "completed"
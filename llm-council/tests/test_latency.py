@@ -0,0 +1,37 @@
+from backend import latency
+from backend.config import DEFAULT_TIMEOUT_SECONDS, LATENCY_MIN_SAMPLES, LATENCY_WINDOW, TIMEOUT_SAFETY_FACTOR
+
+
+def test_deadline_ignores_timed_out_samples():
+    for _ in range(LATENCY_MIN_SAMPLES):
+        latency.record("m", "stage1", 10.0, 1000, 400)
+    for _ in range(LATENCY_MIN_SAMPLES):
+        latency.record("m", "stage1", 300.0, 1000, 0, timed_out=True)
+
+    assert latency.deadline("m", "stage1", 1000) == 10.0 * TIMEOUT_SAFETY_FACTOR
+
+
+def test_deadline_needs_completed_samples():
+    for _ in range(LATENCY_MIN_SAMPLES):
+        latency.record("m", "stage1", 300.0, 1000, 0, timed_out=True)
+
+    assert latency.deadline("m", "stage1", 1000) == DEFAULT_TIMEOUT_SECONDS
+
+
+def test_snapshot_counts_timeouts_at_their_deadline():
+    latency.record("gemma3:4b", "stage1", 2.0, 1000, 400)
+    latency.record("gemma3:4b", "stage1", 30.0, 1000, 0, timed_out=True)
+
+    stats = latency.snapshot()["gemma3:4b"]["stage1"]
+
+    assert stats["samples"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["p95_seconds"] == 30.0
+    assert stats["tokens_per_second"] == 50.0
+
+
+def test_samples_are_bounded_by_the_window():
+    for i in range(LATENCY_WINDOW + 10):
+        latency.record("m", "title", float(i), 100, 40)
+
+    assert latency.snapshot()["m"]["title"]["samples"] == LATENCY_WINDOW
@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+
+from backend import loadtest
+
+
+def test_failed_conversation_create_is_recorded_not_fatal(monkeypatch):
+    creates = []
+
+    def handler(request):
+        if request.url.path == "/api/conversations":
+            creates.append(request)
+            if len(creates) == 1:
+                return httpx.Response(500)
+            return httpx.Response(200, json={"id": "ok"})
+        if request.url.path.endswith("/message/stream"):
+            return httpx.Response(200, text='data: {"type": "complete"}\n\n')
+        return httpx.Response(200, json={})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    recording = [
+        {"conversation": "first", "offset": 0, "content": "a"},
+        {"conversation": "first", "offset": 0, "content": "b"},
+        {"conversation": "second", "offset": 0, "content": "c"},
+    ]
+
+    report = asyncio.run(loadtest.replay(recording, "http://backend", speed=1000))
+
+    assert report["requests"] == 3
+    assert report["errors"] == 2
+    assert report["error_samples"][0].startswith("Conversation create failed")
+    assert report["latency"]["samples"] == 1
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import flask, main, scheduler, storage
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("<think>weighing it</think>\nThe answer", ("weighing it", "The answer")),
+    # The chat template opened the block, so only the closing tag is in the output
+    ("weighing it</think>The answer", ("weighing it", "The answer")),
+    # Cut off while still thinking
+    ("Preamble<think>still weighing", ("still weighing", "Preamble")),
+    ("Just an answer", (None, "Just an answer")),
+    ("<think>  </think>The answer", (None, "The answer")),
+])
+def test_split_reasoning(text, expected):
+    assert flask.split_reasoning(text) == expected
+
+
+def test_query_model_prefers_ollama_thinking_field(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={
+            "message": {"role": "assistant", "content": "The answer", "thinking": "weighing it"},
+        })
+
+    async def run():
+        monkeypatch.setattr(flask, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        scheduler._endpoints.clear()
+        try:
+            return await flask.query_model(
+                {"model_name": "m", "flask_url": "http://reasoner", "reasoning": True},
+                [{"role": "user", "content": "Why?"}],
+            )
+        finally:
+            await flask._client.aclose()
+
+    response = asyncio.run(run())
+
+    assert response["content"] == "The answer"
+    assert response["reasoning"] == "weighing it"
+
+
+def _save_round(conversation_id):
+    storage.create_conversation(conversation_id)
+    storage.add_user_message(conversation_id, "Why?")
+    storage.add_assistant_message(
+        conversation_id,
+        [{"model": "a", "response": "A", "reasoning": "a thinks"}, {"model": "b", "response": "B"}],
+        [{"model": "a", "ranking": "FINAL RANKING:\n1. Response B", "reasoning": "a ranks"}],
+        {"model": "chair", "response": "Final", "reasoning": "chair thinks"},
+    )
+
+
+def test_traces_are_stored_apart_from_the_conversation():
+    _save_round("abc")
+
+    message = storage.get_conversation("abc")["messages"][1]
+    assert all("reasoning" not in entry for entry in message["stage1"] + message["stage2"] + [message["stage3"]])
+    assert [entry.get("has_reasoning", False) for entry in message["stage1"]] == [True, False]
+    assert storage.get_reasoning_traces("abc", 1) == {
+        "stage1": {"a": "a thinks"},
+        "stage2": {"a": "a ranks"},
+        "stage3": {"chair": "chair thinks"},
+    }
+
+
+def test_reasoning_endpoint():
+    _save_round("abc")
+    client = TestClient(main.app)
+
+    assert client.get("/api/conversations/abc/messages/1/reasoning").json()["stage3"] == {"chair": "chair thinks"}
+    assert client.get("/api/conversations/abc/messages/3/reasoning").status_code == 404
+    assert client.get("/api/conversations/x..y/messages/1/reasoning").status_code == 404
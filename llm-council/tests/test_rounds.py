@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import time
+
+from backend import rounds, storage, titles
+
+
+def _follow(round_id, last_event_id=0):
+    async def collect():
+        return [entry async for entry in rounds.follow_event_log(round_id, last_event_id)]
+    return asyncio.run(collect())
+
+
+def test_follow_event_log_replays_until_terminal_event():
+    os.makedirs(rounds.ROUNDS_DIR)
+    with open(rounds.get_round_log_path("r1"), "w") as f:
+        for event_id, event in enumerate([{"type": "round_start"}, {"type": "stage1_complete"}, {"type": "complete"}], 1):
+            f.write(json.dumps({"id": event_id, "event": event}) + "\n")
+
+    assert [event_id for event_id, _ in _follow("r1", last_event_id=1)] == [2, 3]
+
+
+def test_follow_event_log_handles_missing_log():
+    events = _follow("cleaned-up")
+
+    assert len(events) == 1
+    assert events[0][0] is None
+    assert events[0][1]["type"] == "error"
+
+
+def _run_round(monkeypatch, refine_title):
+
+    async def council_events(content):
+        yield {"type": "stage1_complete", "data": [{"model": "a", "response": "x"}]}
+        await asyncio.sleep(0.01)
+        yield {"type": "stage3_complete", "data": {"model": "chair", "response": "final"}}
+
+    monkeypatch.setattr(rounds, "subscribe_council_events", council_events)
+    monkeypatch.setattr(titles, "refine_title", refine_title)
+    storage.create_conversation("conv")
+
+    async def run():
+        council_round = rounds.CouncilRound("round", "conv")
+        await asyncio.wait_for(council_round.run("Why is the sky blue?", is_first_message=True), timeout=1)
+        return [event for _, event in council_round.events]
+
+    return asyncio.run(run())
+
+
+def test_round_completes_without_waiting_for_the_title(monkeypatch):
+    async def slow_title(conversation_id, content):
+        await asyncio.sleep(60)
+
+    events = _run_round(monkeypatch, slow_title)
+
+    assert events[-1]["type"] == "complete"
+    assert [event["type"] for event in events].count("title_complete") == 1
+    assert storage.get_conversation("conv")["messages"][-1]["stage3"]["response"] == "final"
+
+
+def test_round_sends_a_title_that_is_already_refined(monkeypatch):
+    async def fast_title(conversation_id, content):
+        return "Sky Colour"
+
+    events = _run_round(monkeypatch, fast_title)
+
+    titles_sent = [event["data"]["title"] for event in events if event["type"] == "title_complete"]
+    assert titles_sent[-1] == "Sky Colour"
+    assert events[-1]["type"] == "complete"
+
+
+def test_subscriber_reads_events_beyond_the_buffer_from_the_log(monkeypatch):
+    monkeypatch.setattr(rounds, "ROUND_EVENT_BUFFER", 2)
+
+    async def run():
+        council_round = rounds.CouncilRound("buffered", "conv")
+        for index in range(4):
+            await council_round.emit({"type": "progress", "index": index})
+        await council_round.emit({"type": "complete"})
+        return [event_id async for event_id, _ in council_round.subscribe()]
+
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5]
+    assert [event_id for event_id, _ in rounds.read_event_log("buffered")] == [1, 2, 3, 4, 5]
+
+
+def test_cleanup_removes_only_expired_logs():
+    os.makedirs(rounds.ROUNDS_DIR)
+    for round_id in ("old", "new"):
+        with open(rounds.get_round_log_path(round_id), "w") as f:
+            f.write("\n")
+    expired = time.time() - rounds.ROUND_LOG_TTL_SECONDS - 1
+    os.utime(rounds.get_round_log_path("old"), (expired, expired))
+
+    async def run():
+        task = asyncio.ensure_future(rounds.cleanup_periodically(interval=60))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run())
+    assert sorted(os.listdir(rounds.ROUNDS_DIR)) == ["new.ndjson"]
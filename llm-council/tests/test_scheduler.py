@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from backend import scheduler
+
+
+async def _run_waiters(endpoint, waiters):
+    """Queue (priority, conversation, name) waiters behind a held slot; return grant order."""
+    order = []
+
+    async def wait(priority, conversation_id, name):
+        await endpoint.acquire(priority, conversation_id)
+        order.append(name)
+        endpoint.release()
+
+    await endpoint.acquire(scheduler.INTERACTIVE, "holder")
+    tasks = []
+    for priority, conversation_id, name in waiters:
+        tasks.append(asyncio.create_task(wait(priority, conversation_id, name)))
+        await asyncio.sleep(0)
+    endpoint.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_waiters_are_served_by_priority():
+    endpoint = scheduler.EndpointScheduler(1)
+    waiters = [
+        (scheduler.BACKGROUND, "c1", "background"),
+        (scheduler.BATCH, "c2", "batch"),
+        (scheduler.INTERACTIVE, "c3", "interactive"),
+    ]
+
+    assert asyncio.run(_run_waiters(endpoint, waiters)) == ["interactive", "batch", "background"]
+
+
+def test_conversations_take_turns_within_a_priority_class():
+    endpoint = scheduler.EndpointScheduler(1)
+    waiters = [
+        (scheduler.INTERACTIVE, "a", "a1"),
+        (scheduler.INTERACTIVE, "a", "a2"),
+        (scheduler.INTERACTIVE, "a", "a3"),
+        (scheduler.INTERACTIVE, "b", "b1"),
+        (scheduler.INTERACTIVE, "b", "b2"),
+    ]
+
+    assert asyncio.run(_run_waiters(endpoint, waiters)) == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_slots_limit_concurrency():
+    endpoint = scheduler.EndpointScheduler(2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        await endpoint.acquire(scheduler.INTERACTIVE, None)
+        peak = max(peak, endpoint.active)
+        await asyncio.sleep(0.01)
+        endpoint.release()
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert endpoint.active == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    endpoint = scheduler.EndpointScheduler(1)
+
+    async def run():
+        await endpoint.acquire(scheduler.INTERACTIVE, "holder")
+        cancelled = asyncio.create_task(endpoint.acquire(scheduler.INTERACTIVE, "a"))
+        waiting = asyncio.create_task(endpoint.acquire(scheduler.BATCH, "b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        endpoint.release()
+        await asyncio.wait_for(waiting, timeout=1)
+        assert endpoint.active == 1
+        assert endpoint.waiting_count() == 0
+
+    asyncio.run(run())
+
+
+def test_slot_uses_the_request_context_priority():
+    model_config = {"flask_url": "http://endpoint", "max_concurrency": 1}
+    order = []
+
+    async def call(priority, name):
+        with scheduler.request_context(priority, name):
+            async with scheduler.slot(model_config):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+    async def run():
+        first = asyncio.create_task(call(scheduler.BACKGROUND, "first"))
+        await asyncio.sleep(0)
+        background = asyncio.create_task(call(scheduler.BACKGROUND, "background"))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call(scheduler.INTERACTIVE, "interactive"))
+        await asyncio.gather(first, background, interactive)
+
+    scheduler._endpoints.clear()
+    asyncio.run(run())
+    assert order == ["first", "interactive", "background"]
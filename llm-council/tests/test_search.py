@@ -0,0 +1,35 @@
+import threading
+
+from backend import search
+
+
+def _conversation(conversation_id, question):
+    return {"id": conversation_id, "messages": [{"role": "user", "content": question}]}
+
+
+def test_ensure_built_indexes_history_once():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [_conversation("a", "why is the sky blue"), _conversation("b", "how do tides work")]
+
+    threads = [threading.Thread(target=search.ensure_built, args=(load,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert search.ensure_built(load) is False
+    assert search.search("tides")["results"][0]["conversation_id"] == "b"
+
+
+def test_snippet_escapes_stored_text():
+    search.ensure_built(lambda: [_conversation("a", "is <script>alert(1)</script> & tides safe")])
+
+    snippet = search.search("tides")["results"][0]["snippet"]
+
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "&amp; <mark>tides</mark> safe" in snippet
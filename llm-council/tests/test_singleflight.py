@@ -0,0 +1,196 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend import flask, scheduler
+from backend.singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_run_once():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def run():
+        first = await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        # Nothing is cached once the call has finished
+        second = await flight.do("a", lambda: work("a"))
+        return first, second
+
+    assert asyncio.run(run()) == (["a", "b"], "a")
+    assert calls == ["a", "b", "a"]
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def run():
+        results = await asyncio.gather(flight.do("key", failing), flight.do("key", failing), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("key", failing)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_cancelling_the_only_caller_cancels_the_call():
+    flight = SingleFlight()
+    state = {"finished": False}
+
+    async def work():
+        await asyncio.sleep(0.05)
+        state["finished"] = True
+        return "stale"
+
+    async def run():
+        caller = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        # A new caller starts a fresh call instead of joining the cancelled one
+        fresh = await asyncio.wait_for(flight.do("key", lambda: asyncio.sleep(0, "fresh")), 1)
+        await asyncio.sleep(0.06)
+        return fresh
+
+    assert asyncio.run(run()) == "fresh"
+    assert state["finished"] is False
+
+
+def test_cancelling_query_model_stops_the_request(monkeypatch):
+    state = {"started": False, "finished": False}
+
+    async def handler(request):
+        state["started"] = True
+        await asyncio.sleep(0.2)
+        state["finished"] = True
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": "late"}})
+
+    async def run():
+        monkeypatch.setattr(flask, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        scheduler._endpoints.clear()
+        model = {"model_name": "m", "flask_url": "http://slow"}
+        try:
+            caller = asyncio.ensure_future(flask.query_model(model, [{"role": "user", "content": "Why?"}]))
+            await asyncio.sleep(0.05)
+            caller.cancel()
+            await asyncio.sleep(0.25)
+            # The endpoint slot was given back
+            async with scheduler.slot(model):
+                pass
+        finally:
+            await flask._client.aclose()
+
+    asyncio.run(run())
+    assert state == {"started": True, "finished": False}
+
+
+def test_last_stream_subscriber_leaving_cancels_the_stream():
+    flight = SingleFlight()
+    produced = []
+
+    async def events():
+        for i in range(10):
+            produced.append(i)
+            yield i
+            await asyncio.sleep(0.01)
+
+    async def run():
+        stream = flight.stream("key", events)
+        async for event in stream:
+            if event == 1:
+                break
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        # A later subscriber gets a fresh stream from the start
+        return [event async for event in flight.stream("key", events)]
+
+    assert asyncio.run(run()) == list(range(10))
+    # The first run stopped after the subscriber left
+    assert len(produced) < 13
+
+
+def test_late_stream_subscriber_receives_every_event():
+    flight = SingleFlight()
+    runs = []
+
+    async def events():
+        runs.append(1)
+        for i in range(3):
+            yield i
+            await asyncio.sleep(0.01)
+
+    async def collect(stream):
+        return [event async for event in stream]
+
+    async def run():
+        early = asyncio.ensure_future(collect(flight.stream("key", events)))
+        await asyncio.sleep(0.015)
+        late = asyncio.ensure_future(collect(flight.stream("key", events)))
+        return await asyncio.gather(early, late)
+
+    assert asyncio.run(run()) == [[0, 1, 2], [0, 1, 2]]
+    assert len(runs) == 1
+
+
+def test_stream_error_reaches_every_subscriber():
+    flight = SingleFlight()
+
+    async def events():
+        yield "partial"
+        raise RuntimeError("stream failed")
+
+    async def collect(stream):
+        received = []
+        with pytest.raises(RuntimeError):
+            async for event in stream:
+                received.append(event)
+        return received
+
+    async def run():
+        return await asyncio.gather(collect(flight.stream("key", events)), collect(flight.stream("key", events)))
+
+    assert asyncio.run(run()) == [["partial"], ["partial"]]
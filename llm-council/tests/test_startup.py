@@ -0,0 +1,55 @@
+import asyncio
+
+from backend import registry, startup
+
+
+def _endpoints(healthy=True, warm=True):
+    names = [member["model_name"] for member in registry.council_members()] + [registry.chairman()["model_name"]]
+    return {name: {"healthy": healthy, "warm": warm, "seconds": 0.0} for name in names}
+
+
+def _run(monkeypatch, probe_results):
+    """Run the startup loop over a sequence of probe results; return (warm flag, phase after) per probe."""
+    monkeypatch.setattr(startup, "STARTUP_WARM_UP", True)
+    monkeypatch.setattr(startup, "STARTUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(startup, "READY_CHECK_SECONDS", 0)
+    monkeypatch.setitem(startup._state, "phase", "starting")
+    results = iter(probe_results)
+    history = []
+
+    async def probe_endpoints(warm):
+        if history:
+            history[-1] = (history[-1][0], startup._state["phase"])
+        history.append((warm, None))
+        try:
+            return next(results)
+        except StopIteration:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(startup, "probe_endpoints", probe_endpoints)
+
+    async def run():
+        try:
+            await startup.run_startup()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    return history[:-1]
+
+
+def test_ready_requires_a_successful_warm_up(monkeypatch):
+    history = _run(monkeypatch, [_endpoints(healthy=True, warm=False), _endpoints()])
+
+    assert history == [(True, "waiting"), (True, "ready")]
+
+
+def test_readiness_is_dropped_and_regained(monkeypatch):
+    history = _run(monkeypatch, [
+        _endpoints(),
+        _endpoints(healthy=True, warm=False),  # plain health check once ready
+        _endpoints(healthy=False, warm=False),
+        _endpoints(),
+    ])
+
+    assert history == [(True, "ready"), (False, "ready"), (False, "waiting"), (True, "ready")]
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import zlib
+
+import pytest
+
+from backend import storage, transfer
+
+
+def _conversation(conversation_id, reasoning=None):
+    conversation = {
+        "id": conversation_id,
+        "created_at": "2024-01-01T00:00:00",
+        "title": "Imported",
+        "messages": [
+            {"role": "user", "content": "Why is the sky blue?"},
+            {"role": "assistant", "stage1": [], "stage2": [], "stage3": {"model": "m", "response": "Scattering"}},
+        ],
+    }
+    if reasoning is not None:
+        conversation["reasoning_traces"] = {"1": reasoning}
+    return conversation
+
+
+def test_export_import_round_trip():
+    storage.save_conversation(_conversation("abc-123"))
+    storage.save_reasoning_traces("abc-123", 1, {"stage3": {"m": "thinking"}})
+
+    lines = list(transfer.export_lines(include_reasoning=True))
+    os.rename("data", "data-old")
+
+    stats = transfer.import_lines(lines)
+
+    assert stats == {"imported": 1, "skipped": 0, "errors": 0}
+    assert storage.get_conversation("abc-123")["title"] == "Imported"
+    assert storage.get_reasoning_traces("abc-123", 1) == {"stage3": {"m": "thinking"}}
+
+
+@pytest.mark.parametrize("conversation_id", ["..", ".", "a/b", "../data", "", "abc.json", 42])
+def test_parse_conversation_rejects_unsafe_ids(conversation_id):
+    line = json.dumps({"id": conversation_id, "messages": []})
+    with pytest.raises(ValueError):
+        transfer.parse_conversation(line)
+
+
+@pytest.mark.parametrize("traces", [{"x": {}}, {"-1": {}}, {"5": {}}, {"1": "not a dict"}, ["1"]])
+def test_parse_conversation_rejects_invalid_trace_keys(traces):
+    conversation = _conversation("abc")
+    conversation["reasoning_traces"] = traces
+    with pytest.raises(ValueError):
+        transfer.parse_conversation(json.dumps(conversation))
+
+
+def test_invalid_lines_are_counted_not_fatal():
+    lines = [
+        json.dumps({"id": "..", "messages": []}),
+        "not json",
+        json.dumps(_conversation("ok")),
+    ]
+
+    stats = transfer.import_lines(lines)
+
+    assert stats == {"imported": 1, "skipped": 0, "errors": 2}
+
+
+def test_skipped_conversation_keeps_its_traces():
+    storage.save_conversation(_conversation("abc"))
+    storage.save_reasoning_traces("abc", 1, {"stage3": {"m": "original"}})
+
+    stats = transfer.import_lines([json.dumps(_conversation("abc", reasoning={"stage3": {"m": "imported"}}))])
+
+    assert stats["skipped"] == 1
+    assert storage.get_reasoning_traces("abc", 1) == {"stage3": {"m": "original"}}
+
+
+def test_overwrite_replaces_traces():
+    storage.save_conversation(_conversation("abc"))
+    storage.save_reasoning_traces("abc", 1, {"stage3": {"m": "original"}})
+
+    stats = transfer.import_lines(
+        [json.dumps(_conversation("abc", reasoning={"stage3": {"m": "imported"}}))],
+        overwrite=True,
+    )
+
+    assert stats["imported"] == 1
+    assert storage.get_reasoning_traces("abc", 1) == {"stage3": {"m": "imported"}}
+
+
+def test_failed_batch_leaves_no_temp_files():
+    conversation = _conversation("abc")
+    conversation["title"] = object()  # not JSON serializable
+
+    with pytest.raises(TypeError):
+        storage.save_conversations_batch([_conversation("first"), conversation])
+
+    leftovers = [name for name in os.listdir(storage.DATA_DIR) if name.endswith((".tmp", ".json"))]
+    assert leftovers == []
+
+
+@pytest.mark.parametrize("fields", [
+    {"created_at": 5},
+    {"title": None},
+    {"messages": ["oops"]},
+    {"messages": [{"role": "system", "content": "hi"}]},
+    {"messages": [{"role": "user", "content": 1}]},
+])
+def test_parse_conversation_rejects_malformed_fields(fields):
+    conversation = {**_conversation("abc"), **fields}
+    with pytest.raises(ValueError):
+        transfer.parse_conversation(json.dumps(conversation))
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_invalid_utf8_line_is_counted_as_error():
+    body = b'{"id": "\xff"}\n' + json.dumps(_conversation("ok")).encode() + b"\n"
+
+    stats = asyncio.run(transfer.aimport_lines(transfer.aiter_lines(_chunks(body))))
+
+    assert stats == {"imported": 1, "skipped": 0, "errors": 1}
+
+
+def test_corrupt_gzip_is_counted_and_keeps_earlier_lines():
+    compressor = zlib.compressobj(wbits=31)
+    head = compressor.compress((json.dumps(_conversation("ok")) + "\n").encode()) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+    stats = asyncio.run(transfer.aimport_lines(transfer.aiter_lines(_chunks(head, b"\xff" * 16), gzipped=True)))
+
+    assert stats == {"imported": 1, "skipped": 0, "errors": 1}
+    assert storage.get_conversation("ok") is not None
+
+
+def test_overwrite_drops_traces_not_in_the_import():
+    storage.save_conversation(_conversation("abc"))
+    storage.save_reasoning_traces("abc", 1, {"stage3": {"m": "original"}})
+
+    stats = transfer.import_lines([json.dumps(_conversation("abc"))], overwrite=True)
+
+    assert stats["imported"] == 1
+    assert storage.get_reasoning_traces("abc", 1) is None
@@ -0,0 +1,67 @@
+import pytest
+
+from backend import storage, usage
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(usage, "_cache", {})
+
+
+def _usage(prompt_tokens, load_seconds=0.0):
+    return {
+        "calls": 1,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": 10,
+        "prompt_seconds": 1.0,
+        "generation_seconds": 2.0,
+        "load_seconds": load_seconds,
+        "total_seconds": 3.0,
+    }
+
+
+def _conversation(conversation_id, prompt_tokens, load_seconds=0.0):
+    return {
+        "id": conversation_id,
+        "created_at": "",
+        "title": "t",
+        "messages": [
+            {"role": "user", "content": "q"},
+            {
+                "role": "assistant",
+                "stage1": [{"model": "a", "response": "x", "usage": _usage(prompt_tokens, load_seconds)}],
+                "stage2": [{"model": "a", "ranking": "r", "usage": _usage(prompt_tokens)}],
+                "stage3": {"model": "chair", "response": "y", "usage": _usage(prompt_tokens)},
+            },
+        ],
+    }
+
+
+def test_report_aggregates_per_model_and_stage():
+    storage.save_conversation(_conversation("c1", 100, load_seconds=30.0))
+    storage.save_conversation(_conversation("c2", 50))
+
+    report = usage.report()
+
+    assert report["a"]["calls"] == 4
+    assert report["a"]["prompt_tokens"] == 300
+    assert report["a"]["cold_loads"] == 1
+    assert report["a"]["stages"]["stage1"]["prompt_tokens"] == 150
+    assert report["a"]["stages"]["stage1"]["prefill_tokens_per_second"] == 75.0
+    assert report["chair"]["calls"] == 2
+
+
+def test_report_only_rereads_changed_conversations():
+    storage.save_conversation(_conversation("c1", 100))
+    storage.save_conversation(_conversation("c2", 50))
+    usage.report()
+
+    assert storage.map_conversations_cached(usage._cache, usage._conversation_usage)[1] == 0
+
+    storage.delete_conversation("c2")
+    storage.save_conversation(_conversation("c3", 10))
+    results, recomputed = storage.map_conversations_cached(usage._cache, usage._conversation_usage)
+
+    assert recomputed == 1
+    assert len(results) == 2
+    assert usage.report()["a"]["prompt_tokens"] == 220
@@ -11,9 +11,35 @@ load_dotenv()
 OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
 MODEL_NAME = os.getenv('MODEL_NAME', 'llama3.2:1b') # change model if no model have been chosen
 NGROK_API_URL = "http://localhost:4040/api/tunnels"
+MAX_TIMEOUT = float(os.getenv('MAX_TIMEOUT', '460'))  # upper bound for per-request deadlines
+
+# Model residency: MODEL_NAME is preloaded and pinned in memory. Other models can
+# only be requested if listed in ALLOWED_MODELS; they are loaded one at a time
+# and unloaded after SWITCH_KEEP_ALIVE so the pinned model gets its memory back.
+KEEP_ALIVE = os.getenv('KEEP_ALIVE', '-1')
+# Context window MODEL_NAME is loaded with. Ollama reloads a model whenever num_ctx
+# changes, so the preload and every /chat request for MODEL_NAME use this value
+# (keep it equal to the council backend's num_ctx for this model)
+NUM_CTX = int(os.getenv('NUM_CTX', '8192'))
+ALLOWED_MODELS = {MODEL_NAME} | {m.strip() for m in os.getenv('ALLOWED_MODELS', '').split(',') if m.strip()}
+SWITCH_KEEP_ALIVE = os.getenv('SWITCH_KEEP_ALIVE', '0')
+
+# Preload retries (e.g. Ollama still starting): delays double up to WARM_UP_MAX_DELAY.
+# After the last retry, /health and /chat start a new warm-up while the state is 'error'.
+WARM_UP_RETRIES = int(os.getenv('WARM_UP_RETRIES', '5'))
+WARM_UP_MAX_DELAY = float(os.getenv('WARM_UP_MAX_DELAY', '60'))
 
 app = Flask(__name__)
 
+# Residency state of MODEL_NAME: 'cold' -> 'loading' -> 'ready' (or 'error')
+residency = {'state': 'cold', 'loaded_at': None, 'load_seconds': None, 'error': None}
+
+# Serializes requests for models other than MODEL_NAME (model switches)
+switch_lock = threading.Lock()
+
+# Held while a warm-up runs, so concurrent triggers don't load the model twice
+warm_lock = threading.Lock()
+
 # --- AUTOMATION FUNCTIONS ---
 
 def ensure_model_exists():
@@ -47,6 +73,90 @@ def ensure_model_exists():
     except Exception as e:
         print(f"[!] Error managing model: {e}")
 
+def keep_alive_value(value):
+    """Ollama expects keep_alive as a number of seconds or a duration string."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def preload_model(model, keep_alive):
+    """Loads a model into memory (a request without a prompt only loads it), with NUM_CTX."""
+    response = requests.post(
+        f'{OLLAMA_BASE_URL}/api/generate',
+        json={'model': model, 'keep_alive': keep_alive_value(keep_alive), 'options': {'num_ctx': NUM_CTX}},
+        timeout=MAX_TIMEOUT
+    )
+    response.raise_for_status()
+
+
+def loaded_models():
+    """Returns the models Ollama currently holds in memory."""
+    response = requests.get(f'{OLLAMA_BASE_URL}/api/ps', timeout=5)
+    response.raise_for_status()
+    return [
+        {
+            'name': m.get('name'),
+            'size_bytes': m.get('size'),
+            'vram_bytes': m.get('size_vram'),
+            'expires_at': m.get('expires_at')
+        }
+        for m in response.json().get('models', [])
+    ]
+
+
+def is_loaded(model):
+    try:
+        return any(m['name'] == model or m['name'].startswith(f"{model}:") for m in loaded_models())
+    except Exception:
+        return False
+
+
+def warm_up(retries=WARM_UP_RETRIES):
+    """Preloads and pins MODEL_NAME, retrying with backoff; /health reports ready only afterwards."""
+    if not warm_lock.acquire(blocking=False):
+        return  # another thread is already loading the model
+
+    try:
+        delay = 2
+        for attempt in range(retries + 1):
+            print(f"[*] Preloading model '{MODEL_NAME}' (keep_alive={KEEP_ALIVE})...")
+            residency['state'] = 'loading'
+            start = time.time()
+            try:
+                preload_model(MODEL_NAME, KEEP_ALIVE)
+                residency.update({
+                    'state': 'ready',
+                    'loaded_at': time.time(),
+                    'load_seconds': round(time.time() - start, 2),
+                    'error': None
+                })
+                print(f"[+] Model '{MODEL_NAME}' loaded in {residency['load_seconds']}s")
+                return
+            except Exception as e:
+                residency.update({'state': 'error', 'error': str(e)})
+                print(f"[!] Error preloading model: {e}")
+                if attempt < retries:
+                    print(f"    Retrying in {delay}s...")
+                    time.sleep(delay)
+                    delay = min(delay * 2, WARM_UP_MAX_DELAY)
+    finally:
+        warm_lock.release()
+
+
+def start_warm_up():
+    """Starts a background warm-up unless one is already running."""
+    if not warm_lock.locked():
+        threading.Thread(target=warm_up, daemon=True).start()
+
+
+def rewarm_if_evicted():
+    """Reloads MODEL_NAME after a model switch pushed it out of memory."""
+    if not is_loaded(MODEL_NAME):
+        warm_up()
+
+
 def display_ngrok_url():
     """Polls the Ngrok API to find the public URL."""
     print("[*] Waiting for Ngrok tunnel...")
@@ -72,15 +182,30 @@ def display_ngrok_url():
 
 @app.route('/health', methods=['GET'])
 def health_check():
+    # Not ready until the model is in memory, so callers never pay the cold load
+    if residency['state'] == 'error':
+        start_warm_up()
+    if residency['state'] != 'ready':
+        return jsonify({'status': residency['state'], 'model': MODEL_NAME, 'error': residency['error']}), 503
     return jsonify({'status': 'healthy', 'model': MODEL_NAME}), 200
 
 @app.route('/info', methods=['GET'])
 def get_node_info():
+    try:
+        models_in_memory = loaded_models()
+    except Exception as e:
+        models_in_memory = {'error': str(e)}
+
     return jsonify({
         "status": "online",
         "node_id": os.getenv('HOSTNAME', 'unknown-node'),
         "role": "Logic/Reasoning",
-        "model": MODEL_NAME
+        "model": MODEL_NAME,
+        "allowed_models": sorted(ALLOWED_MODELS),
+        "keep_alive": KEEP_ALIVE,
+        "num_ctx": NUM_CTX,
+        "residency": residency,
+        "loaded_models": models_in_memory
     }), 200
 
 @app.route('/chat', methods=['POST'])
@@ -93,9 +218,14 @@ def chat():
             {"role": "user", "content": "Hello!"},
             {"role": "assistant", "content": "Hi there!"}
         ],
-        "model": "optional-model-name",  # Optional, uses MODEL_NAME if not provided
-        "stream": false  # Optional, default is false
+        "model": "optional-model-name",  # Optional, must be in ALLOWED_MODELS
+        "stream": false,  # Optional, default is false
+        "think": true,  # Optional, return reasoning traces in message.thinking
+        "options": {},  # Optional, Ollama generation options (num_ctx is NUM_CTX for MODEL_NAME)
+        "timeout": 120  # Optional, deadline in seconds (capped at MAX_TIMEOUT)
     }
+    When the deadline passes, the connection to Ollama is closed, which makes
+    Ollama abort the generation, and a 504 is returned.
     """
     try:
         data = request.get_json()
@@ -106,23 +236,52 @@ def chat():
         messages = data['messages']
         model = data.get('model', MODEL_NAME)
         stream = data.get('stream', False)
+
+        if model not in ALLOWED_MODELS:
+            return jsonify({
+                'error': 'Model not allowed',
+                'details': f"'{model}' is not in ALLOWED_MODELS: {sorted(ALLOWED_MODELS)}"
+            }), 403
         
-        # Prepare request to Ollama
+        # Prepare request to Ollama; the pinned model stays resident, others are released
         ollama_payload = {
             'model': model,
             'messages': messages,
-            'stream': stream
+            'stream': stream,
+            'keep_alive': keep_alive_value(KEEP_ALIVE if model == MODEL_NAME else SWITCH_KEEP_ALIVE)
         }
         
         if 'options' in data:
             ollama_payload['options'] = data['options']
+        if model == MODEL_NAME:
+            # The pinned runner was loaded with NUM_CTX; any other size would reload it
+            ollama_payload['options'] = {**ollama_payload.get('options', {}), 'num_ctx': NUM_CTX}
+
+        if 'think' in data:
+            ollama_payload['think'] = data['think']
+
+        timeout = min(float(data.get('timeout', MAX_TIMEOUT)), MAX_TIMEOUT)
         
-        # Call Ollama API
-        response = requests.post(
-            f'{OLLAMA_BASE_URL}/api/chat',
-            json=ollama_payload,
-            timeout=460
-        )
+        # Call Ollama API; model switches are queued one at a time
+        if model == MODEL_NAME:
+            if residency['state'] == 'error':
+                # Ollama loads the model for this request anyway; repin it in the background
+                start_warm_up()
+            response = requests.post(
+                f'{OLLAMA_BASE_URL}/api/chat',
+                json=ollama_payload,
+                timeout=timeout
+            )
+        else:
+            with switch_lock:
+                try:
+                    response = requests.post(
+                        f'{OLLAMA_BASE_URL}/api/chat',
+                        json=ollama_payload,
+                        timeout=timeout
+                    )
+                finally:
+                    threading.Thread(target=rewarm_if_evicted, daemon=True).start()
         
         if response.status_code == 200:
             return jsonify(response.json()), 200
@@ -132,6 +291,11 @@ def chat():
                 'details': response.text
             }), response.status_code
             
+    except requests.exceptions.Timeout as e:
+        return jsonify({
+            'error': 'Generation timed out',
+            'details': str(e)
+        }), 504
     except requests.exceptions.RequestException as e:
         return jsonify({
             'error': 'Failed to connect to Ollama API',
@@ -172,7 +336,7 @@ def list_models():
 
 if __name__ == '__main__':
 
-    setup_thread = threading.Thread(target=lambda: (ensure_model_exists(), display_ngrok_url()))
+    setup_thread = threading.Thread(target=lambda: (ensure_model_exists(), warm_up(), display_ngrok_url()))
     setup_thread.start()
     
     print(f"Starting Flask API on port 5000...")